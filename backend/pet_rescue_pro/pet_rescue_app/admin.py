@@ -1,10 +1,26 @@
 from django.contrib import admin
 from .models import (
     Profile, PetType, Pet, PetMedicalHistory,
-    PetReport, PetAdoption, Notification, UserReport, FeedbackStory
+    PetReport, PetAdoption, Notification, UserReport, FeedbackStory, ScheduledJob, JobRun
 )
+from django import forms
+from django.utils import timezone
 from django.utils.html import format_html
 
+from .pagination import EstimatedCountPaginator
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist defaults for tables that grow without bound: counts come from
+    planner estimates (no COUNT(*) per page view, and no second count for
+    "show all"), and FK fields in forms use raw id inputs instead of a
+    <select> holding every row.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    raw_id_fields = ("created_by", "modified_by")
+
 
 # -------------------------
 # Profile Admin
@@ -25,8 +41,12 @@ from django.contrib.auth.admin import UserAdmin
 @admin.register(Profile)
 class ProfileAdmin(UserAdmin):
     model = Profile
-    list_display = ("username", "email", "gender", "phone", "pincode", "profile_image_tag", "is_verified", "is_active","otp")
-    search_fields = ("username", "email", "phone", "pincode")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_display = ("username", "email", "gender", "phone", "pincode", "profile_image_tag", "is_verified", "is_active")
+    # Prefix matches on the upper(...) text_pattern_ops indexes (migration 0016); phone/pincode exact
+    search_fields = ("^username", "^email", "=phone", "=pincode")
+    search_help_text = "Start of the username or email, or an exact phone number or pincode."
     list_filter = ("gender", "is_staff", "is_active", "is_superuser")
     readonly_fields = ("profile_image_tag",)
 
@@ -68,9 +88,11 @@ class PetTypeAdmin(admin.ModelAdmin):
 # Pet Admin
 # -------------------------
 @admin.register(Pet)
-class PetAdmin(admin.ModelAdmin):
+class PetAdmin(LargeTableAdmin):
     list_display = ("name", "pet_type", "gender", "breed", "age", "is_diseased", "is_vaccinated", "pet_image_tag")
-    search_fields = ("name", "breed", "color", "city", "state")
+    list_select_related = ("pet_type",)
+    search_fields = ("^name",)
+    search_help_text = "Start of the pet's name."
     list_filter = ("pet_type", "gender", "is_diseased", "is_vaccinated")
     readonly_fields = ("pet_image_tag",)
 
@@ -85,9 +107,12 @@ class PetAdmin(admin.ModelAdmin):
 # PetMedicalHistory Admin
 # -------------------------
 @admin.register(PetMedicalHistory)
-class PetMedicalHistoryAdmin(admin.ModelAdmin):
+class PetMedicalHistoryAdmin(LargeTableAdmin):
     list_display = ("pet", "vaccination_name", "disease_name", "stage", "no_of_years", "last_vaccinated_date")
-    search_fields = ("pet__name", "vaccination_name", "disease_name")
+    list_select_related = ("pet",)
+    autocomplete_fields = ("pet",)
+    search_fields = ("^pet__name",)
+    search_help_text = "Start of the pet's name."
     list_filter = ("stage",)
 
 
@@ -95,10 +120,14 @@ class PetMedicalHistoryAdmin(admin.ModelAdmin):
 # PetReport Admin
 # -------------------------
 @admin.register(PetReport)
-class PetReportAdmin(admin.ModelAdmin):
+class PetReportAdmin(LargeTableAdmin):
     list_display = ("pet_id","pet", "user", "pet_status", "report_status", "is_resolved", "report_image_tag","created_date")
-    search_fields = ("pet__name", "user__username")
-    list_filter = ("pet_status", "report_status", "is_resolved")
+    list_select_related = ("pet", "user")
+    autocomplete_fields = ("pet", "user")
+    search_fields = ("^pet__name", "^user__username", "^user__email")
+    search_help_text = "Start of the pet's name, or the reporter's username or email."
+    list_filter = ("pet_status", "report_status", "is_resolved", ("duplicate_of", admin.EmptyFieldListFilter))
+    raw_id_fields = LargeTableAdmin.raw_id_fields + ("duplicate_of",)
     readonly_fields = ("report_image_tag",)
     
     def report_image_tag(self, obj):
@@ -112,9 +141,12 @@ class PetReportAdmin(admin.ModelAdmin):
 # PetAdoption Admin
 # -------------------------
 @admin.register(PetAdoption)
-class PetAdoptionAdmin(admin.ModelAdmin):
+class PetAdoptionAdmin(LargeTableAdmin):
     list_display = ("pet_id","pet", "requestor", "status")
-    search_fields = ("pet__name", "requestor__username")
+    list_select_related = ("pet", "requestor")
+    autocomplete_fields = ("pet", "requestor")
+    search_fields = ("^pet__name", "^requestor__username", "^requestor__email")
+    search_help_text = "Start of the pet's name, or the requestor's username or email."
     list_filter = ("status",)
 
 
@@ -122,30 +154,86 @@ class PetAdoptionAdmin(admin.ModelAdmin):
 # Notification Admin
 # -------------------------
 @admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
+class NotificationAdmin(LargeTableAdmin):
     list_display = ("sender", "content", "is_read")
-    search_fields = ("sender__username", "content")
+    list_select_related = ("sender", "receiver")  # both used by __str__
+    raw_id_fields = ("sender", "receiver", "pet", "report")
+    # Substring search over content would scan every row; match on the indexed sender columns
+    search_fields = ("^sender__username", "^sender__email")
+    search_help_text = "Start of the sender's username or email."
     list_filter = ("is_read",)
 
 
 @admin.register(UserReport)
-class UserReportAdmin(admin.ModelAdmin):
+class UserReportAdmin(LargeTableAdmin):
     # Change 'user' to 'pet_report_creator' in this list
     list_display = ('id', 'pet_report', 'pet_report_creator', 'report_type', 'report_status', 'created_by')
-    
+    list_select_related = ('pet_report__pet', 'pet_report_creator', 'created_by')
+    autocomplete_fields = ('pet_report', 'pet_report_creator')
+
     # Also update any other places that might reference 'user'
     list_filter = ('report_status', 'report_type')
-    search_fields = ('pet_report_petname', 'pet_report_creator_email') # Check if you have search_fields
+    search_fields = ('^pet_report__pet__name', '^pet_report_creator__email')
+    search_help_text = "Start of the pet's name or the report creator's email."
 
 
 @admin.register(FeedbackStory)
-class FeedbackStoryAdmin(admin.ModelAdmin):
+class FeedbackStoryAdmin(LargeTableAdmin):
     list_display = ("id", "user", "title", "pet_name", "submitted_at", "has_image")
-    list_filter = ("submitted_at", "user")
-    search_fields = ("title", "story", "pet_name", "user__user__username")  # user__user if Profile links to User
+    list_select_related = ("user",)
+    # A "user" filter would list every profile in the sidebar; search by user instead
+    list_filter = ("submitted_at",)
+    raw_id_fields = ()
+    autocomplete_fields = ("user",)
+    search_fields = ("^user__username", "^user__email")
+    search_help_text = "Start of the author's username or email."
     readonly_fields = ("submitted_at",)
     
     def has_image(self, obj):
         return bool(obj.image)
     has_image.boolean = True
-    has_image.short_description = "Image Uploaded"
\ No newline at end of file
+    has_image.short_description = "Image Uploaded"
+
+
+class ScheduledJobForm(forms.ModelForm):
+    class Meta:
+        model = ScheduledJob
+        fields = ("schedule", "enabled")
+
+    def clean_schedule(self):
+        from .scheduler import Cron, ScheduleError
+        try:
+            Cron(self.cleaned_data["schedule"])
+        except ScheduleError as e:
+            raise forms.ValidationError(str(e))
+        return self.cleaned_data["schedule"]
+
+
+@admin.register(ScheduledJob)
+class ScheduledJobAdmin(admin.ModelAdmin):
+    form = ScheduledJobForm
+    list_display = ("name", "schedule", "enabled", "next_run_at", "last_run_at", "last_status")
+    list_filter = ("enabled", "last_status")
+    readonly_fields = ("name", "next_run_at", "last_run_at", "last_status", "locked_until", "locked_by")
+
+    def has_add_permission(self, request):
+        return False  # rows come from the @job registrations
+
+    def save_model(self, request, obj, form, change):
+        if "schedule" in form.changed_data or "enabled" in form.changed_data:
+            from .scheduler import Cron
+            obj.next_run_at = Cron(obj.schedule).next_after(timezone.now())
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(JobRun)
+class JobRunAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_display = ("job", "status", "node", "started_at", "duration_ms")
+    list_select_related = ("job",)
+    list_filter = ("status", "job")
+    readonly_fields = ("job", "node", "status", "started_at", "finished_at", "duration_ms", "result")
+
+    def has_add_permission(self, request):
+        return False
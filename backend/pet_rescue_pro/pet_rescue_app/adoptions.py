@@ -0,0 +1,125 @@
+# pet_rescue_app/adoptions.py
+"""
+Adoption decisions.
+
+Every approve/reject goes through decide(), which runs in one transaction
+holding row locks on the pet and all of its adoption requests
+(SELECT ... FOR UPDATE, in id order), so two admins deciding on the same pet
+are serialized. Approving a request rejects the pet's other pending
+requests and marks its found reports resolved, which takes it off the
+adoptable list. Rejecting or reopening the approved request puts the pet
+back. Every requestor affected is notified in a single bulk insert.
+
+The partial unique constraint on PetAdoption (one "Approved" row per pet)
+enforces the same rule at the database level.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .caching import app_cache
+from .changefeed import record
+from .models import Notification, Pet, PetAdoption, PetReport
+from .signals import UNREAD_COUNT_NAMESPACE
+
+APPROVED, REJECTED, PENDING = "Approved", "Rejected", "Pending"
+
+
+class AdoptionDecisionError(Exception):
+    """A decision that cannot be applied; status is the HTTP status to answer with."""
+
+    def __init__(self, message, status=409):
+        self.message = message
+        self.status = status
+        super().__init__(message)
+
+
+def _targets(requests, adoption_id, status):
+    if adoption_id is not None:
+        for adoption in requests:
+            if adoption.id == adoption_id:
+                return [adoption]
+        raise AdoptionDecisionError("Adoption request not found", status=404)
+    if status == PENDING:
+        raise AdoptionDecisionError("Pass adoption_id to reopen a request", status=400)
+
+    pending = [adoption for adoption in requests if adoption.status == PENDING]
+    if not pending:
+        if len(requests) == 1:
+            return requests  # a single, already decided request can still be changed
+        raise AdoptionDecisionError("Adoption request not found", status=404)
+    if status == APPROVED and len(pending) > 1:
+        raise AdoptionDecisionError(
+            "This pet has several pending adoption requests; pass adoption_id to approve one", status=400
+        )
+    return pending
+
+
+def decide(pet_id, status, decided_by, adoption_id=None):
+    """
+    Set the status of a pet's adoption request(s) under row locks: approve
+    one, reject, or reopen (Pending).
+
+    Without adoption_id, approving needs exactly one pending request and
+    rejecting applies to all pending ones. Returns the list of PetAdoption
+    rows whose status changed. Raises AdoptionDecisionError.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        try:
+            pet = Pet.objects.select_for_update().get(pk=pet_id)
+        except Pet.DoesNotExist:
+            raise AdoptionDecisionError("Pet not found", status=404)
+        requests = list(PetAdoption.objects.select_for_update().filter(pet=pet).order_by("id"))
+        targets = _targets(requests, adoption_id, status)
+
+        current = {adoption.id: adoption.status for adoption in requests}
+        if status == APPROVED:
+            approved = targets[0]
+            if any(value == APPROVED and pk != approved.id for pk, value in current.items()):
+                raise AdoptionDecisionError("This pet has already been adopted")
+            decisions = {pk: REJECTED for pk, value in current.items() if value == PENDING}
+            decisions[approved.id] = APPROVED
+        else:
+            decisions = {adoption.id: status for adoption in targets}
+        decisions = {pk: value for pk, value in decisions.items() if current[pk] != value}
+
+        for new_status in (APPROVED, REJECTED, PENDING):
+            ids = [pk for pk, value in decisions.items() if value == new_status]
+            if ids:
+                PetAdoption.objects.filter(pk__in=ids).update(
+                    status=new_status, modified_by=decided_by, modified_date=now
+                )
+
+        # Availability: a found pet is adoptable while its found report is unresolved
+        found_reports = PetReport.objects.filter(pet=pet, pet_status="Found")
+        if APPROVED in decisions.values():
+            record(found_reports.only("id"))
+            found_reports.update(is_resolved=True)
+        elif any(current[pk] == APPROVED for pk in decisions):
+            record(found_reports.only("id"))
+            found_reports.update(is_resolved=False)
+
+        updated = []
+        for adoption in requests:
+            if adoption.id in decisions:
+                adoption.status = decisions[adoption.id]
+                adoption.modified_by = decided_by
+                adoption.modified_date = now
+                updated.append(adoption)
+
+        notifications = Notification.objects.bulk_create([
+            Notification(
+                sender=decided_by,
+                receiver_id=adoption.requestor_id,
+                content=f"Your adoption request is {adoption.status.lower()}",
+                pet=pet,
+            )
+            for adoption in updated
+        ])
+        # update() and bulk_create() skip the signals that feed the change log and
+        # drop the cached unread counts
+        record(updated)
+        record(notifications)
+        receivers = {adoption.requestor_id for adoption in updated}
+        transaction.on_commit(lambda: app_cache.delete_many(UNREAD_COUNT_NAMESPACE, receivers))
+    return updated
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PetRescueAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pet_rescue_app'
+
+    def ready(self):
+        from . import identity, signals  # noqa: F401
+        identity.install()
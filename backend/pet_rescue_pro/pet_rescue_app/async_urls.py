@@ -0,0 +1,12 @@
+from django.urls import path
+
+from . import async_views
+
+# Same paths and names as in urls.py; included first when ASYNC_READ_VIEWS is on
+urlpatterns = [
+    path("pets-list/", async_views.pets_list, name="pets-list"),
+    path("get-notifications/", async_views.user_notifications, name="user-notifications"),
+    path("profile_details/", async_views.profile_details, name="profile-details"),
+    path("admin/notifications/unread-count/", async_views.admin_unread_count, name="admin-unread-count"),
+    path("pets/recent/", async_views.recent_pets, name="recent-pets"),
+]
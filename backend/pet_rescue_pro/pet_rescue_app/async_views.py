@@ -0,0 +1,162 @@
+# pet_rescue_app/async_views.py
+"""
+Async variants of the busiest read endpoints, for ASGI deployments.
+
+Each view answers exactly like its DRF counterpart (same URL, same status
+codes and bodies) but waits on the database through the async ORM, so one
+worker can keep many slow requests in flight instead of one per thread:
+
+    pets-list/                       PetsListAPIView
+    get-notifications/               UserNotificationsAPIView
+    profile_details/                 ProfileViewSet.profile_details
+    admin/notifications/unread-count/  AdminUnreadNotificationCountAPIView
+    pets/recent/                     RecentPetsAPIView
+
+They are routed ahead of the DRF views when ASYNC_READ_VIEWS is on (the
+default under asgi.py, see async_urls.py). Lists stream through the fast
+serializers; ?fields=/?expand= requests fall back to the DRF serializers in
+a thread.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.settings import api_settings
+
+from .caching import app_cache
+from .fast_serializers import (
+    NotificationFastSerializer, PetAdoptionListFastSerializer, PetFastSerializer, PetReportFastSerializer,
+)
+from .fieldsets import request_spec, sparse_serializer
+from .models import Notification, Pet, PetAdoption, PetReport, Profile
+from .renderers import astream_json_response, dumps
+from .serializers import (
+    NotificationSerializer, PetAdoptionListSerializer, PetReportSerializer, PetSerializer, ProfileSerializer,
+)
+from .signals import UNREAD_COUNT_NAMESPACE
+
+
+
+def json_response(data, status=200):
+    return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+
+def _authenticators():
+    return [authenticator_class() for authenticator_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+
+
+def _unauthorized(detail):
+    response = json_response(detail if isinstance(detail, dict) else {"detail": detail}, status=401)
+    header = _authenticators()[0].authenticate_header(None)
+    if header:
+        response["WWW-Authenticate"] = header
+    return response
+
+
+def _authenticate(request):
+    for authenticator in _authenticators():
+        user_auth = authenticator.authenticate(request)
+        if user_auth is not None:
+            return user_auth[0]
+    return None
+
+
+async def authenticate(request):
+    """
+    The request's user (None if it sent no credentials), from the same
+    DEFAULT_AUTHENTICATION_CLASSES the DRF views use, run in a thread: token
+    checks, user lookup and the identity map stay in one place.
+    """
+    return await sync_to_async(_authenticate)(request)
+
+
+def async_api(login_required=True):
+    """
+    Decorator for async GET views: DRF authentication (sets request.user, or
+    None) and DRF's 401/405 responses.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return json_response({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+            try:
+                request.user = await authenticate(request)
+            except AuthenticationFailed as exc:
+                return _unauthorized(exc.detail)
+            if login_required and request.user is None:
+                return _unauthorized("Authentication credentials were not provided.")
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+async def list_response(fast_class, serializer_class, queryset, request, key=None):
+    """Async fast_serializers.list_response()."""
+    if request_spec(request) is not None:
+        data = await sync_to_async(lambda: sparse_serializer(serializer_class, queryset, request).data)()
+        return json_response({key: data} if key else data)
+    serializer = await fast_class.for_async(request)
+    return astream_json_response(serializer.aiter_serialize(queryset), key=key)
+
+
+@async_api()
+async def pets_list(request):
+    tab = request.GET.get("tab")
+    if not tab:
+        return json_response({"error": "Tab parameter is required"}, status=400)
+
+    if tab.lower() == "lost":
+        reports = PetReport.objects.filter(pet_status="Lost", report_status="Accepted")
+        return await list_response(PetReportFastSerializer, PetReportSerializer, reports, request, key="results")
+
+    elif tab.lower() == "found":
+        reports = PetReport.objects.filter(pet_status="Found", report_status="Accepted")
+        return await list_response(PetReportFastSerializer, PetReportSerializer, reports, request, key="results")
+
+    elif tab.lower() == "adopt":
+        adoptions = PetAdoption.objects.filter(status="Approved")
+        return await list_response(
+            PetAdoptionListFastSerializer, PetAdoptionListSerializer, adoptions, request, key="results"
+        )
+
+    return json_response({"error": "Invalid tab value"}, status=400)
+
+
+@async_api()
+async def user_notifications(request):
+    notifications = Notification.objects.filter(receiver=request.user).order_by("-created_at")
+    return await list_response(
+        NotificationFastSerializer, NotificationSerializer, notifications, request, key="notifications"
+    )
+
+
+@async_api()
+async def profile_details(request):
+    try:
+        profile = await Profile.objects.aget(email=request.user.email)
+    except Profile.DoesNotExist:
+        return json_response({"detail": "User not found"}, status=404)
+    return json_response(ProfileSerializer(profile, context={"request": request}).data)
+
+
+@async_api()
+async def admin_unread_count(request):
+    if not request.user.is_superuser:
+        return json_response({"detail": "Unauthorized"}, status=403)
+
+    # Same shared-tier counter as the sync view; the cache backend itself is sync-only
+    unread_count = await sync_to_async(app_cache.get)(UNREAD_COUNT_NAMESPACE, request.user.id, local=False)
+    if unread_count is None:
+        unread_count = await Notification.objects.filter(is_read=False, receiver=request.user).acount()
+        await sync_to_async(app_cache.set)(
+            UNREAD_COUNT_NAMESPACE, request.user.id, unread_count, timeout=300, local=False
+        )
+    return json_response({"unread_count": unread_count})
+
+
+@async_api(login_required=False)
+async def recent_pets(request):
+    pets = Pet.objects.all().order_by("-created_date")[:10]
+    return await list_response(PetFastSerializer, PetSerializer, pets, request, key="recent_pets")
@@ -0,0 +1,131 @@
+# pet_rescue_app/benchmarks.py
+"""Shared fixtures and request drivers for the bench_* management commands."""
+import asyncio
+import io
+import sys
+
+from .models import Notification, Pet, PetAdoption, PetReport, PetType, Profile, RewardPoint
+
+
+def populate_bench_rows(rows):
+    """
+    Create `rows` profiles, pets, reports, adoptions, notifications and reward
+    points with a realistic mix of empty images and null relations. Callers
+    run it inside a transaction they roll back, or clean up with
+    delete_bench_rows().
+    """
+    users = Profile.objects.bulk_create([
+        Profile(username=f"bench-{i}", email=f"bench-{i}@example.com", password="!",
+                pincode=400000 + i, profile_image=f"profile_images/p{i}.png" if i % 2 else None)
+        for i in range(rows)
+    ])
+    pet_type, _ = PetType.objects.get_or_create(type="Dog")
+    pets = Pet.objects.bulk_create([
+        Pet(name=f"Pet {i}", pet_type=pet_type, breed="Mixed", age=i % 15, city="Pune",
+            image=None if i % 10 == 0 else f"pet_images/pet {i}.jpg",
+            created_by=users[i % 50], modified_by=users[i % 50] if i % 3 else None)
+        for i in range(rows)
+    ])
+    # One to three reports per pet, so the pet image fallback has several to choose from
+    reports = PetReport.objects.bulk_create([
+        PetReport(pet=pet, user=users[(i + n) % 50], pet_status="Lost" if i % 2 else "Found",
+                  report_status="Accepted" if n == 0 else "Pending",
+                  image=f"report_images/r{i}-{n}.jpg" if (i + n) % 4 else None,
+                  created_by=users[(i + n) % 50], modified_by=users[(i + n) % 50])
+        for i, pet in enumerate(pets)
+        for n in range(1 + i % 3)
+    ])
+    PetAdoption.objects.bulk_create([
+        PetAdoption(pet=pet, requestor=users[(i + 1) % 50], message="Please", status="Approved",
+                    created_by=users[(i + 1) % 50], modified_by=users[(i + 1) % 50])
+        for i, pet in enumerate(pets)
+    ])
+    Notification.objects.bulk_create([
+        Notification(sender=users[i % 50], receiver=users[0] if i % 5 else None, content=f"Update {i}",
+                     pet=pets[i] if i % 7 else None, report=reports[i] if i % 2 else None)
+        for i in range(rows)
+    ])
+    RewardPoint.objects.bulk_create([
+        RewardPoint(user=user, points=i % 700, badge="Silver", reason="Rescued pets")
+        for i, user in enumerate(users)
+    ])
+
+
+def delete_bench_rows():
+    """Remove what populate_bench_rows() created, for benchmarks that must commit their rows."""
+    users = Profile.objects.filter(username__startswith="bench-", email__endswith="@example.com")
+    Pet.objects.filter(created_by__in=users).delete()  # with their reports and adoptions
+    users.delete()  # with their notifications and reward points
+
+
+def wsgi_get(application, url, query, headers):
+    """One GET through the WSGI application, the way a WSGI server would call it."""
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "SCRIPT_NAME": "",
+        "PATH_INFO": url,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "REMOTE_ADDR": "127.0.0.1",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+        **headers,
+    }
+    status = None
+
+    def start_response(status_line, response_headers, exc_info=None):
+        nonlocal status
+        status = int(status_line.split(" ", 1)[0])
+
+    result = application(environ, start_response)
+    try:
+        body = b"".join(result)
+    finally:
+        result.close()
+    return status, body
+
+
+async def asgi_get(application, url, query, headers):
+    """One GET through the ASGI application, the way an ASGI server would call it."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": url,
+        "raw_path": url.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    pending = [{"type": "http.request", "body": b"", "more_body": False}]
+    disconnected = asyncio.Event()
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    status, chunks = None, []
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await application(scope, receive, send)
+    disconnected.set()
+    return status, b"".join(chunks)
@@ -0,0 +1,209 @@
+# pet_rescue_app/bulk_import.py
+"""
+Bulk pet import for shelters and partner organisations.
+
+Accepts CSV or JSON rows (plus an optional zip of images), validates them in
+batches, resolves the valid rows' pet types in one pass and writes Pets,
+PetReports and PetMedicalHistory rows with bulk_create inside a single
+transaction. Invalid rows are skipped and returned in a per-row error report.
+"""
+import csv
+import io
+import json
+import os
+import zipfile
+from collections import Counter
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from rest_framework import serializers
+
+from .changefeed import record
+from .models import Notification, Pet, PetMedicalHistory, PetReport, PetType, Profile
+from .pet_types import display_pet_type, normalize_pet_type, pet_type_registry
+from .storage import acquire
+
+IMPORT_CHUNK_SIZE = 500
+IMPORT_MAX_ROWS = getattr(settings, "PET_IMPORT_MAX_ROWS", 5000)
+
+PET_FIELDS = [
+    "name", "gender", "breed", "color", "age", "weight", "description",
+    "address", "state", "city", "pincode", "is_diseased", "is_vaccinated",
+]
+MEDICAL_FIELDS = ["last_vaccinated_date", "vaccination_name", "disease_name", "stage", "no_of_years"]
+
+
+class BulkPetRowSerializer(serializers.Serializer):
+    """One import row: pet details, report status, optional medical history and image file name."""
+    name = serializers.CharField(max_length=100)
+    pet_type = serializers.CharField(max_length=50)
+    pet_status = serializers.ChoiceField(choices=["Lost", "Found"])
+    gender = serializers.ChoiceField(choices=["Male", "Female"], required=False, allow_blank=True, allow_null=True)
+    breed = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    color = serializers.CharField(max_length=50, required=False, allow_blank=True, allow_null=True)
+    age = serializers.IntegerField(required=False, allow_null=True)
+    weight = serializers.IntegerField(required=False, allow_null=True)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    address = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    state = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    city = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    pincode = serializers.IntegerField(required=False, allow_null=True)
+    is_diseased = serializers.BooleanField(required=False, default=False)
+    is_vaccinated = serializers.BooleanField(required=False, default=False)
+    last_vaccinated_date = serializers.DateField(required=False, allow_null=True)
+    vaccination_name = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    disease_name = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    stage = serializers.IntegerField(required=False, allow_null=True)
+    no_of_years = serializers.IntegerField(required=False, allow_null=True)
+    image = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def validate_pet_type(self, value):
+        # Names are stored in display form, which has to fit PetType.type too
+        if len(display_pet_type(value)) > PetType._meta.get_field("type").max_length:
+            raise serializers.ValidationError("Pet type name is too long.")
+        return value
+
+    def to_internal_value(self, data):
+        # CSV cells are always strings; treat empty cells as missing values
+        data = {key: value for key, value in data.items() if value not in ("", None)}
+        return super().to_internal_value(data)
+
+
+def parse_rows(upload, fmt=None):
+    """Read rows from an uploaded/opened CSV or JSON file."""
+    name = getattr(upload, "name", "") or ""
+    fmt = fmt or ("json" if name.lower().endswith(".json") else "csv")
+    raw = upload.read()
+    text = raw.decode("utf-8-sig") if isinstance(raw, bytes) else raw
+
+    if fmt == "json":
+        payload = json.loads(text)
+        rows = payload.get("pets", []) if isinstance(payload, dict) else payload
+        if not isinstance(rows, list):
+            raise ValueError("JSON import must be a list of pets or {\"pets\": [...]}")
+        return rows
+
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+class PetBulkImporter:
+    def __init__(self, user, images=None, chunk_size=IMPORT_CHUNK_SIZE):
+        self.user = user
+        self.chunk_size = chunk_size
+        self.images = zipfile.ZipFile(images) if images else None
+        self._image_names = (
+            {os.path.basename(n): n for n in self.images.namelist() if not n.endswith("/")}
+            if self.images else {}
+        )
+        self._stored_images = {}
+        self._image_refs = Counter()
+        self.pet_types = {}
+
+    # ---------------- helpers ----------------
+    def _store_image(self, filename):
+        """Write a zip member to storage once and return its storage name."""
+        if filename not in self._stored_images:
+            data = self.images.read(self._image_names[filename])
+            self._stored_images[filename] = default_storage.save(f"pet_images/{filename}", ContentFile(data))
+        return self._stored_images[filename]
+
+    def _validate(self, rows, offset):
+        valid, errors = [], []
+        for index, row in enumerate(rows, start=offset + 1):
+            serializer = BulkPetRowSerializer(data=row)
+            if not serializer.is_valid():
+                errors.append({"row": index, "errors": serializer.errors})
+                continue
+            data = serializer.validated_data
+            image = data.get("image")
+            if image and image not in self._image_names:
+                errors.append({"row": index, "errors": {"image": [f"'{image}' not found in images archive."]}})
+                continue
+            valid.append((index, data))
+        return valid, errors
+
+    def _write_chunk(self, valid):
+        user = self.user
+        pets = []
+        for _, data in valid:
+            pet = Pet(
+                pet_type_id=self.pet_types[normalize_pet_type(data["pet_type"])],
+                created_by=user,
+                modified_by=user,
+                **{field: data.get(field) for field in PET_FIELDS if field in data},
+            )
+            if data.get("image"):
+                pet.image.name = self._store_image(data["image"])
+            pets.append(pet)
+        Pet.objects.bulk_create(pets)
+
+        reports, medical = [], []
+        for pet, (_, data) in zip(pets, valid):
+            report = PetReport(
+                pet=pet, user=user, pet_status=data["pet_status"],
+                created_by=user, modified_by=user,
+            )
+            if pet.image:
+                # Same stored file backs both the pet and its report
+                report.image.name = pet.image.name
+                self._image_refs[pet.image.name] += 2
+            reports.append(report)
+
+            if pet.is_vaccinated or pet.is_diseased:
+                medical.append(PetMedicalHistory(
+                    pet=pet, created_by=user, modified_by=user,
+                    **{field: data.get(field) for field in MEDICAL_FIELDS},
+                ))
+        PetReport.objects.bulk_create(reports)
+        PetMedicalHistory.objects.bulk_create(medical)
+        record(pets)  # bulk_create() skips the change log signals
+        record(reports)
+        return pets
+
+    # ---------------- entry point ----------------
+    def run(self, rows):
+        if len(rows) > IMPORT_MAX_ROWS:
+            return {
+                "created": 0,
+                "failed": len(rows),
+                "errors": [{"row": None, "errors": {"file": [f"At most {IMPORT_MAX_ROWS} rows per import."]}}],
+                "pet_ids": [],
+            }
+
+        errors, valid = [], []
+        for offset in range(0, len(rows), self.chunk_size):
+            batch = [row if isinstance(row, dict) else {} for row in rows[offset:offset + self.chunk_size]]
+            batch_valid, batch_errors = self._validate(batch, offset)
+            valid.extend(batch_valid)
+            errors.extend(batch_errors)
+
+        pet_ids = []
+        with transaction.atomic():
+            # Resolve each distinct type name of the valid rows once through the normalized registry.
+            # Inside the transaction: types created here go away if the import rolls back.
+            resolved = pet_type_registry.resolve_many({data["pet_type"] for _, data in valid})
+            self.pet_types = {normalize_pet_type(name): pet_type_id for name, pet_type_id in resolved.items()}
+
+            for offset in range(0, len(valid), self.chunk_size):
+                pet_ids.extend(pet.id for pet in self._write_chunk(valid[offset:offset + self.chunk_size]))
+
+            # save() counted one reference per stored image; add the rest
+            for name, refs in self._image_refs.items():
+                acquire(name, refs - 1)
+
+            if pet_ids:
+                admin_user = Profile.objects.filter(is_superuser=True).first()
+                Notification.objects.create(
+                    sender=self.user,
+                    receiver=admin_user,
+                    content=f"Bulk import by {self.user.username}: {len(pet_ids)} new pet reports awaiting review.",
+                )
+
+        return {
+            "created": len(pet_ids),
+            "failed": len(errors),
+            "errors": errors,
+            "pet_ids": pet_ids,
+        }
@@ -0,0 +1,215 @@
+# pet_rescue_app/caching.py
+"""
+Two-tier cache used by every caching feature in the app.
+
+Tier 1 is a small, bounded LRU inside each worker process.
+Tier 2 is the shared Django cache configured in settings.CACHES (database
+cache table by default, Redis when REDIS_URL is set), so every worker sees
+the same entries.
+
+Keys are grouped into namespaces. Each namespace has a version number
+stored in the shared tier; invalidate(namespace) bumps it, and every worker
+picks up the new version within VERSION_CHECK_INTERVAL seconds, after which
+its old local and shared entries are simply never read again. Version keys
+live in the same size-capped backend as everything else; one that is
+culled or evicted comes back seeded with the current time in nanoseconds,
+never with a number a worker may still hold.
+
+delete() removes one key from this worker and the shared tier only; other
+workers may serve their local copy for up to LOCAL_TTL seconds. Pass
+local=False for values that must always be read from the shared tier
+(counters, anything that is deleted rather than namespace-invalidated).
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+DEFAULTS = {
+    "ALIAS": "default",
+    "LOCAL_MAX_ENTRIES": 2048,
+    "LOCAL_TTL": 30,
+    "VERSION_CHECK_INTERVAL": 1.0,
+}
+
+
+class TwoTierCache:
+    def __init__(self, alias="default", local_max_entries=2048, local_ttl=30, version_check_interval=1.0):
+        self.alias = alias
+        self.local_max_entries = local_max_entries
+        self.local_ttl = local_ttl
+        self.version_check_interval = version_check_interval
+        self._lock = threading.Lock()
+        self._local = OrderedDict()  # full key -> (value, expires_at)
+        self._versions = {}          # namespace -> (version, checked_at)
+        self._stats = {
+            "local_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    # ---------------- namespace versions ----------------
+    def _version_key(self, namespace):
+        return f"nsv:{namespace}"
+
+    def namespace_version(self, namespace):
+        """Current version of a namespace, re-read from the shared tier at most once per interval."""
+        now = time.monotonic()
+        cached = self._versions.get(namespace)
+        if cached and now - cached[1] < self.version_check_interval:
+            return cached[0]
+
+        version = self.shared.get(self._version_key(namespace))
+        if version is None:
+            seed = time.time_ns()
+            self.shared.add(self._version_key(namespace), seed, timeout=None)
+            version = self.shared.get(self._version_key(namespace), seed)
+        self._versions[namespace] = (version, now)
+        return version
+
+    def invalidate(self, namespace):
+        """Drop every key in a namespace, for all workers."""
+        try:
+            version = self.shared.incr(self._version_key(namespace))
+        except ValueError:  # evicted: a fresh seed also differs from every version handed out before
+            version = time.time_ns()
+            self.shared.set(self._version_key(namespace), version, timeout=None)
+        self._versions[namespace] = (version, time.monotonic())
+        self._bump("invalidations")
+        return version
+
+    def _full_key(self, namespace, key):
+        return f"{namespace}:v{self.namespace_version(namespace)}:{key}"
+
+    # ---------------- local tier ----------------
+    def _bump(self, stat, n=1):
+        with self._lock:
+            self._stats[stat] += n
+
+    def _local_get(self, full_key):
+        with self._lock:
+            entry = self._local.get(full_key, _MISSING)
+            if entry is _MISSING:
+                return _MISSING
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._local[full_key]
+                return _MISSING
+            self._local.move_to_end(full_key)
+            self._stats["local_hits"] += 1
+            return value
+
+    def _local_set(self, full_key, value):
+        with self._lock:
+            self._local[full_key] = (value, time.monotonic() + self.local_ttl)
+            self._local.move_to_end(full_key)
+            while len(self._local) > self.local_max_entries:
+                self._local.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _local_delete(self, full_key):
+        with self._lock:
+            self._local.pop(full_key, None)
+
+    # ---------------- public API ----------------
+    def get(self, namespace, key, default=None, local=True):
+        full_key = self._full_key(namespace, key)
+        if local:
+            value = self._local_get(full_key)
+            if value is not _MISSING:
+                return value
+
+        value = self.shared.get(full_key, _MISSING)
+        if value is _MISSING:
+            self._bump("misses")
+            return default
+
+        self._bump("shared_hits")
+        if local:
+            self._local_set(full_key, value)
+        return value
+
+    def set(self, namespace, key, value, timeout=None, local=True):
+        full_key = self._full_key(namespace, key)
+        self.shared.set(full_key, value, timeout=timeout)
+        if local:
+            self._local_set(full_key, value)
+        self._bump("sets")
+
+    def get_or_set(self, namespace, key, default, timeout=None, local=True):
+        """Return the cached value, computing it with default() on a miss."""
+        value = self.get(namespace, key, _MISSING, local=local)
+        if value is _MISSING:
+            value = default() if callable(default) else default
+            self.set(namespace, key, value, timeout=timeout, local=local)
+        return value
+
+    def delete(self, namespace, key):
+        full_key = self._full_key(namespace, key)
+        self._local_delete(full_key)
+        self.shared.delete(full_key)
+
+    def delete_many(self, namespace, keys):
+        full_keys = [self._full_key(namespace, key) for key in keys]
+        for full_key in full_keys:
+            self._local_delete(full_key)
+        self.shared.delete_many(full_keys)
+
+    def stats(self):
+        """Per-worker hit/miss/eviction counters plus current local size."""
+        with self._lock:
+            data = dict(self._stats)
+            data["local_entries"] = len(self._local)
+        lookups = data["local_hits"] + data["shared_hits"] + data["misses"]
+        data["hit_ratio"] = round((data["local_hits"] + data["shared_hits"]) / lookups, 4) if lookups else None
+        return data
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+        self._versions.clear()
+
+
+def _build_from_settings():
+    conf = {**DEFAULTS, **getattr(settings, "TWO_TIER_CACHE", {})}
+    return TwoTierCache(
+        alias=conf["ALIAS"],
+        local_max_entries=conf["LOCAL_MAX_ENTRIES"],
+        local_ttl=conf["LOCAL_TTL"],
+        version_check_interval=conf["VERSION_CHECK_INTERVAL"],
+    )
+
+
+app_cache = _build_from_settings()
+
+
+def invalidate_on_commit(func, *args):
+    """
+    Run a cache invalidation such as app_cache.delete once the current
+    transaction commits (immediately outside one). A failing shared tier is
+    logged: a cache outage must never fail or roll back the write itself.
+    Waiting for the commit also keeps a concurrent reader from caching the
+    pre-commit value again right after the delete.
+    """
+    def run():
+        try:
+            func(*args)
+        except Exception:
+            logger.exception("Cache invalidation %s%r failed", getattr(func, "__qualname__", func), args)
+
+    transaction.on_commit(run)
@@ -0,0 +1,201 @@
+# pet_rescue_app/changefeed.py
+"""
+Incremental change feed for client sync (GET /api/changes/?since=<cursor>).
+
+Saves and deletes of the synced models append a ChangeLogEntry in the same
+transaction (signals.py). Paths that bypass signals (QuerySet.update(),
+bulk_create()) call record() themselves. Entry ids are the cursor:
+
+    GET changes/                 -> {"changes": [], "cursor": 812, "has_more": false}
+    GET changes/?since=812       -> {"changes": [{"cursor": 815, "type": "pet", "id": 7,
+                                                  "op": "upsert", "data": {...}}, ...],
+                                     "cursor": 815, "has_more": false}
+
+A client takes a cursor before fetching the full collections, then polls
+with the last cursor it got. Within a page only the latest event per object
+is returned, with the object as its list endpoint would show it. Upserts of
+objects deleted since are sent as deletes.
+
+Ids are handed out at insert and become visible at commit, so a slow
+transaction can commit a lower id after a higher one was served. Entries
+younger than CHANGE_FEED_SETTLE_SECONDS are therefore held back.
+
+compact() keeps the log small:
+- It drops entries superseded by a newer event for the same object. A
+  client never needs those.
+- It expires entries older than CHANGE_LOG_RETENTION_DAYS and records the
+  horizon. A cursor below the horizon gets 410 and must resync.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Exists, Max, OuterRef, Q
+from django.utils import timezone
+
+from .models import (
+    ChangeLogCompaction, ChangeLogEntry, FeedbackStory, Notification, Pet, PetAdoption, PetReport, SavedSearch,
+    UserReport,
+)
+
+UPSERT, DELETE = "upsert", "delete"
+DEFAULT_LIMIT = 200
+MAX_LIMIT = 1000
+
+TRACKED = {
+    Pet: "pet",
+    PetReport: "pet_report",
+    PetAdoption: "pet_adoption",
+    Notification: "notification",
+    UserReport: "user_report",
+    FeedbackStory: "feedback_story",
+    SavedSearch: "saved_search",
+}
+
+
+class CursorExpired(Exception):
+    """The cursor is older than the compaction horizon; the client has to refetch everything."""
+
+    def __init__(self, head):
+        self.head = head
+        super().__init__("Cursor is older than the change log retention; resync")
+
+
+def _audience(instance):
+    """(receiver_id, admin_only) for an instance's entries."""
+    if isinstance(instance, Notification):
+        # Notifications without a receiver are the admins' queue
+        return instance.receiver_id, instance.receiver_id is None
+    if isinstance(instance, UserReport):
+        return None, True
+    if isinstance(instance, SavedSearch):
+        return instance.user_id, False
+    return None, False
+
+
+def record(instances, op=UPSERT):
+    """Append one entry per instance (of the tracked models) in a single insert."""
+    entries = []
+    for instance in instances:
+        receiver_id, admin_only = _audience(instance)
+        entries.append(ChangeLogEntry(
+            model=TRACKED[type(instance)], object_id=instance.pk, op=op,
+            receiver_id=receiver_id, admin_only=admin_only,
+        ))
+    if entries:
+        ChangeLogEntry.objects.bulk_create(entries)
+
+
+def _settled():
+    settle = getattr(settings, "CHANGE_FEED_SETTLE_SECONDS", 2)
+    return ChangeLogEntry.objects.filter(created_at__lte=timezone.now() - timedelta(seconds=settle))
+
+
+def horizon():
+    return ChangeLogCompaction.objects.aggregate(horizon=Max("horizon"))["horizon"] or 0
+
+
+def head():
+    """The newest cursor a client can be handed."""
+    return _settled().aggregate(head=Max("id"))["head"] or horizon()
+
+
+def _visible_to(queryset, user):
+    if user.is_superuser:
+        return queryset
+    return queryset.filter(Q(receiver_id=user.id) | Q(receiver_id__isnull=True, admin_only=False))
+
+
+def _serializers():
+    from .fast_serializers import (
+        NotificationFastSerializer, PetAdoptionFastSerializer, PetFastSerializer, PetReportFastSerializer,
+    )
+    from .serializers import FeedbackStorySerializer, SavedSearchSerializer, UserReportSerializer
+
+    return {
+        "pet": (Pet, PetFastSerializer),
+        "pet_report": (PetReport, PetReportFastSerializer),
+        "pet_adoption": (PetAdoption, PetAdoptionFastSerializer),
+        "notification": (Notification, NotificationFastSerializer),
+        "user_report": (UserReport, UserReportSerializer),
+        "feedback_story": (FeedbackStory, FeedbackStorySerializer),
+        "saved_search": (SavedSearch, SavedSearchSerializer),
+    }
+
+
+def _payloads(request, wanted):
+    """{(type, id): data} for the objects still present, one query per type."""
+    payloads = {}
+    for feed_type, ids in wanted.items():
+        model, serializer_class = _serializers()[feed_type]
+        queryset = model.objects.filter(pk__in=ids)
+        if hasattr(serializer_class, "reader_class"):
+            rows = serializer_class(request).serialize(queryset)
+        else:
+            rows = serializer_class(queryset, many=True, context={"request": request}).data
+        payloads.update(((feed_type, row["id"]), row) for row in rows)
+    return payloads
+
+
+def read_changes(request, since, limit=DEFAULT_LIMIT):
+    """One page of the feed after `since` for request.user. Raises CursorExpired."""
+    if since < horizon():
+        raise CursorExpired(head())
+
+    entries = list(
+        _visible_to(_settled().filter(id__gt=since), request.user)
+        .order_by("id")
+        .values_list("id", "model", "object_id", "op")[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    latest = {}
+    for cursor, feed_type, object_id, op in entries:
+        latest.pop((feed_type, object_id), None)  # keep dict order = order of the latest events
+        latest[(feed_type, object_id)] = (cursor, op)
+
+    wanted = {}
+    for (feed_type, object_id), (_cursor, op) in latest.items():
+        if op == UPSERT:
+            wanted.setdefault(feed_type, []).append(object_id)
+    payloads = _payloads(request, wanted)
+
+    changes = []
+    for (feed_type, object_id), (cursor, op) in latest.items():
+        data = payloads.get((feed_type, object_id)) if op == UPSERT else None
+        change = {"cursor": cursor, "type": feed_type, "id": object_id, "op": op if data is not None else DELETE}
+        if data is not None:
+            change["data"] = data
+        changes.append(change)
+
+    return {
+        "changes": changes,
+        "cursor": entries[-1][0] if entries else max(since, 0),
+        "has_more": has_more,
+    }
+
+
+def compact(batch_size=1000):
+    """Drop superseded entries, then expire old ones. Returns (superseded, expired) counts."""
+    newer = ChangeLogEntry.objects.filter(model=OuterRef("model"), object_id=OuterRef("object_id"), id__gt=OuterRef("id"))
+    superseded = _delete_in_batches(ChangeLogEntry.objects.filter(Exists(newer)), batch_size)
+
+    cutoff = timezone.now() - timedelta(days=getattr(settings, "CHANGE_LOG_RETENTION_DAYS", 30))
+    expired_qs = ChangeLogEntry.objects.filter(created_at__lt=cutoff)
+    last_expired = expired_qs.aggregate(last=Max("id"))["last"]
+    expired = 0
+    if last_expired is not None:
+        # Record the horizon first: a client must not slip through while entries are going
+        run = ChangeLogCompaction.objects.create(horizon=last_expired, removed=0)
+        expired = _delete_in_batches(ChangeLogEntry.objects.filter(id__lte=last_expired), batch_size)
+        ChangeLogCompaction.objects.filter(pk=run.pk).update(removed=expired)
+    return superseded, expired
+
+
+def _delete_in_batches(queryset, batch_size):
+    removed = 0
+    while True:
+        ids = list(queryset.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return removed
+        removed += ChangeLogEntry.objects.filter(id__in=ids).delete()[0]
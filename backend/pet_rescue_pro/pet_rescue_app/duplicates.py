@@ -0,0 +1,133 @@
+# pet_rescue_app/duplicates.py
+"""
+Duplicate report detection at submission time.
+
+Each report gets up to two fingerprint keys, stored in ReportFingerprint
+(unique index on key):
+
+    attributes  reporter, lost/found, pet type, breed, color, gender and
+                pincode, normalized, plus the REPORT_DUPLICATE_WINDOW bucket
+                the report was filed in
+    image       lost/found plus the sha256 of the photo, which is already in
+                the name ContentAddressedStorage gave the file
+
+A new report is looked up by its keys (and the previous time bucket, so two
+reports on either side of a bucket boundary still match) in one indexed
+query; nothing scans the reporter's earlier reports. Matches against
+rejected or resolved reports are ignored.
+
+    same reporter   the submission is refused with DuplicateReportError
+    someone else    the report is kept and linked with duplicate_of, for
+                    example two rescuers photographing the same found dog
+
+Only reports that are not duplicates register their keys. A key held by a
+rejected or resolved report passes to the new report, so a repeat of the
+new one is caught again.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ReportFingerprint
+from .storage import is_content_addressed
+
+DEFAULT_WINDOW = 24 * 60 * 60  # seconds
+
+
+class DuplicateReportError(Exception):
+    """The reporter already filed this report; original is the earlier PetReport."""
+
+    def __init__(self, original, status=409):
+        self.original = original
+        self.status = status
+        super().__init__(f"You already reported this pet (report {original.id})")
+
+
+def _normalize(value):
+    return " ".join(str(value).split()).casefold() if value is not None else ""
+
+
+def _digest(*parts):
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+def _bucket(report):
+    window = getattr(settings, "REPORT_DUPLICATE_WINDOW", DEFAULT_WINDOW)
+    filed = report.created_date or timezone.now()
+    return int(filed.timestamp() // window)
+
+
+def attribute_key(report, bucket):
+    """Key of the report's normalized attributes in a time bucket, or None when too little is known."""
+    pet = report.pet
+    descriptive = [_normalize(pet.breed), _normalize(pet.color), _normalize(pet.pincode)]
+    if not any(descriptive):
+        return None  # reporter and pet type alone would match every other report of theirs
+    return _digest(
+        "attributes", str(report.user_id), report.pet_status, str(pet.pet_type_id),
+        *descriptive, _normalize(pet.gender), str(bucket),
+    )
+
+
+def image_key(report):
+    """Key of the report's photo (or its pet's), or None without a content-addressed image."""
+    name = (report.image.name if report.image else "") or (report.pet.image.name if report.pet.image else "")
+    if not is_content_addressed(name):
+        return None
+    sha256 = os.path.splitext(name.rsplit("/", 1)[-1])[0]
+    return _digest("image", report.pet_status, sha256)
+
+
+def report_keys(report):
+    """(keys to store, keys to look up) for a report."""
+    bucket = _bucket(report)
+    stored = [attribute_key(report, bucket), image_key(report)]
+    lookup = stored + [attribute_key(report, bucket - 1)]
+    return [key for key in stored if key], [key for key in lookup if key]
+
+
+def find_original(report):
+    """The earlier open report this one duplicates, or None."""
+    _stored, lookup = report_keys(report)
+    if not lookup:
+        return None
+    match = (
+        ReportFingerprint.objects.filter(key__in=lookup)
+        .exclude(report=report)
+        .exclude(report__report_status="Rejected")
+        .exclude(report__is_resolved=True)
+        .select_related("report")
+        .order_by("report_id")
+        .first()
+    )
+    return match.report if match else None
+
+
+def check_report(report):
+    """
+    Run duplicate detection on a report that was just saved, inside the
+    submission's transaction. Raises DuplicateReportError for a repeat by the
+    same reporter (the caller's rollback discards the report); links reports
+    matching someone else's; otherwise registers the report's keys.
+    """
+    original = find_original(report)
+    if original is not None:
+        if original.user_id == report.user_id:
+            raise DuplicateReportError(original)
+        report.duplicate_of = original
+        report.save(update_fields=["duplicate_of"])
+        return original
+
+    stored, _lookup = report_keys(report)
+    # A concurrent identical submission may have registered a key first; the earlier one stays
+    ReportFingerprint.objects.bulk_create(
+        [ReportFingerprint(key=key, report=report) for key in stored], ignore_conflicts=True
+    )
+    # Keys still held by closed reports (find_original skipped them) now belong to this one
+    ReportFingerprint.objects.filter(
+        Q(report__report_status="Rejected") | Q(report__is_resolved=True), key__in=stored
+    ).update(report=report)
+    return None
@@ -0,0 +1,181 @@
+# pet_rescue_app/fanout.py
+"""
+Bulk notification fan-out: one message to every profile of an audience
+(area alerts, announcements to adopters, reward milestones).
+
+    job = start("area", {"pincode_prefix": "5600"}, "Hi {username}, a dog was found near you", admin)
+
+start() only records a FanoutJob. After commit the job runs on the
+"fanout" integration pool (integrations.py), never in the request. A
+worker streams recipient ids with .iterator() in id order. It writes
+FANOUT_CHUNK_SIZE notifications per bulk_create and saves progress in the
+same transaction. It then drops those users' cached unread counts with
+one delete_many(). Memory stays at one chunk whatever the audience size,
+and a job that dies resumes after last_recipient_id (run_fanout_jobs picks
+up queued and stalled jobs).
+
+Audiences are named querysets of Profile registered with @audience, so
+the API never accepts arbitrary filters. Templates may use {username}.
+"""
+import logging
+import string
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from .caching import app_cache
+from .changefeed import record
+from .integrations import submit
+from .models import FanoutJob, Notification, PetAdoption, Profile
+from .signals import UNREAD_COUNT_NAMESPACE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+TEMPLATE_FIELDS = {"username"}
+
+audiences = {}
+
+
+class FanoutError(Exception):
+    """An audience, its parameters or a template that cannot be used."""
+
+    def __init__(self, message, status=400):
+        self.message = message
+        self.status = status
+        super().__init__(message)
+
+
+def audience(name):
+    """Register func(params) -> Profile queryset as a named audience."""
+    def register(func):
+        audiences[name] = func
+        return func
+    return register
+
+
+@audience("all_users")
+def _all_users(params):
+    return Profile.objects.filter(is_active=True)
+
+
+@audience("adopters")
+def _adopters(params):
+    approved = PetAdoption.objects.filter(requestor=OuterRef("pk"), status="Approved")
+    return Profile.objects.filter(Exists(approved), is_active=True)
+
+
+@audience("area")
+def _area(params):
+    """Profiles whose 6-digit pincode starts with pincode_prefix (an indexable range, not LIKE)."""
+    prefix = str(params.get("pincode_prefix", ""))
+    if not prefix.isdigit() or len(prefix) > 6:
+        raise FanoutError("area needs pincode_prefix: 1 to 6 digits")
+    scale = 10 ** (6 - len(prefix))
+    low = int(prefix) * scale
+    return Profile.objects.filter(pincode__gte=low, pincode__lt=low + scale, is_active=True)
+
+
+@audience("reward_tier")
+def _reward_tier(params):
+    try:
+        min_points = int(params.get("min_points"))
+    except (TypeError, ValueError):
+        raise FanoutError("reward_tier needs min_points")
+    return Profile.objects.filter(rewardpoint__points__gte=min_points, is_active=True)
+
+
+def recipients(job):
+    """The job's audience queryset, still to be notified, in id order."""
+    try:
+        build = audiences[job.audience]
+    except KeyError:
+        raise FanoutError(f"Unknown audience {job.audience!r}; one of {', '.join(sorted(audiences))}")
+    return build(job.params or {}).filter(id__gt=job.last_recipient_id).order_by("id")
+
+
+def validate_template(template):
+    try:
+        fields = {name for _, name, _, _ in string.Formatter().parse(template) if name is not None}
+    except ValueError as e:
+        raise FanoutError(f"Invalid template: {e}")
+    unknown = fields - TEMPLATE_FIELDS
+    if unknown:
+        raise FanoutError(f"Unknown template field(s) {', '.join(sorted(unknown))}; use {', '.join(sorted(TEMPLATE_FIELDS))}")
+
+
+def start(audience_name, params, template, sender, pet=None):
+    """Validate and queue a fan-out; it starts on the pool once the caller's transaction commits."""
+    validate_template(template)
+    job = FanoutJob(audience=audience_name, params=params or {}, template=template, pet=pet,
+                    created_by=sender, modified_by=sender)
+    recipients(job)  # unknown audiences and bad parameters fail here, not on the pool
+    job.save()
+    transaction.on_commit(lambda: submit("fanout", run_job, job.id))
+    return job
+
+
+def _claim(job_id, stale_after):
+    """Mark a queued (or stalled running) job as running; False if another worker has it."""
+    claimable = Q(status="queued")
+    if stale_after is not None:
+        claimable |= Q(status="running", modified_date__lt=timezone.now() - stale_after)
+    now = timezone.now()
+    return FanoutJob.objects.filter(claimable, pk=job_id).update(status="running", started_at=now, modified_date=now) == 1
+
+
+def run_job(job_id, chunk_size=None, stale_after=None):
+    """
+    Deliver a job chunk by chunk. Safe to call from a pool thread (closes its
+    database connection) or a management command. Returns the job.
+    """
+    chunk_size = chunk_size or getattr(settings, "FANOUT_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+    try:
+        if not _claim(job_id, stale_after):
+            return FanoutJob.objects.get(pk=job_id)
+        job = FanoutJob.objects.get(pk=job_id)
+        pending = recipients(job)
+        if job.total is None:
+            job.total = pending.count()
+            FanoutJob.objects.filter(pk=job.pk).update(total=job.total)
+
+        rows = pending.values_list("id", "username").iterator(chunk_size=chunk_size)
+        while chunk := list(islice(rows, chunk_size)):
+            _deliver(job, chunk)
+
+        FanoutJob.objects.filter(pk=job.pk).update(status="done", finished_at=timezone.now(), modified_date=timezone.now())
+    except Exception as e:
+        logger.exception("Fan-out job %s failed", job_id)
+        FanoutJob.objects.filter(pk=job_id).update(status="failed", error=str(e), modified_date=timezone.now())
+    finally:
+        connection.close()
+    return FanoutJob.objects.get(pk=job_id)
+
+
+def _deliver(job, chunk):
+    receiver_ids = [user_id for user_id, _ in chunk]
+    with transaction.atomic():
+        notifications = Notification.objects.bulk_create([
+            Notification(sender_id=job.created_by_id, receiver_id=user_id,
+                         content=job.template.format(username=username), pet_id=job.pet_id)
+            for user_id, username in chunk
+        ])
+        # bulk_create() skips the signals that feed the change log and drop the cached unread counts
+        record(notifications)
+        FanoutJob.objects.filter(pk=job.pk).update(
+            sent=F("sent") + len(chunk), last_recipient_id=receiver_ids[-1], modified_date=timezone.now()
+        )
+    app_cache.delete_many(UNREAD_COUNT_NAMESPACE, receiver_ids)
+
+
+def resumable_jobs(stale_minutes=10):
+    """Ids of queued jobs and of running jobs without progress for stale_minutes."""
+    stale = timezone.now() - timedelta(minutes=stale_minutes)
+    return list(
+        FanoutJob.objects.filter(Q(status="queued") | Q(status="running", modified_date__lt=stale))
+        .order_by("id").values_list("id", flat=True)
+    )
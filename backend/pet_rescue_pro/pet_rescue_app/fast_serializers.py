@@ -0,0 +1,372 @@
+# pet_rescue_app/fast_serializers.py
+"""
+Read-only fast paths for the hot list endpoints.
+
+Each reader produces exactly what its DRF serializer would (same keys, same
+order, same value formatting) but builds the dicts straight from one
+.values_list() query: nested profiles/pets/reports come from JOINs, the pet image
+fallback from a subquery, and media URLs from a prefix computed once per
+request instead of a build_absolute_uri() call per image.
+
+    PetFastSerializer           == PetSerializer
+    PetReportFastSerializer     == PetReportSerializer
+    PetAdoptionFastSerializer   == PetAdoptionSerializer
+    PetAdoptionListFastSerializer == PetAdoptionListSerializer
+    NotificationFastSerializer  == NotificationSerializer
+    RewardPointFastSerializer   == RewardPointSerializer
+
+Usage: PetFastSerializer(request).serialize(queryset) -> list of dicts
+(async views: (await PetFastSerializer.for_async(request)).aiter_serialize(qs)), or
+list_response()/FastListMixin, which stream the list as JSON and fall back
+to the DRF serializer when the request asks for ?fields=/?expand=. bench_serializers checks the
+outputs stay identical and times both paths.
+"""
+import re
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.files.storage import default_storage
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from django.utils.encoding import filepath_to_uri
+from rest_framework.response import Response
+
+from .fieldsets import request_spec, sparse_serializer
+from .models import PetReport
+from .pet_types import pet_type_registry
+from .renderers import stream_json_response
+
+STREAM_CHUNK_SIZE = 2000
+DATETIME_CACHE_SIZE = 10000
+
+
+# Characters filepath_to_uri() leaves as they are: most stored names need no quoting
+_URI_SAFE_NAME = re.compile(r"[A-Za-z0-9_.\-/~!*()']*")
+
+
+class _Context:
+    """
+    Per-request values shared by every reader: media URL prefix, output time
+    zone and pet type names (the registry, or a snapshot of it for async code,
+    where the registry's own queries are not allowed).
+    """
+
+    def __init__(self, request, pet_type_names=None):
+        base_url = default_storage.base_url
+        self.media_prefix = request.build_absolute_uri(base_url) if request is not None else base_url
+        self.tz = timezone.get_current_timezone()
+        self.pet_type_name = pet_type_registry.name_for if pet_type_names is None else pet_type_names.get
+        self._datetimes = {}  # nested profiles and pets repeat the same timestamps row after row
+
+    def media_url(self, name):
+        if not name:
+            return None
+        return self.media_prefix + (name if _URI_SAFE_NAME.fullmatch(name) else filepath_to_uri(name))
+
+    def datetime(self, value):
+        # Same as rest_framework.fields.DateTimeField.to_representation with ISO_8601
+        if value is None:
+            return None
+        formatted = self._datetimes.get(value)
+        if formatted is not None:
+            return formatted
+        if value.tzinfo is not None:
+            local = value.astimezone(self.tz)
+        else:
+            local = timezone.make_aware(value, self.tz)
+        formatted = local.isoformat()
+        if formatted.endswith("+00:00"):
+            formatted = formatted[:-6] + "Z"
+        if len(self._datetimes) >= DATETIME_CACHE_SIZE:
+            self._datetimes.clear()
+        self._datetimes[value] = formatted
+        return formatted
+
+
+class _Reader:
+    """
+    One serializer level. fields is a list of (output name, source, kind);
+    kinds: None (raw value), "datetime", "media", "pet_type", "str", or a
+    nested _Reader class (source is the relation name).
+
+    Rows are read as tuples (values_list). Each level plans with column
+    names; bind() turns them into tuple positions once the top level knows
+    the full column list.
+    """
+    fields = ()
+    null_check = "id"
+
+    def __init__(self, ctx, prefix=""):
+        self.ctx = ctx
+        self.prefix = prefix
+        self._columns = []
+        self._annotations = {}
+        self._plan = []
+        self._nested = []
+        for name, source, kind in self.fields:
+            self._compile(name, source, kind)
+        self._null_key = prefix + self.null_check if prefix else None
+        if not prefix:
+            self.names = list(dict.fromkeys(self._columns)) + list(self._annotations)
+            self.bind({name: index for index, name in enumerate(self.names)})
+
+    def _compile(self, name, source, kind):
+        key = self.prefix + source
+        if isinstance(kind, type) and issubclass(kind, _Reader):
+            nested = kind(self.ctx, prefix=key + "__")
+            self._columns.extend(nested._columns)
+            self._annotations.update(nested._annotations)
+            self._nested.append(nested)
+            self._plan.append((name, None, nested.build))
+            return
+        self._columns.append(key)
+        converter = {
+            None: None,
+            "datetime": self.ctx.datetime,
+            "media": self.ctx.media_url,
+            "pet_type": self.ctx.pet_type_name,
+            "str": lambda value: None if value is None else str(value),
+        }[kind]
+        self._plan.append((name, key, converter))
+
+    def bind(self, positions):
+        """Replace column names by their positions in the row tuples."""
+        self._plan = [
+            (name, key if key is None else positions[key], converter) for name, key, converter in self._plan
+        ]
+        if self._null_key is not None:
+            self._null_key = positions[self._null_key]
+        for nested in self._nested:
+            nested.bind(positions)
+
+    def build(self, row):
+        if self._null_key is not None and row[self._null_key] is None:
+            return None  # nullable relation that is not set
+        out = {}
+        for name, key, converter in self._plan:
+            if key is None:
+                out[name] = converter(row)
+            elif converter is None:
+                out[name] = row[key]
+            else:
+                out[name] = converter(row[key])
+        return out
+
+
+class _ProfileReader(_Reader):
+    fields = [
+        ("id", "id", None),
+        ("username", "username", None),
+        ("email", "email", None),
+        ("gender", "gender", None),
+        ("phone", "phone", None),
+        ("address", "address", None),
+        ("pincode", "pincode", None),
+        ("profile_image", "profile_image", "media"),
+        ("created_at", "created_at", "datetime"),
+        ("updated_at", "updated_at", "datetime"),
+        ("is_superuser", "is_superuser", None),
+    ]
+
+
+class _PetReader(_Reader):
+    fields = [
+        ("id", "id", None),
+        ("name", "name", None),
+        ("pet_type", "pet_type_id", "pet_type"),
+        ("gender", "gender", None),
+        ("breed", "breed", None),
+        ("color", "color", None),
+        ("age", "age", None),
+        ("weight", "weight", None),
+        ("description", "description", None),
+        ("address", "address", None),
+        ("state", "state", None),
+        ("city", "city", None),
+        ("pincode", "pincode", None),
+        ("image", "image", "pet_image"),
+        ("is_diseased", "is_diseased", None),
+        ("is_vaccinated", "is_vaccinated", None),
+        ("created_date", "created_date", "datetime"),
+        ("modified_date", "modified_date", "datetime"),
+        ("created_by", "created_by", _ProfileReader),
+        ("modified_by", "modified_by", _ProfileReader),
+    ]
+
+    def _compile(self, name, source, kind):
+        if kind != "pet_image":
+            return super()._compile(name, source, kind)
+
+        # PetSerializer.get_image: the pet's own image, else its latest report's image
+        image_key = self.prefix + source
+        report_key = self.prefix.replace("__", "_") + "latest_report_image"
+        outer = OuterRef(self.prefix[:-2]) if self.prefix else OuterRef("pk")
+        self._columns.append(image_key)
+        self._annotations[report_key] = Subquery(
+            PetReport.objects.filter(pet=outer).order_by("-created_date").values("image")[:1]
+        )
+        self._image_keys = (image_key, report_key)
+        self._plan.append((name, None, self._image))
+
+    def bind(self, positions):
+        super().bind(positions)
+        self._image_keys = tuple(positions[key] for key in self._image_keys)
+
+    def _image(self, row):
+        image, report_image = self._image_keys
+        return self.ctx.media_url(row[image] or row[report_image])
+
+
+class _PetReportReader(_Reader):
+    fields = [
+        ("id", "id", None),
+        ("pet", "pet_id", None),
+        ("user", "user_id", None),
+        ("pet_status", "pet_status", None),
+        ("report_status", "report_status", None),
+        ("image", "image", "media"),
+        ("image_url", "image", "media"),
+        ("is_resolved", "is_resolved", None),
+        ("duplicate_of", "duplicate_of_id", None),
+        ("created_date", "created_date", "datetime"),
+        ("modified_date", "modified_date", "datetime"),
+        ("created_by", "created_by_id", None),
+        ("modified_by", "modified_by_id", None),
+        ("gender", "pet__gender", None),
+    ]
+
+
+class _PetAdoptionReader(_Reader):
+    fields = [
+        ("id", "id", None),
+        ("pet", "pet", _PetReader),
+        ("requestor", "requestor", _ProfileReader),
+        ("message", "message", None),
+        ("status", "status", None),
+        ("created_date", "created_date", "datetime"),
+        ("modified_date", "modified_date", "datetime"),
+        ("created_by", "created_by", _ProfileReader),
+        ("modified_by", "modified_by", _ProfileReader),
+    ]
+
+
+class _PetAdoptionListReader(_Reader):
+    fields = [
+        ("id", "id", None),
+        ("pet", "pet", _PetReader),
+        ("requestor", "requestor__email", "str"),  # StringRelatedField -> Profile.__str__
+        ("message", "message", None),
+        ("status", "status", None),
+    ]
+
+
+class _NotificationReader(_Reader):
+    fields = [
+        ("id", "id", None),
+        ("sender", "sender", _ProfileReader),
+        ("receiver", "receiver", _ProfileReader),
+        ("content", "content", None),
+        ("pet", "pet", _PetReader),
+        ("report", "report", _PetReportReader),
+        ("is_read", "is_read", None),
+        ("created_at", "created_at", "datetime"),
+    ]
+
+
+class _RewardPointReader(_Reader):
+    fields = [
+        ("user", "user_id", None),
+        ("username", "user__username", None),
+        ("email", "user__email", None),
+        ("points", "points", None),
+        ("badge", "badge", None),
+        ("reason", "reason", None),
+    ]
+
+
+class FastSerializer:
+    reader_class = None
+
+    def __init__(self, request=None, pet_type_names=None):
+        self.reader = self.reader_class(_Context(request, pet_type_names))
+
+    @classmethod
+    async def for_async(cls, request=None):
+        """Instance usable from async views: pet type names are loaded up front."""
+        return cls(request, pet_type_names=await sync_to_async(pet_type_registry.names)())
+
+    def rows(self, queryset):
+        reader = self.reader
+        if reader._annotations:
+            queryset = queryset.annotate(**reader._annotations)
+        return queryset.values_list(*reader.names)
+
+    def serialize(self, queryset):
+        build = self.reader.build
+        return [build(row) for row in self.rows(queryset)]
+
+    def iter_serialize(self, queryset, chunk_size=STREAM_CHUNK_SIZE):
+        """Like serialize(), but lazily, reading rows from a server-side cursor in chunks."""
+        build = self.reader.build
+        return (build(row) for row in self.rows(queryset).iterator(chunk_size=chunk_size))
+
+    async def aiter_serialize(self, queryset, chunk_size=STREAM_CHUNK_SIZE):
+        """Async iter_serialize() for instances made with for_async()."""
+        # Not QuerySet.aiterator(): for values_list() it runs the query in the event loop
+        # (SynchronousOnlyOperation), so each chunk is read from the sync iterator in a thread
+        build = self.reader.build
+        rows = self.rows(queryset).iterator(chunk_size=chunk_size)
+        read_chunk = sync_to_async(lambda: list(islice(rows, chunk_size)))
+        while True:
+            chunk = await read_chunk()
+            for row in chunk:
+                yield build(row)
+            if len(chunk) < chunk_size:
+                return
+
+
+class PetFastSerializer(FastSerializer):
+    reader_class = _PetReader
+
+
+class PetReportFastSerializer(FastSerializer):
+    reader_class = _PetReportReader
+
+
+class PetAdoptionFastSerializer(FastSerializer):
+    reader_class = _PetAdoptionReader
+
+
+class PetAdoptionListFastSerializer(FastSerializer):
+    reader_class = _PetAdoptionListReader
+
+
+class NotificationFastSerializer(FastSerializer):
+    reader_class = _NotificationReader
+
+
+class RewardPointFastSerializer(FastSerializer):
+    reader_class = _RewardPointReader
+
+
+def list_response(fast_class, serializer_class, queryset, request, key=None):
+    """
+    Streamed JSON list for queryset ([..] or {key: [..]}) through the fast path;
+    requests asking for a sparse fieldset get a regular Response from the DRF serializer.
+    """
+    if request_spec(request) is not None:
+        data = sparse_serializer(serializer_class, queryset, request).data
+        return Response({key: data} if key else data)
+    return stream_json_response(fast_class(request).iter_serialize(queryset), key=key, request=request)
+
+
+class FastListMixin:
+    """ViewSet mixin: unpaginated list() streamed through fast_serializer_class."""
+    fast_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        paginated = self.paginator is not None and self.paginator.get_page_size(request)
+        if request_spec(request) is not None or paginated:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return stream_json_response(self.fast_serializer_class(request).iter_serialize(queryset), request=request)
@@ -0,0 +1,229 @@
+# pet_rescue_app/fieldsets.py
+"""
+Sparse fieldsets (?fields=) and opt-in expansion (?expand=) for read APIs.
+
+    ?fields=id,name,pet.name       only these fields; dotted names reach into nested objects
+    ?expand=pet,pet.created_by     render these relations as nested objects
+
+Without either parameter responses are unchanged. Once a client passes one
+of them, nested objects that were not expanded (explicitly or through a
+dotted field) are rendered as their primary key. Relations a serializer
+renders as a primary key can be expanded when it lists them in
+Meta.sparse_expandable ({"pet": PetSerializer}). Unknown names, and
+expanding or dotting into anything else, answer 400.
+
+Serializers opt in with SparseFieldsetMixin. Views build their serializer
+through sparse_serializer() (APIViews) or SparseFieldsetViewMixin
+(viewsets); both narrow the queryset to the kept fields with only(),
+select_related() and prefetch_related(). Serializer method fields declare
+the model fields they read in Meta.sparse_sources; a level with an
+undeclared method field is loaded in full.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+MAX_DEPTH = 4
+MAX_PARAM_LENGTH = 1000
+
+
+def parse_field_tree(value):
+    """'id,pet.name,pet.type' -> {'id': {}, 'pet': {'name': {}, 'type': {}}}."""
+    tree = {}
+    for item in (value or "")[:MAX_PARAM_LENGTH].split(","):
+        node = tree
+        for part in item.strip().split(".")[:MAX_DEPTH]:
+            if not part:
+                break
+            node = node.setdefault(part, {})
+    return tree
+
+
+def request_spec(request):
+    """(fields_tree or None, expand_tree) for a request, or None when it does not ask for sparse output."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    params = getattr(request, "query_params", request.GET)  # DRF Request or plain HttpRequest
+    if FIELDS_PARAM not in params and EXPAND_PARAM not in params:
+        return None
+    return parse_field_tree(params.get(FIELDS_PARAM)) or None, parse_field_tree(params.get(EXPAND_PARAM))
+
+
+def _nested(field):
+    """The ModelSerializer behind a nested field (single or many=True), else None."""
+    target = field.child if isinstance(field, serializers.ListSerializer) else field
+    return target if isinstance(target, serializers.ModelSerializer) else None
+
+
+def _collapse(name, field, model):
+    """Replace a nested object by its primary key, when its source is a real relation."""
+    source = field.source or name  # fields are not bound yet
+    try:
+        relation = model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return field
+    if not relation.is_relation:
+        return field
+    kwargs = {"source": source} if source != name else {}
+    return serializers.PrimaryKeyRelatedField(
+        read_only=True, many=isinstance(field, serializers.ListSerializer), **kwargs
+    )
+
+
+def _expand(name, field, serializer_class):
+    """Replace a primary key field by serializer_class for the same relation."""
+    kwargs = {"source": field.source} if field.source and field.source != name else {}
+    return serializer_class(read_only=True, many=isinstance(field, serializers.ManyRelatedField), **kwargs)
+
+
+class SparseFieldsetMixin:
+    """ModelSerializer mixin that applies the sparse spec of the request (or of its parent)."""
+
+    _sparse_spec = None
+    _sparse_prefix = ""  # dotted path of this level, for error messages
+
+    def _spec(self):
+        if self._sparse_spec is not None:
+            return self._sparse_spec
+        root = self.parent.parent if isinstance(self.parent, serializers.ListSerializer) else self.parent
+        if root is not None:
+            return None  # nested under a serializer that did not hand down a spec
+        return request_spec(self.context.get("request"))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        spec = self._spec()
+        if spec is None:
+            return fields
+
+        selected, expand = spec
+        prefix = self._sparse_prefix
+        for param, names in ((FIELDS_PARAM, selected or {}), (EXPAND_PARAM, expand)):
+            unknown = [prefix + name for name in names if name not in fields]
+            if unknown:
+                raise serializers.ValidationError({param: [f"Unknown field(s): {', '.join(unknown)}."]})
+        if selected:
+            fields = {name: field for name, field in fields.items() if name in selected}
+
+        model = self.Meta.model
+        expandable = getattr(self.Meta, "sparse_expandable", {})
+        for name, field in list(fields.items()):
+            sub_fields = (selected or {}).get(name) or None
+            wanted = sub_fields is not None or name in expand
+            nested = _nested(field)
+            if nested is None:
+                if not wanted:
+                    continue
+                if name not in expandable:
+                    param = EXPAND_PARAM if name in expand else FIELDS_PARAM
+                    raise serializers.ValidationError({param: [f"'{prefix}{name}' cannot be expanded."]})
+                fields[name] = field = _expand(name, field, expandable[name])
+                nested = _nested(field)
+            if not wanted:
+                fields[name] = _collapse(name, field, model)
+            elif isinstance(nested, SparseFieldsetMixin):
+                nested._sparse_spec = (sub_fields, expand.get(name, {}))
+                nested._sparse_prefix = f"{prefix}{name}."
+        return fields
+
+
+def _plan(serializer, model, prefix, plan):
+    """
+    Collect select_related()/prefetch_related() paths into plan and return the
+    only() paths for this level and below, or None if the level needs whole rows.
+    """
+    declared = getattr(getattr(serializer, "Meta", None), "sparse_sources", {})
+    columns, complete = [prefix + model._meta.pk.name], True
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.SerializerMethodField):
+            if name in declared:
+                columns.extend(prefix + source for source in declared[name])
+            else:
+                complete = False
+            continue
+        if field.source == "*":
+            complete = False
+            continue
+
+        attrs = field.source.split(".")
+        current, path = model, prefix
+        try:
+            for attr in attrs[:-1]:
+                relation = current._meta.get_field(attr)
+                if not relation.is_relation or relation.many_to_many or relation.one_to_many:
+                    raise FieldDoesNotExist(attr)
+                columns.append(path + attr)
+                path = f"{path}{attr}__"
+                plan["select"].add(path[:-2])
+                current = relation.related_model
+            model_field = current._meta.get_field(attrs[-1])
+        except FieldDoesNotExist:
+            complete = False  # property or method; needs the whole row
+            continue
+
+        full = path + attrs[-1]
+        nested = _nested(field)
+        if model_field.many_to_many or model_field.one_to_many:
+            plan["prefetch"].add(full)
+        elif model_field.is_relation and model_field.concrete:
+            columns.append(full)
+            if nested is not None:
+                plan["select"].add(full)
+                # An incomplete nested level still loads in full: its relation is listed without sub-fields
+                columns.extend(_plan(nested, model_field.related_model, full + "__", plan) or [])
+            elif isinstance(field, serializers.RelatedField) and not isinstance(field, serializers.PrimaryKeyRelatedField):
+                plan["select"].add(full)  # e.g. StringRelatedField needs the related row
+        elif model_field.is_relation:
+            plan["select"].add(full)  # reverse one-to-one
+            complete = False
+        else:
+            columns.append(full)
+
+    return columns if complete else None
+
+
+def narrow_queryset(queryset, serializer):
+    """Restrict queryset to what serializer (a ModelSerializer or many=True list of one) will read."""
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    if not isinstance(serializer, serializers.ModelSerializer):
+        return queryset
+
+    plan = {"select": set(), "prefetch": set()}
+    columns = _plan(serializer, queryset.model, "", plan)
+
+    if plan["select"]:
+        queryset = queryset.select_related(*sorted(plan["select"]))
+    if plan["prefetch"]:
+        queryset = queryset.prefetch_related(*sorted(plan["prefetch"]))
+    if columns is not None:
+        queryset = queryset.only(*dict.fromkeys(columns))
+    return queryset
+
+
+def sparse_serializer(serializer_class, queryset, request, many=True, **kwargs):
+    """
+    Instantiate serializer_class for queryset the way the request asks
+    (fields/expand), narrowing the queryset first.
+    """
+    kwargs.setdefault("context", {}).setdefault("request", request)
+    serializer = serializer_class(many=many, **kwargs)
+    if request_spec(request) is not None:
+        queryset = narrow_queryset(queryset, serializer)
+    serializer.instance = queryset
+    return serializer
+
+
+class SparseFieldsetViewMixin:
+    """For viewsets: narrow the list/retrieve queryset to the requested fields."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if request_spec(self.request) is None or self.action not in ("list", "retrieve"):
+            return queryset
+        return narrow_queryset(queryset, self.get_serializer())
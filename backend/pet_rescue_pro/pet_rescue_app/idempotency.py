@@ -0,0 +1,77 @@
+# pet_rescue_app/idempotency.py
+"""
+Idempotency-Key support for submission endpoints.
+
+The first successful request with a given key stores its response in
+IdempotencyRecord inside the same transaction as the rows it created. A
+retry with the same key replays that response. If two copies race, the
+loser's transaction fails on the unique constraint and is rolled back, then
+it replays the winner's result.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyRecord
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_TTL = timedelta(hours=getattr(settings, "IDEMPOTENCY_TTL_HOURS", 24))
+
+
+def get_idempotency_key(request):
+    key = (request.headers.get(IDEMPOTENCY_HEADER) or "").strip()
+    return key[:255] or None
+
+
+def request_fingerprint(data, files=None):
+    """Stable hash of the submitted payload (uploaded files by name and size)."""
+    payload = {
+        "data": {k: data.get(k) for k in sorted(data.keys()) if not hasattr(data.get(k), "read")},
+        "files": sorted((name, f.name, f.size) for name, f in (files or {}).items()),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def replay(user, endpoint, key, request_hash):
+    """Response for a previously completed request, or None if the key is new."""
+    record = IdempotencyRecord.objects.filter(user=user, endpoint=endpoint, key=key).first()
+    if record is None:
+        return None
+    if record.request_hash != request_hash:
+        return Response(
+            {"error": "Idempotency-Key was already used for a different request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    response = Response(record.response_body, status=record.response_status)
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def remember(user, endpoint, key, request_hash, response):
+    """Store response for key. Call inside the transaction that did the work."""
+    IdempotencyRecord.objects.create(
+        user=user,
+        endpoint=endpoint,
+        key=key,
+        request_hash=request_hash,
+        response_status=response.status_code,
+        response_body=response.data,
+    )
+
+
+def purge_expired(batch_size=1000):
+    """Delete idempotency records older than IDEMPOTENCY_TTL. Returns the number removed."""
+    cutoff = timezone.now() - IDEMPOTENCY_TTL
+    removed = 0
+    while True:
+        ids = list(
+            IdempotencyRecord.objects.filter(created_at__lt=cutoff).values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return removed
+        removed += IdempotencyRecord.objects.filter(id__in=ids).delete()[0]
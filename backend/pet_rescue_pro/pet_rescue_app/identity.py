@@ -0,0 +1,222 @@
+# pet_rescue_app/identity.py
+"""
+Request-scoped identity map: one instance per (model, pk) per request.
+
+IdentityMapMiddleware opens a map in a context variable for each request
+and drops it when the response is done. For streamed responses the map
+stays open while each chunk is produced, until the last one. While it is open:
+
+    report.user, pet.created_by, ...   forward foreign keys to the models in
+                                       IDENTITY_MAP_MODELS look in the map
+                                       before querying, and remember what
+                                       they load
+    get(Profile, pk)                   the same for explicit lookups
+    request.user                       is remembered when the JWT is
+                                       authenticated (IdentityMapJWTAuthentication)
+
+So twenty reports by the same user load that profile once, and a profile
+endpoint reuses the user the token already loaded. Each hit is a query
+saved, reported in the X-Identity-Map-Saved-Queries header when
+IDENTITY_MAP_HEADERS is on (default: DEBUG).
+
+The descriptors are swapped in at startup (install(), from apps.py), so
+field classes and migrations are untouched. Outside a request (management
+commands, the integration pools) there is no map and nothing changes.
+Saves and deletes through the ORM keep the map current. Queryset
+update() is not seen, so a view that updates rows in bulk and then reads
+them through a foreign key in the same request should refresh them.
+"""
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.apps import apps
+from django.conf import settings
+from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
+from django.db.models.signals import post_delete, post_save
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+DEFAULT_MODELS = ("pet_rescue_app.Profile", "pet_rescue_app.Pet", "pet_rescue_app.PetType")
+SAVED_QUERIES_HEADER = "X-Identity-Map-Saved-Queries"
+
+_current = ContextVar("identity_map", default=None)
+
+
+class IdentityMap:
+    def __init__(self):
+        self.instances = {}  # (model label, pk) -> instance
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(model, pk):
+        return model._meta.concrete_model._meta.label, pk
+
+    def lookup(self, model, pk):
+        instance = self.instances.get(self._key(model, pk))
+        if instance is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return instance
+
+    def add(self, instance):
+        if instance is not None and instance.pk is not None:
+            self.instances[self._key(type(instance), instance.pk)] = instance
+        return instance
+
+    def discard(self, model, pk):
+        self.instances.pop(self._key(model, pk), None)
+
+
+def current():
+    """The open identity map, or None outside a request."""
+    return _current.get()
+
+
+def remember(instance):
+    identity_map = _current.get()
+    if identity_map is not None:
+        identity_map.add(instance)
+    return instance
+
+
+def get(model, pk):
+    """model.objects.get(pk=pk), answered from the identity map when the row was already loaded."""
+    identity_map = _current.get()
+    if identity_map is not None:
+        instance = identity_map.lookup(model, pk)
+        if instance is not None:
+            return instance
+    return remember(model._default_manager.get(pk=pk))
+
+
+class IdentityMapDescriptor(ForwardManyToOneDescriptor):
+    """A forward foreign key that reads through the identity map."""
+
+    def get_object(self, instance):
+        identity_map = _current.get()
+        if identity_map is None:
+            return super().get_object(instance)
+        related = identity_map.lookup(self.field.remote_field.model, getattr(instance, self.field.attname))
+        if related is None:
+            related = identity_map.add(super().get_object(instance))
+        return related
+
+
+def _tracked_labels():
+    return set(getattr(settings, "IDENTITY_MAP_MODELS", DEFAULT_MODELS))
+
+
+def install():
+    """Put IdentityMapDescriptor on the app's foreign keys to the tracked models."""
+    tracked = _tracked_labels()
+    for model in apps.get_app_config("pet_rescue_app").get_models():
+        for field in model._meta.local_fields:
+            if not field.many_to_one or field.remote_field.model._meta.label not in tracked:
+                continue
+            # Only keys to the primary key: the map is indexed by pk
+            if field.target_field != field.remote_field.model._meta.pk:
+                continue
+            if type(model.__dict__.get(field.name)) is ForwardManyToOneDescriptor:
+                setattr(model, field.name, IdentityMapDescriptor(field))
+
+    for label in tracked:
+        tracked_model = apps.get_model(label)
+        post_save.connect(_saved, sender=tracked_model, dispatch_uid=f"identity_map_save_{label}")
+        post_delete.connect(_deleted, sender=tracked_model, dispatch_uid=f"identity_map_delete_{label}")
+
+
+def _saved(sender, instance, **kwargs):
+    identity_map = _current.get()
+    if identity_map is not None:
+        identity_map.add(instance)  # the saved instance is the current state of the row
+
+
+def _deleted(sender, instance, **kwargs):
+    identity_map = _current.get()
+    if identity_map is not None:
+        identity_map.discard(sender, instance.pk)
+
+
+class IdentityMapJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that puts the authenticated user in the identity map."""
+
+    def get_user(self, validated_token):
+        return remember(super().get_user(validated_token))
+
+
+def _stream_with(chunks, identity_map):
+    """Produce each chunk of a streamed response with the request's map open."""
+    chunks = iter(chunks)
+    try:
+        while True:
+            token = _current.set(identity_map)
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                return
+            finally:
+                _current.reset(token)
+            yield chunk
+    finally:
+        identity_map.instances.clear()
+
+
+async def _astream_with(chunks, identity_map):
+    chunks = aiter(chunks)
+    try:
+        while True:
+            token = _current.set(identity_map)
+            try:
+                chunk = await anext(chunks)
+            except StopAsyncIteration:
+                return
+            finally:
+                _current.reset(token)
+            yield chunk
+    finally:
+        identity_map.instances.clear()
+
+
+class IdentityMapMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.headers = getattr(settings, "IDENTITY_MAP_HEADERS", settings.DEBUG)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        identity_map = IdentityMap()
+        token = _current.set(identity_map)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(response, identity_map)
+
+    async def __acall__(self, request):
+        identity_map = IdentityMap()
+        token = _current.set(identity_map)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(response, identity_map)
+
+    def finish(self, response, identity_map):
+        if self.headers:
+            # Headers go out before a streamed body, so those only count the lookups made before it
+            response[SAVED_QUERIES_HEADER] = str(identity_map.hits)
+        if response.streaming:
+            # The rows of a streamed list are read as it is sent: keep the map open until the last chunk
+            stream = _astream_with if response.is_async else _stream_with
+            response.streaming_content = stream(response.streaming_content, identity_map)
+        else:
+            identity_map.instances.clear()
+        return response
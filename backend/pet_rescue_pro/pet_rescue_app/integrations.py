@@ -0,0 +1,119 @@
+# pet_rescue_app/integrations.py
+"""
+Third-party integrations: lazily loaded clients and bounded thread pools
+for their blocking calls.
+
+Heavy SDKs (Gemini pulls in gRPC and protobuf, close to a second of import
+time) are never imported at startup. Each is registered as a provider whose
+factory runs, once per process, the first time it is needed:
+
+    genai = providers.get("gemini")
+
+Blocking calls (the Gemini chatbot, notification fan-out) run on
+per-integration thread pools sized by INTEGRATION_POOL_SIZES, so a slow
+model API can tie up at most that many threads and never the threads that
+serve requests:
+
+    await run_in_pool("chatbot", gemini_generate, prompt)  # from async code
+    submit("fanout", run_job, job_id)   # fire-and-forget from sync code
+
+Only work that is picked up again if the process dies goes through
+submit(): OTP mails are sent inline, so the request fails when they cannot
+be sent, and bulk mail goes through the outbox (outbox.py).
+
+Pool threads do not use the database; jobs that need it (fan-out, see
+fanout.py) must close their own connections.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZES = {
+    "chatbot": 8,
+    "fanout": 1,
+}
+
+class ProviderRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._factories = {}
+        self._instances = {}
+
+    def register(self, name, factory):
+        """Register factory() as the loader for a provider (replacing any loaded instance)."""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def get(self, name):
+        """The provider's client, loading it on first use."""
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._instances:
+                self._instances[name] = self._factories[name]()
+            return self._instances[name]
+
+    def loaded(self):
+        return sorted(self._instances)
+
+
+providers = ProviderRegistry()
+
+
+def _load_gemini():
+    import google.generativeai as genai
+
+    genai.configure(api_key=getattr(settings, "GEMINI_API_KEY", None))
+    return genai
+
+
+providers.register("gemini", _load_gemini)
+
+
+def gemini_generate(prompt):
+    """One Gemini completion (blocking; run it on the "chatbot" pool)."""
+    model = providers.get("gemini").GenerativeModel(getattr(settings, "GEMINI_MODEL", "gemini-2.5-flash"))
+    return model.generate_content(prompt)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def pool(name):
+    """The executor for an integration, created on first use."""
+    executor = _pools.get(name)
+    if executor is None:
+        with _pools_lock:
+            executor = _pools.get(name)
+            if executor is None:
+                sizes = {**DEFAULT_POOL_SIZES, **getattr(settings, "INTEGRATION_POOL_SIZES", {})}
+                executor = ThreadPoolExecutor(max_workers=sizes[name], thread_name_prefix=f"integration-{name}")
+                _pools[name] = executor
+    return executor
+
+
+async def run_in_pool(name, func, *args, **kwargs):
+    """Await a blocking call on the integration's pool without holding up the event loop."""
+    return await sync_to_async(func, thread_sensitive=False, executor=pool(name))(*args, **kwargs)
+
+
+def _log_failure(name, future):
+    exc = future.exception()
+    if exc is not None:
+        logger.error("%s job failed", name, exc_info=exc)
+
+
+def submit(name, func, *args, **kwargs):
+    """Queue a blocking call on the integration's pool; failures are logged, not raised."""
+    future = pool(name).submit(func, *args, **kwargs)
+    future.add_done_callback(lambda f: _log_failure(name, f))
+    return future
@@ -0,0 +1,77 @@
+# pet_rescue_app/jobs.py
+"""
+Maintenance jobs run by the scheduler (see scheduler.py). Each wraps the
+function its management command calls, so a job can still be run by hand
+with the command or with `run_scheduler --run <name>`. Times are TIME_ZONE;
+the heavy jobs are spread over the quiet hours.
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+
+from . import changefeed, fanout, idempotency, notifications, otp, outbox, rewards, uploads, vaccinations
+from .scheduler import job, prune_runs
+
+
+@job("send_queued_emails", "* * * * *")
+def send_queued_emails():
+    sent, failed = outbox.send_queued()
+    return {"sent": sent, "failed": failed}
+
+
+@job("resume_fanout_jobs", "*/5 * * * *")
+def resume_fanout_jobs():
+    job_ids = fanout.resumable_jobs()
+    for job_id in job_ids:
+        fanout.run_job(job_id, stale_after=timedelta(minutes=10))
+    return {"jobs": len(job_ids)}
+
+
+@job("purge_expired_otps", "*/15 * * * *")
+def purge_expired_otps():
+    return otp.purge_expired()
+
+
+@job("purge_idempotency_keys", "@hourly")
+def purge_idempotency_keys():
+    return idempotency.purge_expired()
+
+
+@job("purge_stale_uploads", "30 * * * *")
+def purge_stale_uploads():
+    return uploads.purge_stale()
+
+
+@job("refresh_reward_points", "15 */6 * * *")
+def refresh_reward_points():
+    return rewards.refresh_all()
+
+
+@job("archive_read_notifications", "0 2 * * *")
+def archive_read_notifications():
+    return notifications.archive_read(pause=0.05)
+
+
+@job("compact_change_log", "30 2 * * *")
+def compact_change_log():
+    superseded, expired = changefeed.compact()
+    return {"superseded": superseded, "expired": expired}
+
+
+@job("reconcile_media_refcounts", "0 3 * * 0")
+def reconcile_media_refcounts():
+    # gc_media_blobs --recount recomputes every blob's reference count before collecting
+    output = StringIO()
+    call_command("gc_media_blobs", recount=True, stdout=output)
+    return output.getvalue().strip()
+
+
+@job("send_vaccination_reminders", "0 8 * * *")
+def send_vaccination_reminders():
+    return vaccinations.send_due_reminders()
+
+
+@job("prune_job_runs", "45 3 * * *")
+def prune_job_runs():
+    return prune_runs()
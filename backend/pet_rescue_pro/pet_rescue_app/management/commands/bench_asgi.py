@@ -0,0 +1,150 @@
+import asyncio
+import statistics
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+from django.urls import include, path
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from pet_rescue_app.benchmarks import asgi_get, delete_bench_rows, populate_bench_rows, wsgi_get
+from pet_rescue_app.models import Profile
+
+ENDPOINTS = [
+    ("/api/pets/recent/", "", False),
+    ("/api/pets-list/", "tab=lost", True),
+    ("/api/get-notifications/", "", True),
+    ("/api/profile_details/", "", True),
+]
+
+
+def _urlconf(name, api_urls):
+    module = types.ModuleType(name)
+    module.urlpatterns = [path("api/", include(api_urls))]
+    return module
+
+
+SYNC_URLS = _urlconf("bench_sync_urls", "pet_rescue_app.urls")
+ASYNC_URLS = _urlconf("bench_async_urls", "pet_rescue_app.async_urls")
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the hot read endpoints at a fixed concurrency: the DRF views on a "
+        "WSGI-style pool of --threads worker threads, then the async views on one ASGI "
+        "event loop. --latency-ms is added to every query to stand in for a database "
+        "across the network. Rows are committed and deleted afterwards; use a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200)
+        parser.add_argument("--requests", type=int, default=400)
+        parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight at once")
+        parser.add_argument("--threads", type=int, default=4, help="Worker threads for the sync run")
+        parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated round trip per query")
+
+    def handle(self, *args, **options):
+        self.latency = options["latency_ms"] / 1000
+        total, concurrency = options["requests"], options["concurrency"]
+        self.host = next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+
+        self.stdout.write(f"Creating {options['rows']} rows per model...")
+        populate_bench_rows(options["rows"])
+        try:
+            user = Profile.objects.get(username="bench-0", email="bench-0@example.com")
+            token = str(RefreshToken.for_user(user).access_token)
+            plan = [ENDPOINTS[i % len(ENDPOINTS)] for i in range(total)]
+
+            connection_created.connect(self._add_latency)
+            for connection in connections.all(initialized_only=True):
+                self._add_latency(connection=connection)
+
+            with override_settings(ROOT_URLCONF=SYNC_URLS):
+                sync_time, sync_latencies, sync_bodies = self._run_sync(plan, token, options["threads"])
+            with override_settings(ROOT_URLCONF=ASYNC_URLS):
+                async_time, async_latencies, async_bodies = asyncio.run(self._run_async(plan, token, concurrency))
+        finally:
+            connection_created.disconnect(self._add_latency)
+            for connection in connections.all(initialized_only=True):
+                if self._sleep in connection.execute_wrappers:
+                    connection.execute_wrappers.remove(self._sleep)
+            delete_bench_rows()
+
+        self.stdout.write(
+            f"{total} requests over {len(ENDPOINTS)} endpoints, {concurrency} in flight, "
+            f"{options['latency_ms']:g} ms per query"
+        )
+        self._report(f"sync views, {options['threads']} threads", total, sync_time, sync_latencies)
+        self._report("async views, 1 event loop", total, async_time, async_latencies)
+        self.stdout.write(f"throughput x{sync_time / async_time:.1f}")
+
+        differing = [url for url in sync_bodies if sync_bodies[url] != async_bodies.get(url)]
+        if differing:
+            raise CommandError(f"Async responses differ from the sync views for: {', '.join(differing)}")
+
+    def _sleep(self, execute, sql, params, many, context):
+        time.sleep(self.latency)
+        return execute(sql, params, many, context)
+
+    def _add_latency(self, sender=None, connection=None, **kwargs):
+        if self._sleep not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self._sleep)
+
+    def _run_sync(self, plan, token, threads):
+        application = get_wsgi_application()
+
+        def fetch(endpoint):
+            url, query, auth = endpoint
+            headers = {"HTTP_HOST": self.host}
+            if auth:
+                headers["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+            start = time.perf_counter()
+            status, body = wsgi_get(application, url, query, headers)
+            return url, status, body, time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(fetch, plan))
+        return time.perf_counter() - start, *self._collect(results)
+
+    async def _run_async(self, plan, token, concurrency):
+        application = get_asgi_application()
+        gate = asyncio.Semaphore(concurrency)
+
+        async def fetch(endpoint):
+            url, query, auth = endpoint
+            headers = [(b"host", self.host.encode())]
+            if auth:
+                headers.append((b"authorization", f"Bearer {token}".encode()))
+            async with gate:
+                start = time.perf_counter()
+                status, body = await asgi_get(application, url, query, headers)
+                return url, status, body, time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(fetch(endpoint) for endpoint in plan))
+        return time.perf_counter() - start, *self._collect(results)
+
+    def _collect(self, results):
+        latencies, bodies = [], {}
+        for url, status, body, took in results:
+            if status != 200:
+                raise CommandError(f"{url} answered {status}: {body[:200]!r}")
+            latencies.append(took)
+            bodies.setdefault(url, body)
+        return latencies, bodies
+
+    def _report(self, label, total, elapsed, latencies):
+        latencies = sorted(latencies)
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        self.stdout.write(
+            f"  {label:<28} {total / elapsed:8.1f} req/s   "
+            f"p50 {statistics.median(latencies) * 1000:7.1f} ms   p95 {p95 * 1000:7.1f} ms"
+        )
@@ -0,0 +1,77 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from pet_rescue_app.benchmarks import populate_bench_rows
+from pet_rescue_app.fast_serializers import NotificationFastSerializer, PetFastSerializer, PetReportFastSerializer
+from pet_rescue_app.middleware import brotli, compress, compression_settings
+from pet_rescue_app.models import Notification, Pet, PetReport
+from pet_rescue_app.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare stdlib JSON rendering with the orjson renderer on the pet, report and "
+        "notification lists, and show bytes on the wire uncompressed, gzipped and "
+        "brotli-compressed. Rows are created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=5, help="Best of N runs")
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        host = next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+        request = RequestFactory().get("/", HTTP_HOST=host)
+        config = compression_settings()
+        before, after = JSONRenderer(), ORJSONRenderer()
+
+        with transaction.atomic():
+            self.stdout.write(f"Creating {rows} rows per model...")
+            populate_bench_rows(rows)
+            payloads = [
+                ("pets", PetFastSerializer(request).serialize(Pet.objects.order_by("id"))),
+                ("reports", PetReportFastSerializer(request).serialize(PetReport.objects.order_by("id"))),
+                ("notifications", {"notifications": NotificationFastSerializer(request).serialize(
+                    Notification.objects.order_by("id"))}),
+            ]
+            transaction.set_rollback(True)
+
+        mismatched = []
+        for label, data in payloads:
+            stdlib_time, stdlib_out = self._best(repeat, lambda: before.render(data))
+            orjson_time, orjson_out = self._best(repeat, lambda: after.render(data))
+            if stdlib_out != orjson_out:
+                mismatched.append(label)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{label} ({len(orjson_out) / 1024:.0f} KiB)"))
+            self.stdout.write(
+                f"  render   stdlib {stdlib_time * 1000:8.1f} ms   orjson {orjson_time * 1000:8.1f} ms   "
+                f"x{stdlib_time / orjson_time:5.1f}   {'identical' if stdlib_out == orjson_out else 'OUTPUT DIFFERS'}"
+            )
+            encodings = ["gzip"] + (["br"] if brotli is not None else [])
+            for encoding in encodings:
+                took, compressed = self._best(repeat, lambda: compress(orjson_out, encoding, config))
+                self.stdout.write(
+                    f"  {encoding:<6}   {len(orjson_out):>10,} -> {len(compressed):>9,} bytes "
+                    f"({len(compressed) / len(orjson_out):5.1%})   {took * 1000:7.1f} ms"
+                )
+        if brotli is None:
+            self.stdout.write("  (brotli not installed; br skipped)")
+
+        if mismatched:
+            raise CommandError(f"orjson output differs from stdlib output for: {', '.join(mismatched)}")
+
+    def _best(self, repeat, func):
+        best, output = None, None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
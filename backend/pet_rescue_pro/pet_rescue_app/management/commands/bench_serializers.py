@@ -0,0 +1,94 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+
+from pet_rescue_app.benchmarks import populate_bench_rows
+from pet_rescue_app.fast_serializers import (
+    NotificationFastSerializer, PetAdoptionFastSerializer, PetAdoptionListFastSerializer,
+    PetFastSerializer, PetReportFastSerializer, RewardPointFastSerializer,
+)
+from pet_rescue_app.models import Notification, Pet, PetAdoption, PetReport, RewardPoint
+from pet_rescue_app.renderers import ORJSONRenderer, stream_json_response
+from pet_rescue_app.serializers import (
+    NotificationSerializer, PetAdoptionListSerializer, PetAdoptionSerializer,
+    PetReportSerializer, PetSerializer, RewardPointSerializer,
+)
+
+PROFILE = ["created_by", "modified_by"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the DRF serializers with the fast read serializers on generated rows, "
+        "each rendered the way the API sends it (ORJSONRenderer, streamed list): "
+        "checks the JSON is byte-identical and reports the speedup. "
+        "All rows are created inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=3, help="Best of N runs per serializer")
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        host = next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+        request = RequestFactory().get("/", HTTP_HOST=host)
+        renderer = ORJSONRenderer()
+
+        cases = [
+            ("Pet", PetSerializer, PetFastSerializer,
+             lambda: Pet.objects.select_related(*PROFILE).prefetch_related("reports").order_by("id")),
+            ("PetReport", PetReportSerializer, PetReportFastSerializer,
+             lambda: PetReport.objects.select_related("pet").order_by("id")),
+            ("PetAdoption", PetAdoptionSerializer, PetAdoptionFastSerializer,
+             lambda: PetAdoption.objects.select_related(
+                 "pet__created_by", "pet__modified_by", "requestor", *PROFILE
+             ).prefetch_related("pet__reports").order_by("id")),
+            ("PetAdoption (list)", PetAdoptionListSerializer, PetAdoptionListFastSerializer,
+             lambda: PetAdoption.objects.select_related(
+                 "pet__created_by", "pet__modified_by", "requestor"
+             ).prefetch_related("pet__reports").order_by("id")),
+            ("Notification", NotificationSerializer, NotificationFastSerializer,
+             lambda: Notification.objects.select_related(
+                 "sender", "receiver", "pet__created_by", "pet__modified_by", "report__pet"
+             ).prefetch_related("pet__reports").order_by("id")),
+            ("RewardPoint", RewardPointSerializer, RewardPointFastSerializer,
+             lambda: RewardPoint.objects.select_related("user").order_by("id")),
+        ]
+
+        with transaction.atomic():
+            self.stdout.write(f"Creating {rows} rows per model...")
+            populate_bench_rows(rows)
+            failed = []
+            for label, drf_class, fast_class, queryset in cases:
+                drf_time, drf_out = self._best(
+                    repeat, lambda: renderer.render(drf_class(queryset(), many=True, context={"request": request}).data)
+                )
+                fast_time, fast_out = self._best(
+                    repeat, lambda: b"".join(
+                        stream_json_response(fast_class(request).iter_serialize(queryset())).streaming_content
+                    )
+                )
+                identical = drf_out == fast_out
+                if not identical:
+                    failed.append(label)
+                self.stdout.write(
+                    f"{label:<20} drf {drf_time * 1000:8.1f} ms   fast {fast_time * 1000:8.1f} ms   "
+                    f"x{drf_time / fast_time:5.1f}   {'identical' if identical else 'OUTPUT DIFFERS'}"
+                )
+            transaction.set_rollback(True)
+
+        if failed:
+            raise CommandError(f"Fast serializer output differs for: {', '.join(failed)}")
+
+    def _best(self, repeat, func):
+        best, output = None, None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
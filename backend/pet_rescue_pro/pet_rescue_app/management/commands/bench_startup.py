@@ -0,0 +1,109 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter: boot Django the way a WSGI worker does, then serve one request
+CHILD = """
+import json, os, resource, sys, time
+
+def rss_kib():
+    # Current RSS; ru_maxrss would include the parent's peak, which survives fork+exec on Linux
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+started = time.perf_counter()
+rss_before = rss_kib()
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+application = get_wsgi_application()
+get_resolver().url_patterns  # the URLconf (and with it views.py) is imported on the first request otherwise
+booted = time.perf_counter()
+from pet_rescue_app.benchmarks import wsgi_get
+status, body = wsgi_get(application, os.environ["BENCH_PATH"], "", {"HTTP_HOST": os.environ["BENCH_HOST"]})
+done = time.perf_counter()
+from pet_rescue_app.integrations import providers
+print(json.dumps({
+    "status": status,
+    "setup": booted - started,
+    "first_request": done - booted,
+    "rss_kib": rss_kib() - rss_before,
+    "providers": providers.loaded(),
+    "modules": len(sys.modules),
+}))
+"""
+
+_importtime = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold start: time from spawning a Python process to its first response "
+        "(Django setup, URLconf import, one request through the WSGI handler), the memory "
+        "imports add, and the packages that dominate `python -X importtime`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="Median of N fresh processes")
+        parser.add_argument("--path", default="/api/chatbot/", help="URL of the first request (should not need the DB)")
+        parser.add_argument("--top", type=int, default=10, help="Slowest top-level packages to list")
+
+    def handle(self, *args, **options):
+        env = {
+            **os.environ,
+            "BENCH_PATH": options["path"],
+            "BENCH_HOST": next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost"),
+        }
+
+        runs, import_totals = [], defaultdict(list)
+        for _ in range(options["runs"]):
+            spawned = time.perf_counter()
+            child = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", CHILD],
+                env=env, capture_output=True, text=True, cwd=settings.BASE_DIR,
+            )
+            elapsed = time.perf_counter() - spawned
+            if child.returncode != 0:
+                raise CommandError(f"Startup run failed:\n{child.stderr[-2000:]}")
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            if result["status"] >= 500:
+                raise CommandError(f"{options['path']} answered {result['status']}")
+            result["cold_start"] = elapsed
+            runs.append(result)
+            for package, took in self._top_level_imports(child.stderr).items():
+                import_totals[package].append(took)
+
+        # -X importtime slows imports down a little; the times are still comparable run to run
+        median = lambda key: statistics.median(run[key] for run in runs)  # noqa: E731
+        last = runs[-1]
+        self.stdout.write(f"{options['runs']} fresh processes, first request GET {options['path']} -> {last['status']}")
+        self.stdout.write(f"  cold start (spawn to response)  {median('cold_start') * 1000:8.1f} ms")
+        self.stdout.write(f"  django setup + URLconf          {median('setup') * 1000:8.1f} ms")
+        self.stdout.write(f"  first request                   {median('first_request') * 1000:8.1f} ms")
+        self.stdout.write(f"  memory added by startup         {median('rss_kib') / 1024:8.1f} MiB")
+        self.stdout.write(f"  modules loaded                  {last['modules']:8d}")
+        self.stdout.write(f"  providers loaded                {', '.join(last['providers']) or 'none'}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Slowest top-level imports (cumulative, median)"))
+        slowest = sorted(import_totals.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+        for package, times in slowest[:options["top"]]:
+            self.stdout.write(f"  {package:<32} {statistics.median(times) / 1000:8.1f} ms")
+
+    def _top_level_imports(self, stderr):
+        """Cumulative import time (us) per root package, from -X importtime's top-level entries."""
+        totals = defaultdict(int)
+        for line in stderr.splitlines():
+            match = _importtime.match(line)
+            if match and len(match.group(3)) == 1:  # one space: imported directly, not as a dependency
+                totals[match.group(4).split(".")[0]] += int(match.group(2))
+        return totals
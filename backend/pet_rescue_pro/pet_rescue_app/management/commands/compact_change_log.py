@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from pet_rescue_app.changefeed import compact, horizon
+
+
+class Command(BaseCommand):
+    help = (
+        "Compact the change feed log: drop entries superseded by a newer event for the same "
+        "object, and expire entries older than CHANGE_LOG_RETENTION_DAYS (clients with older "
+        "cursors are told to resync)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        superseded, expired = compact(batch_size=options["batch_size"])
+        retention = getattr(settings, "CHANGE_LOG_RETENTION_DAYS", 30)
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {superseded} superseded and {expired} expired entries "
+            f"(retention {retention} days, horizon {horizon()})."
+        ))
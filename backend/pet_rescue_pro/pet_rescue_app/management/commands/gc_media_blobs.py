@@ -0,0 +1,155 @@
+import os
+from datetime import timedelta
+
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from pet_rescue_app.models import MediaBlob
+from pet_rescue_app.storage import is_content_addressed, media_file_fields
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete content-addressed media blobs that no row references any more. "
+        "Blobs with a zero reference count are re-checked against every image "
+        "field before their file is removed; files with no MediaBlob row at all "
+        "(left by rolled-back saves) are removed too."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grace-hours", type=int, default=24,
+                            help="Only collect blobs untouched for this long (protects in-flight uploads)")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--recount", action="store_true",
+                            help="First recompute every reference count from the image fields "
+                                 "(catches references leaked when a row's image was replaced)")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["grace_hours"])
+        # Bypass ContentAddressedStorage.delete(), which only drops a reference
+        fs = FileSystemStorage(location=default_storage.location)
+
+        if options["recount"] and not options["dry_run"]:
+            self._recount(options["batch_size"])
+
+        last_id, deleted, repaired = 0, 0, 0
+        while True:
+            batch = list(
+                MediaBlob.objects
+                .filter(id__gt=last_id, ref_count__lte=0, updated_at__lt=cutoff)
+                .order_by("id")
+                .values_list("id", "name")[:options["batch_size"]]
+            )
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            names = [name for _, name in batch]
+
+            # Count real references; a release may have raced with a new save of the same bytes
+            live = self._count_references(names)
+
+            dead = [name for name in names if name not in live]
+            if options["dry_run"]:
+                for name in dead:
+                    self.stdout.write(f"would delete {name}")
+                deleted += len(dead)
+                continue
+
+            for name, n in live.items():
+                MediaBlob.objects.filter(name=name).update(ref_count=n)
+            repaired += len(live)
+            deleted += self._collect(fs, dead, cutoff)
+
+        orphans = self._collect_orphans(fs, cutoff, options["batch_size"], options["dry_run"])
+
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {deleted} unreferenced blob(s) and {orphans} orphaned file(s); "
+            f"repaired {repaired} reference count(s)."
+        ))
+
+    def _collect(self, fs, names, cutoff):
+        """
+        Delete the rows of `names` that are still unreferenced, then their files.
+        The rows stay locked until the files are gone, so a save of the same
+        bytes waits and then writes the file again for its new row.
+        """
+        with transaction.atomic():
+            # A save since the batch was read bumped ref_count (and updated_at) and is skipped here
+            dead = list(
+                MediaBlob.objects.select_for_update()
+                .filter(name__in=names, ref_count__lte=0, updated_at__lt=cutoff)
+                .values_list("name", flat=True)
+            )
+            MediaBlob.objects.filter(name__in=dead).delete()
+            for name in dead:
+                fs.delete(name)
+        return len(dead)
+
+    def _collect_orphans(self, fs, cutoff, batch_size, dry_run):
+        """Delete content-addressed files older than the grace period that have no MediaBlob row."""
+        removed = 0
+        candidates = []
+        for directory, _dirs, files in os.walk(fs.location):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, fs.location).replace(os.sep, "/")
+                if is_content_addressed(name):
+                    candidates.append((name, path))
+                if len(candidates) >= batch_size:
+                    removed += self._remove_orphans(candidates, cutoff, dry_run)
+                    candidates = []
+        return removed + self._remove_orphans(candidates, cutoff, dry_run)
+
+    def _remove_orphans(self, candidates, cutoff, dry_run):
+        known = set(MediaBlob.objects.filter(name__in=[name for name, _ in candidates]).values_list("name", flat=True))
+        removed = 0
+        for name, path in candidates:
+            if name in known:
+                continue
+            try:
+                # A save in flight writes the file afresh, so a recent mtime means it may be claimed
+                if os.path.getmtime(path) >= cutoff.timestamp():
+                    continue
+                if dry_run:
+                    self.stdout.write(f"would delete orphan {name}")
+                else:
+                    os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+        return removed
+
+    def _count_references(self, names):
+        """name -> number of rows across all image fields pointing at it."""
+        live = {}
+        for model, field in media_file_fields():
+            rows = (
+                model.objects.filter(**{f"{field}__in": names})
+                .values(field).annotate(n=Count("pk")).values_list(field, "n")
+            )
+            for name, n in rows:
+                live[name] = live.get(name, 0) + n
+        return live
+
+    def _recount(self, batch_size):
+        last_id, changed = 0, 0
+        while True:
+            batch = list(
+                MediaBlob.objects.filter(id__gt=last_id).order_by("id")
+                .values_list("id", "name", "ref_count")[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            live = self._count_references([name for _, name, _ in batch])
+            for blob_id, name, ref_count in batch:
+                actual = live.get(name, 0)
+                if actual != ref_count:
+                    MediaBlob.objects.filter(id=blob_id).update(ref_count=actual)
+                    changed += 1
+        self.stdout.write(f"Recounted references; {changed} blob(s) corrected.")
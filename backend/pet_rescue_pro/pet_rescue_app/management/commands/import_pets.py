@@ -0,0 +1,40 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pet_rescue_app.bulk_import import IMPORT_CHUNK_SIZE, PetBulkImporter, parse_rows
+from pet_rescue_app.models import Profile
+
+
+class Command(BaseCommand):
+    help = "Bulk import pets (and their lost/found reports) from a CSV or JSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON file with one pet per row")
+        parser.add_argument("--user", required=True, help="Email of the shelter/partner account the pets are reported by")
+        parser.add_argument("--images", help="Zip archive with the images referenced in the 'image' column")
+        parser.add_argument("--format", choices=["csv", "json"], help="Override format detection by file extension")
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = Profile.objects.get(email=options["user"])
+        except Profile.DoesNotExist:
+            raise CommandError(f"No user with email {options['user']}")
+
+        with open(options["path"], "rb") as fh:
+            try:
+                rows = parse_rows(fh, options["format"])
+            except (ValueError, UnicodeDecodeError) as e:
+                raise CommandError(f"Could not read import file: {e}")
+
+        images = open(options["images"], "rb") if options["images"] else None
+        try:
+            result = PetBulkImporter(user, images=images, chunk_size=options["chunk_size"]).run(rows)
+        finally:
+            if images:
+                images.close()
+
+        for error in result["errors"]:
+            self.stderr.write(f"row {error['row']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(f"Imported {result['created']} pet(s), {result['failed']} row(s) failed."))
@@ -0,0 +1,59 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pet_rescue_app.changefeed import record
+from pet_rescue_app.models import Pet, PetType, SavedSearch
+from pet_rescue_app.pet_types import display_pet_type, normalize_pet_type, pet_type_registry
+from pet_rescue_app.saved_searches import saved_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Merge pet types that differ only by case, whitespace or synonym "
+        "(e.g. 'dog', 'Dog ', 'DOG', 'puppy') and repoint their pets and saved searches in bulk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only print what would be merged")
+
+    def handle(self, *args, **options):
+        groups = defaultdict(list)
+        for pet_type_id, name in PetType.objects.order_by("id").values_list("id", "type"):
+            groups[normalize_pet_type(name)].append((pet_type_id, name))
+
+        merged = 0
+        with transaction.atomic():
+            for key, members in groups.items():
+                keep_id, keep_name = members[0]
+                duplicate_ids = [pet_type_id for pet_type_id, _ in members[1:]]
+                canonical_name = display_pet_type(key)
+
+                if not duplicate_ids and keep_name == canonical_name:
+                    continue
+
+                names = ", ".join(repr(name) for _, name in members)
+                self.stdout.write(f"{names} -> {canonical_name!r} (id {keep_id})")
+                if options["dry_run"]:
+                    continue
+
+                if duplicate_ids:
+                    # One UPDATE per group, then drop the now-unused rows
+                    moved = Pet.objects.filter(pet_type_id__in=duplicate_ids)
+                    record(moved.only("id"))  # update() skips the change log signals
+                    moved.update(pet_type_id=keep_id)
+                    searches = SavedSearch.objects.filter(pet_type_id__in=duplicate_ids)
+                    record(searches.only("id", "user_id"))
+                    searches.update(pet_type_id=keep_id)
+                    PetType.objects.filter(id__in=duplicate_ids).delete()
+                    merged += len(duplicate_ids)
+                if keep_name != canonical_name:
+                    PetType.objects.filter(id=keep_id).update(type=canonical_name)
+
+            if options["dry_run"]:
+                transaction.set_rollback(True)
+
+        pet_type_registry.invalidate()
+        saved_search_index.invalidate()
+        self.stdout.write(self.style.SUCCESS(f"Merged {merged} duplicate pet type(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from pet_rescue_app.idempotency import IDEMPOTENCY_TTL, purge_expired
+
+
+class Command(BaseCommand):
+    help = "Delete stored Idempotency-Key results older than IDEMPOTENCY_TTL_HOURS."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        removed = purge_expired(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Purged {removed} idempotency record(s) older than {IDEMPOTENCY_TTL}."))
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from pet_rescue_app.notifications import archive_read
+
+
+class Command(BaseCommand):
+    help = (
+        "Move read notifications older than NOTIFICATION_RETENTION_DAYS into the notification "
+        "archive, in small batches of short transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--days", type=int, default=None, help="Override NOTIFICATION_RETENTION_DAYS")
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+
+    def handle(self, *args, **options):
+        days = options["days"] if options["days"] is not None else getattr(settings, "NOTIFICATION_RETENTION_DAYS", 90)
+        archived = archive_read(batch_size=options["batch_size"], days=days, pause=options["pause"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} read notification(s) older than {days} days."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from pet_rescue_app.uploads import CHUNKED_UPLOAD_TTL, purge_stale
+
+
+class Command(BaseCommand):
+    help = "Delete chunked upload sessions (and their part files) older than CHUNKED_UPLOAD_TTL_HOURS."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        removed = purge_stale(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Purged {removed} upload session(s) older than {CHUNKED_UPLOAD_TTL}."))
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from pet_rescue_app.fanout import resumable_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued notification fan-out jobs and resume running ones that stopped making "
+        "progress (e.g. their worker was restarted). Jobs continue after their last recipient."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--job", type=int, action="append", help="Only this job id (repeatable)")
+        parser.add_argument("--stale-minutes", type=int, default=10,
+                            help="A running job with no progress for this long is taken over")
+        parser.add_argument("--chunk-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(minutes=options["stale_minutes"])
+        job_ids = options["job"] or resumable_jobs(options["stale_minutes"])
+        for job_id in job_ids:
+            job = run_job(job_id, chunk_size=options["chunk_size"], stale_after=stale_after)
+            style = self.style.SUCCESS if job.status == "done" else self.style.WARNING
+            self.stdout.write(style(f"{job}{': ' + job.error if job.error else ''}"))
+        if not job_ids:
+            self.stdout.write("No fan-out jobs to run.")
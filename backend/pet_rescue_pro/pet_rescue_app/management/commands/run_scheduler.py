@@ -0,0 +1,74 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from pet_rescue_app.models import ScheduledJob
+from pet_rescue_app.scheduler import Scheduler, discover, jobs
+
+
+def _local(value):
+    return timezone.localtime(value).strftime("%Y-%m-%d %H:%M") if value else "-"
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the periodic maintenance jobs registered in the apps' jobs.py modules. Start one on "
+        "as many nodes as you like: advisory locks make sure each job runs on one node at a time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run the jobs that are due now, then exit")
+        parser.add_argument("--run", metavar="NAME", action="append",
+                            help="Run this job now whatever its schedule, then exit (repeatable)")
+        parser.add_argument("--list", action="store_true", help="Show the jobs, their schedules and last results")
+        parser.add_argument("--poll", type=float, default=None, help="Seconds between polls (SCHEDULER_POLL_SECONDS)")
+
+    def handle(self, *args, **options):
+        discover()
+        if options["list"]:
+            return self._list()
+
+        scheduler = Scheduler()
+        if options["run"]:
+            unknown = set(options["run"]) - set(jobs)
+            if unknown:
+                raise CommandError(f"Unknown job(s) {', '.join(sorted(unknown))}; one of {', '.join(sorted(jobs))}")
+            try:
+                for name in options["run"]:
+                    run = scheduler.run(ScheduledJob.objects.get(name=name), force=True)
+                    self._report(name, run)
+            finally:
+                scheduler.close()
+            return
+
+        if options["once"]:
+            try:
+                runs = scheduler.run_due()
+            finally:
+                scheduler.close()
+            for run in runs:
+                self._report(run.job.name, run)
+            if not runs:
+                self.stdout.write("No jobs due.")
+            return
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: scheduler.stop())  # finish the current job, then exit
+        self.stdout.write(f"Scheduler {scheduler.node} running {len(jobs)} job(s); Ctrl-C to stop.")
+        scheduler.run_forever(poll=options["poll"])
+
+    def _report(self, name, run):
+        if run is None:
+            self.stdout.write(self.style.WARNING(f"{name}: running on another node, skipped."))
+            return
+        style = self.style.SUCCESS if run.status == "ok" else self.style.ERROR
+        self.stdout.write(style(f"{name}: {run.status} in {run.duration_ms} ms {run.result}".rstrip()))
+
+    def _list(self):
+        for scheduled in ScheduledJob.objects.filter(name__in=list(jobs)).order_by("name"):
+            self.stdout.write(
+                f"{scheduled.name:<28} {scheduled.schedule:<14} {'on ' if scheduled.enabled else 'off'} "
+                f"next {_local(scheduled.next_run_at)}  last {_local(scheduled.last_run_at)} "
+                f"{scheduled.last_status or ''}".rstrip()
+            )
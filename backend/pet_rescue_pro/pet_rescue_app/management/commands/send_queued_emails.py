@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from pet_rescue_app.outbox import send_queued
+
+
+class Command(BaseCommand):
+    help = "Send queued emails (vaccination reminders and other bulk mail) in batches over one SMTP connection each."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many emails")
+
+    def handle(self, *args, **options):
+        sent, failed = send_queued(batch_size=options["batch_size"], limit=options["limit"])
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} email(s); {failed} failed."))
@@ -0,0 +1,32 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pet_rescue_app.vaccinations import DEFAULT_CHUNK_SIZE, send_due_reminders
+
+
+class Command(BaseCommand):
+    help = (
+        "Notify (and queue an email to) the owners of pets whose vaccination is due within "
+        "VACCINATION_REMINDER_WINDOW_DAYS. Safe to rerun: each cycle is reminded once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Run as of this date (YYYY-MM-DD) instead of today")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--no-email", action="store_true", help="Only create in-app notifications")
+
+    def handle(self, *args, **options):
+        today = None
+        if options["date"]:
+            try:
+                today = date.fromisoformat(options["date"])
+            except ValueError:
+                raise CommandError("--date must be YYYY-MM-DD")
+        stats = send_due_reminders(today=today, chunk_size=options["chunk_size"], email=not options["no_email"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {stats['scanned']} vaccination(s) in {stats['chunks']} chunk(s): "
+            f"{stats['reminded']} reminded, {stats['already_reminded']} already reminded, "
+            f"{stats['no_owner']} without an owner, {stats['emails']} email(s) queued "
+            f"in {stats['seconds']}s."
+        ))
@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+
+from pet_rescue_app.adoptions import AdoptionDecisionError, decide
+from pet_rescue_app.models import Pet, PetAdoption, PetType, Profile
+
+
+class Command(BaseCommand):
+    help = (
+        "Race concurrent approvals of different adoption requests for the same pets through "
+        "adoptions.decide() and check that no pet ends up with more than one approved request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pets", type=int, default=5)
+        parser.add_argument("--requests", type=int, default=8, help="Pending requests per pet")
+        parser.add_argument("--threads", type=int, default=8)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            # SQLite serializes writers with a database lock instead of FOR UPDATE, so the run
+            # still checks the outcome but not the row locking itself
+            self.stderr.write(self.style.WARNING(f"Running on {connection.vendor}: SELECT ... FOR UPDATE is a no-op"))
+
+        admin = Profile.objects.create(username="stress-admin", email="stress-admin@example.com", password="!")
+        try:
+            self._run(admin, options)
+        finally:
+            Pet.objects.filter(created_by=admin).delete()
+            Profile.objects.filter(username__startswith="stress-", email__endswith="@example.com").delete()
+
+    def _run(self, admin, options):
+        pet_type, _ = PetType.objects.get_or_create(type="Dog")
+        requestors = Profile.objects.bulk_create([
+            Profile(username=f"stress-{i}", email=f"stress-{i}@example.com", password="!")
+            for i in range(options["requests"])
+        ])
+        pets = Pet.objects.bulk_create([
+            Pet(name=f"Stress {i}", pet_type=pet_type, created_by=admin) for i in range(options["pets"])
+        ])
+        PetAdoption.objects.bulk_create([
+            PetAdoption(pet=pet, requestor=requestor, message="Please", status="Pending")
+            for pet in pets for requestor in requestors
+        ])
+        # Every worker goes after every pet, each approving a different request
+        jobs = [
+            [(adoption.pet_id, adoption.id) for adoption in PetAdoption.objects.filter(pet__in=pets).order_by("pet_id", "id")
+             if adoption.requestor_id == requestors[worker % len(requestors)].id]
+            for worker in range(options["threads"])
+        ]
+
+        outcomes = Counter()
+        lock = threading.Lock()
+        start = threading.Barrier(options["threads"])
+
+        def worker(assignments):
+            start.wait()
+            try:
+                for pet_id, adoption_id in assignments:
+                    try:
+                        decide(pet_id, "Approved", admin, adoption_id=adoption_id)
+                        outcome = "approved"
+                    except AdoptionDecisionError:
+                        outcome = "refused"
+                    except OperationalError:
+                        outcome = "lock timeout"
+                    with lock:
+                        outcomes[outcome] += 1
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(assignments,)) for assignments in jobs]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        approved = Counter(PetAdoption.objects.filter(pet__in=pets, status="Approved").values_list("pet_id", flat=True))
+        pending = PetAdoption.objects.filter(pet__in=list(approved), status="Pending").count()
+        self.stdout.write(
+            f"{sum(outcomes.values())} decisions on {len(pets)} pets from {len(threads)} threads in {elapsed:.2f}s: "
+            + ", ".join(f"{count} {outcome}" for outcome, count in sorted(outcomes.items()))
+        )
+        self.stdout.write(f"approved requests per pet: {sorted(Counter(approved.values()).items())}, pending on adopted pets: {pending}")
+
+        doubled = [pet_id for pet_id, count in approved.items() if count > 1]
+        if doubled:
+            raise CommandError(f"Pets with more than one approved adoption: {doubled}")
+        if pending:
+            raise CommandError(f"{pending} requests were left pending after a pet was adopted")
+        self.stdout.write(self.style.SUCCESS("No pet was adopted twice"))
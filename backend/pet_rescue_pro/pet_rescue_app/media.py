@@ -0,0 +1,209 @@
+# pet_rescue_app/media.py
+"""
+Media file serving.
+
+serve_media decides whether a file may be served and computes the cache
+headers. Browsers load images with a plain <img src>, which sends no
+Authorization header, so a content-addressed name (see storage.py) is its
+own permission: its sha256 cannot be guessed, only read from an API
+response the client was allowed to see. Other (legacy) names are served
+when one of the rows storing them allows it:
+
+    anyone        profile and feedback story images; report images and
+                  their pets' images once the report is public (Accepted,
+                  Resolved, Reunited)
+    its owner     pending or rejected reports (the reporter, the pet's
+                  creator)
+    admins        everything
+
+Anything else answers 404, as for a missing file. The user comes from the
+session or a JWT Authorization header. Files that are not public get
+private cache headers, whichever way they were allowed. The byte transfer itself is handed to the front proxy
+when MEDIA_ACCEL_MODE is set:
+
+    "x-accel-redirect"  nginx: internal location at MEDIA_ACCEL_PREFIX
+    "x-sendfile"        Apache mod_xsendfile / lighttpd: absolute file path
+
+Without a proxy, whole files go out through FileResponse (wsgi.file_wrapper,
+i.e. sendfile where the server supports it) and single byte ranges are
+streamed from a seek. Content-addressed names (see storage.py) never change,
+so they are served as immutable for a year.
+"""
+import mimetypes
+import os
+import posixpath
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import SuspiciousFileOperation
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import AuthenticationFailed
+
+from .identity import IdentityMapJWTAuthentication
+from .models import FeedbackStory, Pet, PetReport, Profile
+from .storage import is_content_addressed
+
+MEDIA_ACCEL_MODE = getattr(settings, "MEDIA_ACCEL_MODE", None)
+MEDIA_ACCEL_PREFIX = getattr(settings, "MEDIA_ACCEL_PREFIX", "/protected-media/")
+MEDIA_PUBLIC_PREFIXES = getattr(
+    settings,
+    "MEDIA_PUBLIC_PREFIXES",
+    ("pet_images/", "report_images/", "profile_images/", "feedback_stories/"),
+)
+MEDIA_MUTABLE_MAX_AGE = getattr(settings, "MEDIA_MUTABLE_MAX_AGE", 3600)
+IMMUTABLE_CACHE_CONTROL = "max-age=31536000, immutable"
+PUBLIC_REPORT_STATUSES = ("Accepted", "Resolved", "Reunited")
+RANGE_CHUNK_SIZE = 64 * 1024
+
+
+def is_servable(path):
+    """Only files under the upload prefixes; no traversal, no hidden/temp files."""
+    normalized = posixpath.normpath(path)
+    if normalized != path or path.startswith(("/", "../")):
+        return False
+    if any(part.startswith(".") for part in path.split("/")):
+        return False
+    return path.startswith(tuple(MEDIA_PUBLIC_PREFIXES))
+
+
+def media_user(request):
+    """The session user, else the user of a valid JWT Authorization header, else AnonymousUser."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user
+    try:
+        authenticated = IdentityMapJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:  # includes InvalidToken
+        authenticated = None
+    return authenticated[0] if authenticated else AnonymousUser()
+
+
+def is_public(path):
+    """True when anyone may see the file (see the module docstring)."""
+    if FeedbackStory.objects.filter(image=path).exists() or Profile.objects.filter(profile_image=path).exists():
+        return True
+    return PetReport.objects.filter(
+        Q(image=path) | Q(pet__image=path), report_status__in=PUBLIC_REPORT_STATUSES
+    ).exists()
+
+
+def can_view(user, path):
+    """True when `user` may see a legacy-named file that is not public: its owner, or an admin."""
+    if not user.is_authenticated:
+        return False
+    if user.is_staff or user.is_superuser:
+        return True
+    return (
+        PetReport.objects.filter(Q(image=path) | Q(pet__image=path), user_id=user.id).exists()
+        or Pet.objects.filter(image=path, created_by_id=user.id).exists()
+    )
+
+
+def etag_for(path, stat):
+    if is_content_addressed(path):
+        return '"%s"' % os.path.splitext(posixpath.basename(path))[0]
+    return '"%x-%x"' % (int(stat.st_mtime), stat.st_size)
+
+
+def parse_range(header, size):
+    """(start, end_inclusive) for a single 'bytes=' range, None if absent/unsupported, 'invalid' if unsatisfiable."""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, _, end = header[6:].strip().partition("-")
+    try:
+        if start == "":
+            length = int(end)
+            if length <= 0:
+                return "invalid"
+            return max(size - length, 0), size - 1
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return "invalid"
+    return start, min(end, size - 1)
+
+
+def _read_range(fh, start, length):
+    try:
+        fh.seek(start)
+        while length > 0:
+            block = fh.read(min(RANGE_CHUNK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        fh.close()
+
+
+def _accel_response(path, full_path, content_type):
+    response = HttpResponse(content_type=content_type)
+    if MEDIA_ACCEL_MODE == "x-accel-redirect":
+        response["X-Accel-Redirect"] = MEDIA_ACCEL_PREFIX.rstrip("/") + "/" + quote(path)
+    else:
+        response["X-Sendfile"] = full_path
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    if not is_servable(path):
+        raise Http404("Not found")
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (OSError, SuspiciousFileOperation):
+        raise Http404("Not found")
+
+    public = is_public(path)
+    if not public and not is_content_addressed(path) and not can_view(media_user(request), path):
+        raise Http404("Not found")  # the same answer as a missing file
+
+    etag = etag_for(path, stat)
+    cache_control = "%s, %s" % (
+        "public" if public else "private",
+        IMMUTABLE_CACHE_CONTROL if is_content_addressed(path) else f"max-age={MEDIA_MUTABLE_MAX_AGE}",
+    )
+
+    if etag in [tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")]:
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        response["Cache-Control"] = cache_control
+        return response
+
+    content_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+
+    if MEDIA_ACCEL_MODE:
+        # The proxy handles Range and sends the bytes itself
+        response = _accel_response(path, full_path, content_type)
+    else:
+        byte_range = None
+        if request.headers.get("If-Range", etag) == etag:
+            byte_range = parse_range(request.headers.get("Range"), stat.st_size)
+
+        if byte_range == "invalid":
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+        elif byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                _read_range(open(full_path, "rb"), start, length), status=206, content_type=content_type
+            )
+            response["Content-Length"] = str(length)
+            response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        else:
+            response = FileResponse(open(full_path, "rb"), content_type=content_type)
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    response["Cache-Control"] = cache_control
+    return response
@@ -0,0 +1,209 @@
+# pet_rescue_app/middleware.py
+"""
+Response compression.
+
+CompressionMiddleware encodes responses with brotli (when the Brotli or
+brotlicffi package is installed and the client accepts "br") or gzip. Only
+content types on the allow-list are compressed. Regular responses must be at
+least MIN_SIZE bytes and must actually shrink; streamed responses (JSON
+lists, CSV/NDJSON exports) are compressed chunk by chunk as they are sent.
+The middleware runs natively in both sync and async mode.
+
+BREACH: like django.middleware.gzip.GZipMiddleware, every gzip response
+carries up to RANDOM_PADDING random bytes in the gzip header ("Heal the
+Breach"), so its length no longer tracks the compressed body exactly.
+brotli has no such padding and is only used for requests that carry no
+credentials (no Authorization header, no cookies); those responses hold no
+per-user secret an attacker could probe for.
+"""
+import re
+import secrets
+import struct
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli  # same API, for PyPy
+    except ImportError:  # optional; gzip only
+        brotli = None
+
+DEFAULTS = {
+    "MIN_SIZE": 1024,
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 5,
+    "RANDOM_PADDING": 100,  # max random bytes in the gzip header, as GZipMiddleware
+    "CONTENT_TYPES": (
+        "application/json",
+        "application/x-ndjson",
+        "text/csv",
+        "text/html",
+        "text/plain",
+        "text/css",
+        "application/javascript",
+        "image/svg+xml",
+    ),
+}
+
+_accepts_br = re.compile(r"\bbr\b")
+_accepts_gzip = re.compile(r"\bgzip\b")
+
+
+def compression_settings():
+    return {**DEFAULTS, **getattr(settings, "RESPONSE_COMPRESSION", {})}
+
+
+def choose_encoding(accept_encoding, credentialed=False):
+    if brotli is not None and not credentialed and _accepts_br.search(accept_encoding):
+        return "br"
+    if _accepts_gzip.search(accept_encoding):
+        return "gzip"
+    return None
+
+
+def has_credentials(request):
+    return bool(request.META.get("HTTP_AUTHORIZATION") or request.COOKIES)
+
+
+class GzipWriter:
+    """
+    One gzip member written incrementally. The header holds a file name of
+    0..max_random_bytes-1 random bytes, as django.utils.text.compress_string()
+    does, but the compression level stays configurable and the body can be
+    flushed chunk by chunk.
+    """
+
+    def __init__(self, level, max_random_bytes):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self.crc = 0
+        self.size = 0
+        self.header = self._header(max_random_bytes)
+
+    @staticmethod
+    def _header(max_random_bytes):
+        padding = b"a" * secrets.randbelow(max_random_bytes) if max_random_bytes else b""
+        flags = 0x08 if padding else 0  # FNAME
+        # magic, deflate, flags, mtime 0, no extra flags, OS unknown
+        return b"\x1f\x8b\x08" + bytes([flags]) + b"\x00\x00\x00\x00\x00\xff" + (padding + b"\x00" if padding else b"")
+
+    def write(self, data, flush=False):
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+        out = self.compressor.compress(data)
+        if flush:
+            out += self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        if self.header:
+            out, self.header = self.header + out, b""
+        return out
+
+    def finish(self):
+        return self.header + self.compressor.flush() + struct.pack("<LL", self.crc, self.size & 0xFFFFFFFF)
+
+
+def _gzip_writer(config):
+    return GzipWriter(config["GZIP_LEVEL"], config["RANDOM_PADDING"])
+
+
+def compress(content, encoding, config):
+    if encoding == "br":
+        return brotli.compress(content, quality=config["BROTLI_QUALITY"])
+    writer = _gzip_writer(config)
+    return writer.write(content) + writer.finish()
+
+
+def compress_stream(chunks, encoding, config):
+    """Compress an iterator of byte chunks, flushing after each so clients see data as it is produced."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=config["BROTLI_QUALITY"])
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+
+    writer = _gzip_writer(config)
+    for chunk in chunks:
+        data = writer.write(chunk, flush=True)
+        if data:
+            yield data
+    yield writer.finish()
+
+
+async def acompress_stream(chunks, encoding, config):
+    """compress_stream() for the async iterators of streaming responses from async views."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=config["BROTLI_QUALITY"])
+        async for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+
+    writer = _gzip_writer(config)
+    async for chunk in chunks:
+        data = writer.write(chunk, flush=True)
+        if data:
+            yield data
+    yield writer.finish()
+
+
+class CompressionMiddleware:
+    # Usable in both modes, so async views under ASGI are not pushed through a thread
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = compression_settings()
+        self.content_types = frozenset(self.config["CONTENT_TYPES"])
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if response.status_code in (204, 206, 304) or response.has_header("Content-Encoding"):
+            return response
+        content_type = response.get("Content-Type", "").split(";", 1)[0].strip().lower()
+        if content_type not in self.content_types:
+            return response
+
+        # The response differs by Accept-Encoding whether or not this client gets it compressed
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""), has_credentials(request))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            stream = acompress_stream if response.is_async else compress_stream
+            response.streaming_content = stream(response.streaming_content, encoding, self.config)
+            del response["Content-Length"]
+        else:
+            if len(response.content) < self.config["MIN_SIZE"]:
+                return response
+            compressed = compress(response.content, encoding, self.config)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        # Compressed bytes differ from the uncompressed representation
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
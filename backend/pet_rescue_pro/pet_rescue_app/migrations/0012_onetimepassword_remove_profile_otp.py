@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:47
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet_rescue_app', '0011_userreport'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='profile',
+            name='otp',
+        ),
+        migrations.CreateModel(
+            name='OneTimePassword',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254)),
+                ('purpose', models.CharField(choices=[('verification', 'Account verification'), ('password_reset', 'Password reset')], max_length=20)),
+                ('code_hash', models.CharField(max_length=128)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_sent_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('email', 'purpose'), name='unique_otp_per_email_purpose')],
+            },
+        ),
+    ]
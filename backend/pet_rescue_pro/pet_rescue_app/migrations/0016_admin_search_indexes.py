@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# Admin prefix search ("^field") runs UPPER(col::text) LIKE UPPER('term%'); on PostgreSQL
+# that can only use an expression index with text_pattern_ops. Built concurrently so large
+# tables are not locked; other databases keep using a scan.
+INDEXES = [
+    ("pet_rescue_app_profile_username_upper_like", "pet_rescue_app_profile", "username"),
+    ("pet_rescue_app_profile_email_upper_like", "pet_rescue_app_profile", "email"),
+    ("pet_rescue_app_pet_name_upper_like", "pet_rescue_app_pet", "name"),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, table, column in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" (UPPER("{column}"::text) text_pattern_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _table, _column in INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('pet_rescue_app', '0015_mediablob'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:20
+
+from django.db import migrations, models
+
+
+def reject_duplicate_approvals(apps, schema_editor):
+    # Keep the earliest approved request per pet; later approvals of the same pet become rejections
+    PetAdoption = apps.get_model('pet_rescue_app', 'PetAdoption')
+    seen = set()
+    duplicates = []
+    for pk, pet_id in PetAdoption.objects.filter(status='Approved').order_by('pet_id', 'id').values_list('id', 'pet_id'):
+        if pet_id in seen:
+            duplicates.append(pk)
+        seen.add(pet_id)
+    if duplicates:
+        PetAdoption.objects.filter(pk__in=duplicates).update(status='Rejected')
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet_rescue_app', '0016_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(reject_duplicate_approvals, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='petadoption',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'Approved')), fields=('pet',), name='one_approved_adoption_per_pet'),
+        ),
+    ]
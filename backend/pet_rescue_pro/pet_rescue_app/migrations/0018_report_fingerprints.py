@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet_rescue_app', '0017_one_approved_adoption_per_pet'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='petreport',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='pet_rescue_app.petreport'),
+        ),
+        migrations.CreateModel(
+            name='ReportFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprints', to='pet_rescue_app.petreport')),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet_rescue_app', '0018_report_fingerprints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogCompaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('horizon', models.BigIntegerField()),
+                ('removed', models.IntegerField()),
+                ('ran_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=32)),
+                ('object_id', models.BigIntegerField()),
+                ('op', models.CharField(choices=[('upsert', 'upsert'), ('delete', 'delete')], max_length=6)),
+                ('receiver_id', models.BigIntegerField(blank=True, null=True)),
+                ('admin_only', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model', 'object_id'], name='pet_rescue__model_631059_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet_rescue_app', '0019_change_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+                ('modified_date', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('pet_status', models.CharField(blank=True, choices=[('Lost', 'Lost'), ('Found', 'Found')], max_length=20, null=True)),
+                ('breed', models.CharField(blank=True, max_length=100, null=True)),
+                ('color', models.CharField(blank=True, max_length=50, null=True)),
+                ('gender', models.CharField(blank=True, choices=[('Male', 'Male'), ('Female', 'Female')], max_length=10, null=True)),
+                ('city', models.CharField(blank=True, max_length=100, null=True)),
+                ('pincode_prefix', models.CharField(blank=True, max_length=6, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s_set', to=settings.AUTH_USER_MODEL)),
+                ('modified_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='modified_%(class)s_set', to=settings.AUTH_USER_MODEL)),
+                ('pet_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='pet_rescue_app.pettype')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:33
+
+from django.db import migrations, models
+
+INDEX = models.Index(fields=['receiver', 'report', 'is_read'], name='notification_coalesce_idx')
+
+
+def create_index(apps, schema_editor):
+    # The notification table is large: build the index without blocking writes on PostgreSQL
+    model = apps.get_model('pet_rescue_app', 'Notification')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS "notification_coalesce_idx" ON "pet_rescue_app_notification" '
+            '("receiver_id", "report_id", "is_read")'
+        )
+    else:
+        schema_editor.add_index(model, INDEX)
+
+
+def drop_index(apps, schema_editor):
+    model = apps.get_model('pet_rescue_app', 'Notification')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS "notification_coalesce_idx"')
+    else:
+        schema_editor.remove_index(model, INDEX)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('pet_rescue_app', '0021_fanout_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('sender_id', models.BigIntegerField(blank=True, null=True)),
+                ('receiver_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('pet_id', models.BigIntegerField(blank=True, null=True)),
+                ('report_id', models.BigIntegerField(blank=True, null=True)),
+                ('content', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='coalesced',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[migrations.AddIndex(model_name='notification', index=INDEX)],
+            database_operations=[migrations.RunPython(create_index, drop_index)],
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+KEYSET_INDEX = models.Index(fields=['last_vaccinated_date', 'id'], name='medical_vaccinated_keyset_idx')
+
+
+def create_keyset_index(apps, schema_editor):
+    # Medical history can be large: build the index without blocking writes on PostgreSQL
+    model = apps.get_model('pet_rescue_app', 'PetMedicalHistory')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS "medical_vaccinated_keyset_idx" '
+            'ON "pet_rescue_app_petmedicalhistory" ("last_vaccinated_date", "id")'
+        )
+    else:
+        schema_editor.add_index(model, KEYSET_INDEX)
+
+
+def drop_keyset_index(apps, schema_editor):
+    model = apps.get_model('pet_rescue_app', 'PetMedicalHistory')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS "medical_vaccinated_keyset_idx"')
+    else:
+        schema_editor.remove_index(model, KEYSET_INDEX)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('pet_rescue_app', '0022_notification_coalescing_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('to_email', models.EmailField(max_length=254)),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                ('status', models.CharField(choices=[('queued', 'queued'), ('sent', 'sent'), ('failed', 'failed')], default='queued', max_length=10)),
+                ('attempts', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VaccinationReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('due_date', models.DateField()),
+                ('vaccination_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[migrations.AddIndex(model_name='petmedicalhistory', index=KEYSET_INDEX)],
+            database_operations=[migrations.RunPython(create_keyset_index, drop_keyset_index)],
+        ),
+        migrations.AddIndex(
+            model_name='queuedemail',
+            index=models.Index(fields=['status', 'id'], name='queued_email_status_idx'),
+        ),
+        migrations.AddField(
+            model_name='vaccinationreminder',
+            name='pet',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vaccination_reminders', to='pet_rescue_app.pet'),
+        ),
+        migrations.AddField(
+            model_name='vaccinationreminder',
+            name='receiver',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='vaccinationreminder',
+            constraint=models.UniqueConstraint(fields=('pet', 'due_date'), name='one_vaccination_reminder_per_cycle'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_tables(apps, schema_editor):
+    # CACHES defaults to a database cache (settings.py); create its table with the schema so
+    # the unread-count and namespace-version writes in signals never hit a missing table
+    call_command("createcachetable", database=schema_editor.connection.alias, verbosity=0)
+
+
+def drop_cache_tables(apps, schema_editor):
+    for alias in settings.CACHES:
+        cache = caches[alias]
+        if isinstance(cache, DatabaseCache):
+            schema_editor.execute(f"DROP TABLE IF EXISTS {schema_editor.quote_name(cache._table)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet_rescue_app', '0024_scheduled_jobs'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_tables, drop_cache_tables),
+    ]
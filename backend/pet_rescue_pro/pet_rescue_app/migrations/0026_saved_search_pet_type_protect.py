@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet_rescue_app', '0025_cache_table'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='savedsearch',
+            name='pet_type',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='pet_rescue_app.pettype'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pet_rescue_app', '0026_saved_search_pet_type_protect'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vaccinationreminder',
+            name='run',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+    ]
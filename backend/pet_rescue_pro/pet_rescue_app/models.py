@@ -1,3 +1,4 @@
+import uuid
 from django.db import models
 from django.contrib.auth.hashers import make_password
 from django.utils import timezone
@@ -50,7 +51,6 @@ class Profile(AbstractBaseUser, PermissionsMixin):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    otp = models.CharField(max_length=6, blank=True, null=True)
     is_verified = models.BooleanField(default=False)
 
     # 🔹 Required for Django Admin
@@ -105,6 +105,12 @@ class PetMedicalHistory(BaseModel):
     stage = models.IntegerField(blank=True, null=True)
     no_of_years = models.IntegerField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # Keyset scan of vaccinations coming due (vaccinations.send_due_reminders)
+            models.Index(fields=["last_vaccinated_date", "id"], name="medical_vaccinated_keyset_idx"),
+        ]
+
     def __str__(self):
         return f"{self.pet.name} Medical History"
 
@@ -119,11 +125,28 @@ class PetReport(BaseModel):
     report_status = models.CharField(max_length=20, choices=REPORT_STATUS_CHOICES, default="Pending")
     image = models.ImageField(upload_to="report_images/", blank=True, null=True)
     is_resolved = models.BooleanField(default=False)
+    # Set when duplicates.check_report() matched an earlier report by someone else
+    duplicate_of = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, null=True, blank=True, related_name="duplicates"
+    )
 
     def __str__(self):
         return f"{self.pet.name} - {self.pet_status}"
 
 
+class ReportFingerprint(models.Model):
+    """
+    Lookup keys of a report for duplicate detection (see duplicates.py):
+    one for its normalized attributes in a time bucket, one for its image.
+    """
+    key = models.CharField(max_length=64, unique=True)  # sha256 hex
+    report = models.ForeignKey(PetReport, on_delete=models.CASCADE, related_name="fingerprints")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.key[:12]} -> report {self.report_id}"
+
+
 class PetAdoption(BaseModel):
     STATUS_CHOICES = [("Pending", "Pending"), ("Approved", "Approved"), ("Rejected", "Rejected")]
 
@@ -132,6 +155,14 @@ class PetAdoption(BaseModel):
     message = models.TextField(blank=True, null=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="Pending")
 
+    class Meta:
+        constraints = [
+            # At most one approved request per pet (see adoptions.decide)
+            models.UniqueConstraint(
+                fields=["pet"], condition=models.Q(status="Approved"), name="one_approved_adoption_per_pet"
+            ),
+        ]
+
     def __str__(self):
         return f"Adoption Request for {self.pet.name} by {self.requestor.username}"
 
@@ -150,7 +181,11 @@ class Notification(models.Model):
     # ← Already exists: links notification to a specific pet report
 
     is_read = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True)  # moved forward when a newer update is merged in
+    coalesced = models.PositiveIntegerField(default=0)  # earlier updates merged into this row (notifications.notify)
+
+    class Meta:
+        indexes = [models.Index(fields=["receiver", "report", "is_read"], name="notification_coalesce_idx")]
 
     def __str__(self):
         receiver_name = self.receiver.username if self.receiver else "Unknown"
@@ -236,4 +271,269 @@ class UserReport(BaseModel):
     report_status = models.CharField(max_length=20, choices=REPORT_STATUS_CHOICES, default="Pending")
 
     def _str_(self):
-        return f"{self.report_type} report for Pet Report #{self.pet_report.id}"
\ No newline at end of file
+        return f"{self.report_type} report for Pet Report #{self.pet_report.id}"
+
+class OneTimePassword(models.Model):
+    """
+    Short-lived OTP issued for account verification or password reset.
+    Kept out of Profile so issuing/verifying codes never rewrites the user row.
+    Only a keyed hash of the code is stored.
+    """
+    PURPOSE_CHOICES = [
+        ("verification", "Account verification"),
+        ("password_reset", "Password reset"),
+    ]
+
+    email = models.EmailField()
+    purpose = models.CharField(max_length=20, choices=PURPOSE_CHOICES)
+    code_hash = models.CharField(max_length=128)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_sent_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)  # purge_expired_otps scans this index
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["email", "purpose"], name="unique_otp_per_email_purpose"),
+        ]
+
+    def __str__(self):
+        return f"{self.purpose} OTP for {self.email}"
+
+
+class IdempotencyRecord(models.Model):
+    """
+    Stored result of a request made with an Idempotency-Key header, so a
+    retried submission replays the original response instead of running again.
+    """
+    user = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="idempotency_records")
+    endpoint = models.CharField(max_length=100)
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField()
+    response_body = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "endpoint", "key"], name="unique_idempotency_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.endpoint} {self.key} ({self.user_id})"
+
+
+class ChunkedUpload(models.Model):
+    """
+    Resumable upload session. Chunks are appended to a part file on disk;
+    once complete and checksum-verified, the upload token can be passed to
+    report/profile/feedback endpoints in place of the file itself.
+    """
+    STATUS_CHOICES = [
+        ("uploading", "Uploading"),
+        ("complete", "Complete"),
+        ("consumed", "Consumed"),
+    ]
+
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="chunked_uploads")
+    filename = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    checksum = models.CharField(max_length=64)  # expected sha256 hex digest
+    received_bytes = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="uploading")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received_bytes}/{self.total_size})"
+
+
+class MediaBlob(models.Model):
+    """
+    Reference-counted index of files written by ContentAddressedStorage.
+    One row per stored blob; gc_media_blobs deletes blobs nothing points at.
+    """
+    name = models.CharField(max_length=255, unique=True)  # storage path, e.g. pet_images/ab/cd/<sha256>.jpg
+    digest = models.CharField(max_length=64, db_index=True)
+    size = models.BigIntegerField()
+    ref_count = models.IntegerField(default=0, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
+class SavedSearch(BaseModel):
+    """
+    A user's subscription to newly accepted reports. Blank criteria match
+    anything; at least one is set. Matched through saved_searches.py.
+    """
+    PET_STATUS_CHOICES = [("Lost", "Lost"), ("Found", "Found")]
+
+    user = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="saved_searches")
+    name = models.CharField(max_length=100, blank=True)
+    pet_type = models.ForeignKey(PetType, on_delete=models.PROTECT, blank=True, null=True)
+    pet_status = models.CharField(max_length=20, choices=PET_STATUS_CHOICES, blank=True, null=True)
+    breed = models.CharField(max_length=100, blank=True, null=True)
+    color = models.CharField(max_length=50, blank=True, null=True)
+    gender = models.CharField(max_length=10, choices=Pet.GENDER_CHOICES, blank=True, null=True)
+    city = models.CharField(max_length=100, blank=True, null=True)
+    pincode_prefix = models.CharField(max_length=6, blank=True, null=True)  # "5600" matches 560001-560099
+    is_active = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"{self.user} - {self.name or self.id}"
+
+
+class FanoutJob(BaseModel):
+    """
+    One notification sent to every profile of an audience, in chunks outside
+    the request (see fanout.py). Progress is saved with every chunk, so an
+    interrupted job resumes after last_recipient_id.
+    """
+    STATUS_CHOICES = [("queued", "queued"), ("running", "running"), ("done", "done"), ("failed", "failed")]
+
+    audience = models.CharField(max_length=50)  # key in fanout.audiences
+    params = models.JSONField(default=dict, blank=True)
+    template = models.TextField()  # str.format template, e.g. "Hi {username}, ..."
+    pet = models.ForeignKey(Pet, on_delete=models.SET_NULL, blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued", db_index=True)
+    total = models.IntegerField(blank=True, null=True)
+    sent = models.IntegerField(default=0)
+    last_recipient_id = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.audience} fan-out #{self.id} ({self.status}, {self.sent}/{self.total})"
+
+
+class NotificationArchive(models.Model):
+    """
+    Read notifications past NOTIFICATION_RETENTION_DAYS, moved out of the hot
+    table by purge_notifications. Plain ids instead of foreign keys: archived
+    rows are never joined, and deleting a profile or pet does not touch them.
+    """
+    id = models.BigIntegerField(primary_key=True)  # the notification's original id
+    sender_id = models.BigIntegerField(blank=True, null=True)
+    receiver_id = models.BigIntegerField(blank=True, null=True, db_index=True)
+    pet_id = models.BigIntegerField(blank=True, null=True)
+    report_id = models.BigIntegerField(blank=True, null=True)
+    content = models.TextField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived notification {self.id} to {self.receiver_id}"
+
+
+class VaccinationReminder(models.Model):
+    """One per pet per vaccination cycle (due date), so reruns never remind twice."""
+    pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name="vaccination_reminders")
+    due_date = models.DateField()
+    vaccination_name = models.CharField(max_length=100, blank=True, null=True)
+    receiver = models.ForeignKey(Profile, on_delete=models.SET_NULL, blank=True, null=True)
+    run = models.UUIDField(blank=True, null=True, editable=False)  # the job run that inserted the row
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["pet", "due_date"], name="one_vaccination_reminder_per_cycle"),
+        ]
+
+    def __str__(self):
+        return f"{self.pet_id} due {self.due_date}"
+
+
+class QueuedEmail(models.Model):
+    """Outgoing mail written in bulk by jobs and sent in batches by send_queued_emails (outbox.py)."""
+    STATUS_CHOICES = [("queued", "queued"), ("sent", "sent"), ("failed", "failed")]
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(blank=True, null=True)  # retry backoff after a failed attempt
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "id"], name="queued_email_status_idx")]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Append-only log of changes to the synced models, written by signals; the
+    id is the cursor of the changes/ feed (see changefeed.py).
+    """
+    OP_CHOICES = [("upsert", "upsert"), ("delete", "delete")]
+
+    model = models.CharField(max_length=32)  # feed type, e.g. "pet_report"
+    object_id = models.BigIntegerField()
+    op = models.CharField(max_length=6, choices=OP_CHOICES)
+    # Visibility: everyone, one user (their notifications) or admins only.
+    # A plain id, so deleting the profile does not cascade into the log being written.
+    receiver_id = models.BigIntegerField(blank=True, null=True)
+    admin_only = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["model", "object_id"])]
+
+    def __str__(self):
+        return f"#{self.id} {self.op} {self.model} {self.object_id}"
+
+
+class ChangeLogCompaction(models.Model):
+    """One row per compaction run that expired entries; cursors below the latest horizon must resync."""
+    horizon = models.BigIntegerField()  # highest expired entry id
+    removed = models.IntegerField()
+    ran_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"horizon {self.horizon} ({self.removed} removed)"
+
+
+class ScheduledJob(models.Model):
+    """
+    Schedule and state of a periodic job registered with scheduler.job(). Rows
+    are created by the scheduler; admins may change the schedule or disable a job.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    schedule = models.CharField(max_length=100)  # cron expression, e.g. "*/15 * * * *" or "@daily"
+    enabled = models.BooleanField(default=True)
+    next_run_at = models.DateTimeField(blank=True, null=True, db_index=True)
+    last_run_at = models.DateTimeField(blank=True, null=True)
+    last_status = models.CharField(max_length=10, blank=True)
+    # Lease for backends without advisory locks (see scheduler.py)
+    locked_until = models.DateTimeField(blank=True, null=True)
+    locked_by = models.CharField(max_length=255, blank=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.schedule})"
+
+
+class JobRun(models.Model):
+    """One run of a ScheduledJob, with its duration and result."""
+    STATUS_CHOICES = [("running", "running"), ("ok", "ok"), ("failed", "failed")]
+
+    job = models.ForeignKey(ScheduledJob, on_delete=models.CASCADE, related_name="runs")
+    node = models.CharField(max_length=255)  # host:pid of the scheduler that ran it
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="running")
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(blank=True, null=True)
+    duration_ms = models.IntegerField(blank=True, null=True)
+    result = models.TextField(blank=True)  # repr of the job's return value, or the traceback
+
+    class Meta:
+        indexes = [models.Index(fields=["job", "-started_at"], name="job_run_recent_idx")]
+
+    def __str__(self):
+        return f"{self.job.name} at {self.started_at:%Y-%m-%d %H:%M} ({self.status})"
@@ -0,0 +1,86 @@
+# pet_rescue_app/notifications.py
+"""
+Keeping the notification table small.
+
+Coalescing: notify() merges a status update about a report into the
+receiver's unread notification for the same report, when one was made in
+the last NOTIFICATION_COALESCE_MINUTES. The row takes the new content, its
+created_at moves to now (so it sorts as the newest, and the window runs
+from the last update), and `coalesced` counts the updates merged into it.
+A report that goes Pending -> Accepted -> Resolved -> Reunited while the
+user is away leaves one row saying "reunited".
+
+Retention: archive_read() moves read notifications older than
+NOTIFICATION_RETENTION_DAYS into NotificationArchive, in batches of short
+transactions (copy, then delete by id), so neither table is locked for
+long. purge_notifications runs it.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Notification, NotificationArchive
+
+ARCHIVE_FIELDS = ["id", "sender_id", "receiver_id", "pet_id", "report_id", "content", "created_at"]
+
+
+def notify(sender, receiver, content, pet=None, report=None):
+    """Create a notification, or fold it into the receiver's recent unread one about the same report."""
+    if receiver is None or report is None:
+        return Notification.objects.create(sender=sender, receiver=receiver, content=content, pet=pet, report=report)
+
+    now = timezone.now()
+    window = timedelta(minutes=getattr(settings, "NOTIFICATION_COALESCE_MINUTES", 60))
+    with transaction.atomic():
+        recent = (
+            Notification.objects.select_for_update()
+            .filter(receiver=receiver, report=report, is_read=False, created_at__gte=now - window)
+            .order_by("-created_at")
+            .first()
+        )
+        if recent is None:
+            return Notification.objects.create(sender=sender, receiver=receiver, content=content, pet=pet, report=report)
+
+        recent.sender = sender
+        recent.content = content
+        recent.pet = pet or recent.pet
+        recent.created_at = now
+        recent.coalesced = F("coalesced") + 1
+        recent.save(update_fields=["sender", "content", "pet", "created_at", "coalesced"])  # signals still fire
+        recent.refresh_from_db(fields=["coalesced"])
+        return recent
+
+
+def archive_read(batch_size=1000, days=None, pause=0.0):
+    """
+    Move read notifications older than `days` (NOTIFICATION_RETENTION_DAYS)
+    into NotificationArchive, one short transaction per batch. Returns the
+    number archived.
+    """
+    days = getattr(settings, "NOTIFICATION_RETENTION_DAYS", 90) if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    # Rows some other transaction is touching are skipped, not waited for (PostgreSQL)
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    archived = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            batch = Notification.objects.filter(is_read=True, created_at__lt=cutoff, id__gt=last_id).order_by("id")
+            if skip_locked:
+                batch = batch.select_for_update(skip_locked=True, of=("self",))
+            rows = list(batch.values(*ARCHIVE_FIELDS)[:batch_size])
+            if not rows:
+                return archived
+            NotificationArchive.objects.bulk_create(
+                [NotificationArchive(**row) for row in rows], ignore_conflicts=True
+            )
+            # delete() (not a raw delete) so the change feed and unread-count signals still run
+            Notification.objects.filter(id__in=[row["id"] for row in rows]).delete()
+        archived += len(rows)
+        last_id = rows[-1]["id"]
+        if pause:
+            time.sleep(pause)  # let other writers in between batches
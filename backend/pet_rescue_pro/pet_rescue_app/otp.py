@@ -0,0 +1,117 @@
+# pet_rescue_app/otp.py
+"""
+Single OTP service for registration and password reset.
+
+OTPs live in the OneTimePassword table so every worker sees the same code,
+expiry, attempt count and resend cooldown. Emails are normalized (trimmed,
+lowercased) on the way in, so "A@x.com" and "a@x.com " share one row.
+Issuing is a conditional UPDATE (or INSERT) guarded by the cooldown, so two
+concurrent requests cannot both get a code sent. Verification is a single
+conditional DELETE, so a code can only ever be consumed once.
+"""
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+from .models import OneTimePassword
+
+PURPOSE_VERIFICATION = "verification"
+PURPOSE_PASSWORD_RESET = "password_reset"
+
+OTP_TTL_SECONDS = getattr(settings, "OTP_TTL_SECONDS", 600)
+OTP_MAX_ATTEMPTS = getattr(settings, "OTP_MAX_ATTEMPTS", 5)
+OTP_RESEND_COOLDOWN_SECONDS = getattr(settings, "OTP_RESEND_COOLDOWN_SECONDS", 60)
+
+
+class OTPCooldownError(Exception):
+    """Raised when a new OTP is requested before the resend cooldown has passed."""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f"OTP recently sent, retry in {retry_after} seconds")
+
+
+def normalize_email(email):
+    return (email or "").strip().lower()
+
+
+def _hash_code(email, purpose, code):
+    return salted_hmac(f"otp:{purpose}", f"{email}:{code}").hexdigest()
+
+
+def issue_otp(email, purpose):
+    """
+    Create (or replace) the OTP for email/purpose and return the plain code.
+    Raises OTPCooldownError if the previous code was sent too recently.
+    """
+    email = normalize_email(email)
+    now = timezone.now()
+    code = f"{secrets.randbelow(900000) + 100000}"
+    fields = {
+        "code_hash": _hash_code(email, purpose, code),
+        "attempts": 0,
+        "last_sent_at": now,
+        "expires_at": now + timedelta(seconds=OTP_TTL_SECONDS),
+    }
+    # Replace the code only if the cooldown has passed: the check and the write are one statement
+    cooled_down = now - timedelta(seconds=OTP_RESEND_COOLDOWN_SECONDS)
+    if OneTimePassword.objects.filter(email=email, purpose=purpose, last_sent_at__lte=cooled_down).update(**fields):
+        return code
+    try:
+        with transaction.atomic():
+            OneTimePassword.objects.create(email=email, purpose=purpose, **fields)
+        return code
+    except IntegrityError:
+        pass  # a code was sent moments ago (possibly by a concurrent request)
+
+    last_sent_at = (
+        OneTimePassword.objects.filter(email=email, purpose=purpose).values_list("last_sent_at", flat=True).first()
+    )
+    elapsed = (now - last_sent_at).total_seconds() if last_sent_at else OTP_RESEND_COOLDOWN_SECONDS
+    raise OTPCooldownError(max(1, int(OTP_RESEND_COOLDOWN_SECONDS - elapsed) + 1))
+
+
+def verify_and_consume(email, purpose, submitted_code):
+    """
+    Atomically check and consume an OTP.
+
+    The matching row is deleted in one statement guarded by expiry and
+    attempt count, so concurrent verifications cannot both succeed.
+    A wrong code only bumps the attempt counter.
+    """
+    email = normalize_email(email)
+    if not email or not submitted_code:
+        return False
+
+    now = timezone.now()
+    live = OneTimePassword.objects.filter(
+        email=email,
+        purpose=purpose,
+        expires_at__gt=now,
+        attempts__lt=OTP_MAX_ATTEMPTS,
+    )
+    deleted, _ = live.filter(code_hash=_hash_code(email, purpose, submitted_code)).delete()
+    if deleted:
+        return True
+
+    live.update(attempts=F("attempts") + 1)
+    return False
+
+
+def purge_expired(batch_size=1000):
+    """Delete expired OTP rows in small batches. Returns the number removed."""
+    removed = 0
+    while True:
+        ids = list(
+            OneTimePassword.objects
+            .filter(expires_at__lte=timezone.now())
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return removed
+        removed += OneTimePassword.objects.filter(id__in=ids).delete()[0]
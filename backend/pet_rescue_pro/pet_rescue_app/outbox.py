@@ -0,0 +1,107 @@
+# pet_rescue_app/outbox.py
+"""
+Queued outgoing mail for jobs that email many users at once.
+
+Jobs bulk_create QueuedEmail rows in the same transaction as the rest of
+their work. send_queued() delivers them in batches over one SMTP connection
+per batch. Rows are claimed with SKIP LOCKED on PostgreSQL, so several
+senders can run at once.
+
+A failed row is retried until it has been tried OUTBOX_MAX_ATTEMPTS times,
+no sooner than OUTBOX_RETRY_SECONDS later, doubling the wait after each
+further failure; one call never tries a row twice. When the mail server
+cannot be reached at all, the batch counts as one failed attempt for each
+of its rows and the call stops, leaving the rest for the next run.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+
+class _ConnectionFailed(Exception):
+    pass
+
+
+def retry_delay(attempts):
+    """Wait before the next try of an email that has failed `attempts` times."""
+    return timedelta(seconds=getattr(settings, "OUTBOX_RETRY_SECONDS", 300) * 2 ** (attempts - 1))
+
+
+def send_queued(batch_size=100, limit=None):
+    """Send queued emails; returns (sent, failed)."""
+    max_attempts = getattr(settings, "OUTBOX_MAX_ATTEMPTS", 3)
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    sent = failed = 0
+    failed_ids = []
+    while limit is None or sent + failed < limit:
+        with transaction.atomic():
+            now = timezone.now()
+            batch = (
+                QueuedEmail.objects.filter(status="queued", attempts__lt=max_attempts)
+                .filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now))
+                .exclude(id__in=failed_ids)
+                .order_by("id")
+            )
+            if skip_locked:
+                batch = batch.select_for_update(skip_locked=True)
+            emails = list(batch[:batch_size if limit is None else min(batch_size, limit - sent - failed)])
+            if not emails:
+                break
+            try:
+                ok, errors = _deliver(emails)
+            except _ConnectionFailed as e:
+                ok, errors = [], {email.id: str(e.__cause__) for email in emails}
+                stop = True
+            else:
+                stop = False
+            now = timezone.now()
+            QueuedEmail.objects.filter(id__in=ok).update(status="sent", sent_at=now, attempts=F("attempts") + 1)
+            attempts = {email.id: email.attempts + 1 for email in emails}
+            for email_id, error in errors.items():
+                QueuedEmail.objects.filter(id=email_id).update(
+                    attempts=F("attempts") + 1, error=error, next_attempt_at=now + retry_delay(attempts[email_id]),
+                )
+            # Rows out of attempts stop being picked up
+            QueuedEmail.objects.filter(id__in=list(errors), attempts__gte=max_attempts).update(status="failed")
+        sent += len(ok)
+        failed += len(errors)
+        failed_ids.extend(errors)
+        if stop:
+            break
+    return sent, failed
+
+
+def _deliver(emails):
+    """Send over one connection; returns (sent ids, {id: error}). Raises _ConnectionFailed if it cannot connect."""
+    ok, errors = [], {}
+    try:
+        mail = get_connection(fail_silently=False)
+        mail.open()
+    except Exception as e:
+        logger.warning("Cannot connect to the mail server: %s", e)
+        raise _ConnectionFailed from e
+    try:
+        for email in emails:
+            message = EmailMessage(email.subject, email.body, settings.DEFAULT_FROM_EMAIL, [email.to_email],
+                                   connection=mail)
+            try:
+                message.send()
+            except Exception as e:  # one bad address must not fail the batch
+                errors[email.id] = str(e)
+            else:
+                ok.append(email.id)
+    finally:
+        try:
+            mail.close()
+        except Exception:  # what was sent stays sent
+            logger.warning("Closing the mail connection failed", exc_info=True)
+    return ok, errors
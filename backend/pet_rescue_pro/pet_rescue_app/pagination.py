@@ -0,0 +1,134 @@
+# pet_rescue_app/pagination.py
+"""
+Pagination without COUNT(*) on large tables.
+
+On PostgreSQL, estimate_count() answers from planner statistics instead of
+scanning: pg_class.reltuples for an unfiltered table, the row estimate of
+EXPLAIN for a filtered query. Estimates below EXACT_COUNT_THRESHOLD are
+replaced by a real count, which is cheap at that size, so small tables and
+selective filters keep exact numbers. Other databases always count.
+
+    EstimatedCountPaginator    drop-in django.core.paginator.Paginator (admin changelists)
+    EstimatedCountPagination   DRF page-number pagination; the payload says whether
+                               "count" is an estimate ("count_is_estimate")
+
+When the count is an estimate, pages past it are still served and a page
+has a next page whenever it is full, so clients can walk every row.
+"""
+import json
+
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+EXACT_COUNT_THRESHOLD = 10000
+
+
+def estimate_count(queryset):
+    """Planner estimate of queryset.count(), or None when there is none (non-PostgreSQL, never analyzed)."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    query = queryset.query
+    with connection.cursor() as cursor:
+        if not query.where and not query.distinct and query.low_mark == 0 and query.high_mark is None:
+            # reltuples is -1 until the table is first vacuumed/analyzed
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+
+        sql, params = query.sql_with_params()
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedPage(Page):
+    def has_next(self):
+        if self.paginator.count_is_estimate:
+            return len(self.object_list) == self.paginator.per_page
+        return super().has_next()
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator whose count comes from estimate_count() once the table is too big to count."""
+
+    exact_count_threshold = EXACT_COUNT_THRESHOLD
+
+    @cached_property
+    def _estimate(self):
+        """The planner's row count when it is used instead of counting, else None."""
+        if hasattr(self.object_list, "query"):
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate >= self.exact_count_threshold:
+                return estimate
+        return None
+
+    @property
+    def count_is_estimate(self):
+        return self._estimate is not None
+
+    @cached_property
+    def count(self):
+        return self._estimate if self.count_is_estimate else super().count
+
+    def validate_number(self, number):
+        if not self.count_is_estimate:
+            return super().validate_number(number)
+        # The estimate may be low: only the lower bound is checked
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_is_estimate:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
+
+    def _get_page(self, *args, **kwargs):
+        return EstimatedPage(*args, **kwargs)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Page-number pagination over EstimatedCountPaginator. Opt-in per request:
+    without ?page_size= (and with no PAGE_SIZE setting) lists stay unpaginated.
+    """
+    django_paginator_class = EstimatedCountPaginator
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def get_paginated_response(self, data):
+        return Response({
+            "count": self.page.paginator.count,
+            "count_is_estimate": self.page.paginator.count_is_estimate,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        properties = response_schema["properties"]
+        response_schema["properties"] = {
+            "count": properties["count"],
+            "count_is_estimate": {"type": "boolean", "example": False},
+            **{name: value for name, value in properties.items() if name != "count"},
+        }
+        return response_schema
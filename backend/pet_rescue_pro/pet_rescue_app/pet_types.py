@@ -0,0 +1,148 @@
+# pet_rescue_app/pet_types.py
+"""
+Process-wide registry of the (tiny) PetType table.
+
+Names are normalized before lookup, so "dog", "Dog " and "DOG" (and synonyms
+such as "puppy") resolve to the same type. The whole table is held in memory
+and reloaded only when the "pet_types" namespace version in the two-tier
+cache changes, which happens on every PetType save/delete (see signals.py).
+Reads and writes of pet types therefore need no queries.
+
+Types created by resolve() inside a transaction are only shared once it
+commits. Until then the creating thread reads the table afresh on each
+call, so a rollback can never leave the registry pointing at a type that
+does not exist.
+"""
+import threading
+
+from django.db import transaction
+
+from .caching import app_cache
+from .models import PetType
+
+PET_TYPE_NAMESPACE = "pet_types"
+
+# Normalized synonym -> normalized canonical name
+PET_TYPE_SYNONYMS = {
+    "dogs": "dog",
+    "puppy": "dog",
+    "pup": "dog",
+    "doggy": "dog",
+    "cats": "cat",
+    "kitten": "cat",
+    "kitty": "cat",
+    "birds": "bird",
+    "parrots": "parrot",
+    "rabbits": "rabbit",
+    "bunny": "rabbit",
+    "hens": "hen",
+    "chicken": "hen",
+}
+
+
+def normalize_pet_type(name):
+    """Case/whitespace-insensitive key for a pet type name, with synonyms folded in."""
+    key = " ".join(str(name or "").split()).casefold()
+    return PET_TYPE_SYNONYMS.get(key, key)
+
+
+def display_pet_type(name):
+    """Stored form of a new pet type ("golden retriever" -> "Golden Retriever")."""
+    return normalize_pet_type(name).title()
+
+
+class PetTypeRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._by_id = {}
+        self._by_key = {}
+        self._local = threading.local()
+
+    @staticmethod
+    def _load():
+        by_id, by_key = {}, {}
+        for pet_type_id, name in PetType.objects.order_by("id").values_list("id", "type"):
+            by_id[pet_type_id] = name
+            by_key.setdefault(normalize_pet_type(name), pet_type_id)  # oldest row wins
+        return by_id, by_key
+
+    def _refresh(self):
+        version = app_cache.namespace_version(PET_TYPE_NAMESPACE)
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            by_id, by_key = self._load()
+            self._by_id, self._by_key, self._version = by_id, by_key, version
+
+    def _tables(self):
+        """(by_id, by_key) as this thread must see them."""
+        if getattr(self._local, "uncommitted", False):
+            if transaction.get_connection().in_atomic_block:
+                return self._load()  # this thread's open transaction created types
+            self._local.uncommitted = False  # it rolled back (a commit clears the flag)
+        self._refresh()
+        return self._by_id, self._by_key
+
+    def _created(self):
+        """Types were just created: share them now, or once the surrounding transaction commits."""
+        if transaction.get_connection().in_atomic_block:
+            self._local.uncommitted = True
+            transaction.on_commit(self._committed)
+        else:
+            self.invalidate()
+
+    def _committed(self):
+        self._local.uncommitted = False
+        self.invalidate()
+
+    def invalidate(self):
+        app_cache.invalidate(PET_TYPE_NAMESPACE)
+        self._version = None
+
+    def name_for(self, pet_type_id):
+        """Display name for a pet_type_id (None if unknown)."""
+        if pet_type_id is None:
+            return None
+        name = self._tables()[0].get(pet_type_id)
+        if name is None:
+            # Possibly created by another worker moments ago; reload this worker's copy
+            self._version = None
+            name = self._tables()[0].get(pet_type_id)
+        return name
+
+    def names(self):
+        """pet_type_id -> display name for every type (a snapshot; safe to use without further queries)."""
+        return dict(self._tables()[0])
+
+    def lookup(self, name):
+        """pet_type_id for a name, or None if no matching type exists."""
+        return self._tables()[1].get(normalize_pet_type(name))
+
+    def resolve(self, name):
+        """pet_type_id for a name, creating the type if it does not exist yet."""
+        pet_type_id = self.lookup(name)
+        if pet_type_id is not None:
+            return pet_type_id
+
+        pet_type, created = PetType.objects.get_or_create(type=display_pet_type(name))
+        if created:
+            self._created()
+        else:
+            self.invalidate()  # another worker added it; reload this worker's copy
+        return pet_type.id
+
+    def resolve_many(self, names):
+        """Map each distinct name to a pet_type_id, creating missing types in one bulk insert."""
+        by_key = self._tables()[1]
+        missing = {display_pet_type(n) for n in names if normalize_pet_type(n) not in by_key}
+        if missing:
+            PetType.objects.bulk_create([PetType(type=n) for n in missing], ignore_conflicts=True)
+            self._created()
+            by_key = self._tables()[1]
+        return {n: by_key[normalize_pet_type(n)] for n in names}
+
+
+pet_type_registry = PetTypeRegistry()
@@ -0,0 +1,99 @@
+# pet_rescue_app/renderers.py
+"""
+orjson-based JSON renderer/parser (the API defaults, see REST_FRAMEWORK in
+settings) and streaming JSON list responses for sync and async views.
+
+Output matches rest_framework.renderers.JSONRenderer with the default
+settings (compact, UTF-8, no NaN): types orjson does not handle the same
+way - datetimes, Decimal, lazy strings, querysets - are passed to DRF's own
+JSONEncoder.default, so they come out exactly as before.
+
+One difference: orjson writes NaN and +/-Infinity floats as null, where
+DRF's renderer raises ValueError. No model field here stores them (there
+are no float fields); a computed value that can be NaN must be checked by
+its serializer.
+"""
+import orjson
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .exports import streaming_content
+
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+STREAM_BATCH_SIZE = 500
+
+_drf_default = JSONEncoder().default
+
+
+def dumps(data, indent=False):
+    option = ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else ORJSON_OPTIONS
+    content = orjson.dumps(data, default=_drf_default, option=option)
+    # Like DRF: escape the line/paragraph separators, which are not valid in JavaScript strings
+    if b"\xe2\x80\xa8" in content or b"\xe2\x80\xa9" in content:
+        content = content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return content
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type or "", renderer_context or {})
+        return dumps(data, indent=bool(indent))
+
+
+class ORJSONParser(BaseParser):
+    media_type = "application/json"
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+def _stream_list(items, key):
+    yield b'{"' + key.encode() + b'":[' if key else b"["
+    batch, first = [], True
+    for item in items:
+        batch.append(dumps(item))
+        if len(batch) >= STREAM_BATCH_SIZE:
+            yield (b"" if first else b",") + b",".join(batch)
+            batch, first = [], False
+    if batch:
+        yield (b"" if first else b",") + b",".join(batch)
+    yield b"]}" if key else b"]"
+
+
+def stream_json_response(items, key=None, status=200, request=None):
+    """
+    Response for a (possibly lazy) sequence of dicts, encoded and sent in
+    batches as it is consumed: [..] or {"<key>": [..]}. Pass the request so
+    that under ASGI the batches are still produced one at a time (see
+    exports.streaming_content).
+    """
+    return StreamingHttpResponse(
+        streaming_content(request, _stream_list(items, key)), status=status, content_type="application/json"
+    )
+
+
+async def _astream_list(items, key):
+    yield b'{"' + key.encode() + b'":[' if key else b"["
+    batch, first = [], True
+    async for item in items:
+        batch.append(dumps(item))
+        if len(batch) >= STREAM_BATCH_SIZE:
+            yield (b"" if first else b",") + b",".join(batch)
+            batch, first = [], False
+    if batch:
+        yield (b"" if first else b",") + b",".join(batch)
+    yield b"]}" if key else b"]"
+
+
+def astream_json_response(items, key=None, status=200):
+    """stream_json_response() for an async iterator of dicts (async views under ASGI)."""
+    return StreamingHttpResponse(_astream_list(items, key), status=status, content_type="application/json")
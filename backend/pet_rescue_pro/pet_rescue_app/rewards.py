@@ -0,0 +1,88 @@
+# pet_rescue_app/rewards.py
+"""
+Reward points: RESCUER_POINTS per accepted Found report plus ADOPTER_POINTS
+per approved adoption, with the badge from RewardPoint.BADGES.
+
+calculate_for() recomputes one user (MyRewardView). refresh_all() does the
+same arithmetic for every profile in id batches: two grouped counts per
+batch, then one bulk_create for missing RewardPoint rows and one
+bulk_update for the rows that changed. AllRewardsView, the reward export
+and the scheduler use it, so every reader sees the same numbers.
+"""
+from django.db import transaction
+from django.db.models import Count
+
+from .models import PetAdoption, PetReport, Profile, RewardPoint
+
+RESCUER_POINTS = 100
+ADOPTER_POINTS = 50
+
+
+def _rescues(user_ids):
+    return (
+        PetReport.objects.filter(user_id__in=user_ids, report_status="Accepted", pet_status="Found")
+        .values("user_id").annotate(n=Count("id")).values_list("user_id", "n")
+    )
+
+
+def _adoptions(user_ids):
+    return (
+        PetAdoption.objects.filter(requestor_id__in=user_ids, status="Approved")
+        .values("requestor_id").annotate(n=Count("id")).values_list("requestor_id", "n")
+    )
+
+
+def apply(reward, rescued, adopted):
+    """Set points, reason and badge from the counts; True if anything changed."""
+    before = (reward.points, reward.badge, reward.reason)
+    reward.points = rescued * RESCUER_POINTS + adopted * ADOPTER_POINTS
+    reasons = []
+    if rescued:
+        reasons.append(f"Rescued {rescued} pets")
+    if adopted:
+        reasons.append(f"Approved {adopted} adoptions")
+    reward.reason = "; ".join(reasons) if reasons else "No points yet"
+    reward.update_badge()
+    return (reward.points, reward.badge, reward.reason) != before
+
+
+def calculate_for(user):
+    """Recompute and store one user's RewardPoint."""
+    rescued = dict(_rescues([user.id])).get(user.id, 0)
+    adopted = dict(_adoptions([user.id])).get(user.id, 0)
+    reward, created = RewardPoint.objects.get_or_create(user=user)
+    if apply(reward, rescued, adopted) or created:
+        reward.save()
+    return reward
+
+
+def refresh_all(batch_size=1000):
+    """Recompute every profile's points and badge. Returns the number of RewardPoint rows changed."""
+    changed = 0
+    last_id = 0
+    while True:
+        user_ids = list(
+            Profile.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:batch_size]
+        )
+        if not user_ids:
+            return changed
+        last_id = user_ids[-1]
+
+        rescued = dict(_rescues(user_ids))
+        adopted = dict(_adoptions(user_ids))
+        existing = {reward.user_id: reward for reward in RewardPoint.objects.filter(user_id__in=user_ids)}
+
+        to_create, to_update = [], []
+        for user_id in user_ids:
+            reward = existing.get(user_id) or RewardPoint(user_id=user_id)
+            updated = apply(reward, rescued.get(user_id, 0), adopted.get(user_id, 0))
+            if reward.pk is None:
+                to_create.append(reward)
+            elif updated:
+                to_update.append(reward)
+
+        with transaction.atomic():
+            # ignore_conflicts: the user may have opened their rewards page meanwhile
+            RewardPoint.objects.bulk_create(to_create, ignore_conflicts=True)
+            RewardPoint.objects.bulk_update(to_update, ["points", "badge", "reason"])
+        changed += len(to_create) + len(to_update)
@@ -0,0 +1,201 @@
+# pet_rescue_app/saved_searches.py
+"""
+Saved-search alerts: "tell me when a Found Labrador turns up in 5600xx".
+
+Each worker holds an inverted index of the active SavedSearch rows, one
+posting set per (dimension, normalized value):
+
+    ("pet_type", 3) -> {12, 40}    ("pincode_prefix", "5600") -> {12}
+    ("pet_status", "found") -> {12, 40, 41}    ...
+
+A search matches a report when every criterion it sets matches. So match()
+counts, for each of the report's terms, the searches posted under it, and
+keeps those whose count equals their number of criteria. A pincode
+contributes all of its prefixes. The cost grows with the searches sharing
+at least one term with the report, not with the number of subscriptions.
+
+The index is built once per worker and then kept current incrementally.
+SavedSearch saves and deletes bump the "saved_searches" cache namespace
+version after commit, and write change log entries (changefeed.py). On a
+version change the worker reloads only the searches named in change log
+entries past its watermark. It rebuilds from scratch only when compaction
+expired entries it had not seen.
+
+When a PetReport becomes Accepted (signals.py), notify_matches() runs after
+commit and sends one notification per matching user in a single bulk insert.
+"""
+import threading
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .caching import app_cache
+from .changefeed import head, horizon, record
+from .models import ChangeLogEntry, Notification, SavedSearch
+from .signals import UNREAD_COUNT_NAMESPACE
+
+SAVED_SEARCH_NAMESPACE = "saved_searches"
+CRITERIA = ("pet_type", "pet_status", "breed", "color", "gender", "city", "pincode_prefix")
+
+
+def _normalize(value):
+    return " ".join(str(value).split()).casefold() if value not in (None, "") else None
+
+
+def search_terms(search):
+    """The (dimension, value) terms a SavedSearch requires."""
+    terms = []
+    for criterion in CRITERIA:
+        value = search.pet_type_id if criterion == "pet_type" else _normalize(getattr(search, criterion))
+        if value is not None:
+            terms.append((criterion, value))
+    return terms
+
+
+def report_terms(report):
+    """The (dimension, value) terms a report offers; its pincode offers every prefix."""
+    pet = report.pet
+    terms = [("pet_type", pet.pet_type_id)]
+    for criterion, value in (
+        ("pet_status", report.pet_status), ("breed", pet.breed), ("color", pet.color),
+        ("gender", pet.gender), ("city", pet.city),
+    ):
+        value = _normalize(value)
+        if value is not None:
+            terms.append((criterion, value))
+    pincode = _normalize(pet.pincode) or ""
+    terms.extend(("pincode_prefix", pincode[:length]) for length in range(1, len(pincode) + 1))
+    return terms
+
+
+class SavedSearchIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._watermark = 0       # change log id up to which every saved_search entry was applied
+        self._pending = False     # entries past the watermark were applied but may have company
+        self._postings = {}       # (dimension, value) -> set of search ids
+        self._searches = {}       # search id -> (user_id, name, number of terms, terms)
+
+    # ---------------- maintenance ----------------
+    def _add(self, search):
+        self._remove(search.id)
+        terms = search_terms(search)
+        if not search.is_active or not terms:
+            return
+        self._searches[search.id] = (search.user_id, search.name, len(terms), terms)
+        for term in terms:
+            self._postings.setdefault(term, set()).add(search.id)
+
+    def _remove(self, search_id):
+        entry = self._searches.pop(search_id, None)
+        if entry is None:
+            return
+        for term in entry[3]:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.discard(search_id)
+                if not posting:
+                    del self._postings[term]
+
+    def _rebuild(self):
+        watermark = head()
+        self._postings, self._searches = {}, {}
+        for search in SavedSearch.objects.filter(is_active=True).iterator():
+            self._add(search)
+        self._watermark, self._pending = watermark, False
+
+    def _apply_changes(self):
+        """Reload the searches named in change log entries past the watermark."""
+        settle = getattr(settings, "CHANGE_FEED_SETTLE_SECONDS", 2)
+        settled_before = timezone.now() - timedelta(seconds=settle)
+        watermark = head()
+        entries = list(
+            ChangeLogEntry.objects.filter(model="saved_search", id__gt=self._watermark)
+            .order_by("id").values_list("id", "object_id", "created_at")
+        )
+        unsettled = [entry_id for entry_id, _, created_at in entries if created_at > settled_before]
+        if unsettled:
+            # A transaction still committing may own a lower id: keep re-reading from before it
+            watermark = min(watermark, unsettled[0] - 1)
+
+        changed = {object_id for _, object_id, _ in entries}
+        found = SavedSearch.objects.in_bulk(changed)
+        for search_id in changed:
+            if search_id in found:
+                self._add(found[search_id])
+            else:
+                self._remove(search_id)
+        self._watermark, self._pending = max(self._watermark, watermark), bool(unsettled)
+
+    def _refresh(self):
+        version = app_cache.namespace_version(SAVED_SEARCH_NAMESPACE)
+        if version == self._version and not self._pending:
+            return
+        with self._lock:
+            if version == self._version and not self._pending:
+                return
+            if self._version is None or self._watermark < horizon():
+                self._rebuild()
+            else:
+                self._apply_changes()
+            self._version = version
+
+    def invalidate(self):
+        """Tell every worker that saved searches changed (they catch up from the change log)."""
+        app_cache.invalidate(SAVED_SEARCH_NAMESPACE)
+
+    # ---------------- queries ----------------
+    def match(self, report):
+        """[(search id, user id, search name)] of the active searches a report satisfies."""
+        self._refresh()
+        terms = report_terms(report)
+        hits = Counter()
+        with self._lock:  # another thread may be applying changes to the posting sets
+            for term in terms:
+                posting = self._postings.get(term)
+                if posting:
+                    hits.update(posting)
+            return [
+                (search_id, self._searches[search_id][0], self._searches[search_id][1])
+                for search_id, count in hits.items()
+                if count == self._searches[search_id][2]
+            ]
+
+    def stats(self):
+        return {"searches": len(self._searches), "terms": len(self._postings), "watermark": self._watermark}
+
+
+saved_search_index = SavedSearchIndex()
+
+
+def notify_matches(report):
+    """Notify, once per user, the owners of the saved searches an accepted report matches."""
+    by_user = {}
+    for _search_id, user_id, name in sorted(saved_search_index.match(report)):
+        if user_id != report.user_id:
+            by_user.setdefault(user_id, name)
+    if not by_user:
+        return []
+
+    pet = report.pet
+    with transaction.atomic():
+        notifications = Notification.objects.bulk_create([
+            Notification(
+                sender_id=report.user_id,
+                receiver_id=user_id,
+                content=f"{report.pet_status} pet matching your saved search"
+                        f"{f' {name!r}' if name else ''}: {pet.name}",
+                pet=pet,
+                report=report,
+            )
+            for user_id, name in by_user.items()
+        ])
+        # bulk_create() skips the signals that feed the change log and drop the cached unread counts
+        record(notifications)
+        receivers = list(by_user)
+        transaction.on_commit(lambda: app_cache.delete_many(UNREAD_COUNT_NAMESPACE, receivers))
+    return notifications
@@ -0,0 +1,286 @@
+# pet_rescue_app/scheduler.py
+"""
+Periodic maintenance jobs, run by `manage.py run_scheduler` on any number
+of nodes with no broker: the database is the only shared state.
+
+Jobs are registered in a `jobs.py` module of any installed app (found with
+autodiscover_modules, like admin.py, so web workers never import them):
+
+    @job("purge_expired_otps", "*/15 * * * *")
+    def purge_expired_otps():
+        return otp.purge_expired()
+
+Schedules are five-field cron expressions (minute hour day month weekday,
+with *, lists, ranges and */step; weekday 0 is Sunday) or one of @hourly,
+@daily, @weekly and @monthly, in TIME_ZONE. Each job gets a ScheduledJob
+row the first time a scheduler sees it; after that the row is the source
+of truth, so an admin can change its schedule or disable it.
+
+Every poll a scheduler takes each due job in turn:
+
+    lock      pg_try_advisory_lock on a connection of its own, so the lock
+              outlives whatever the job does with the default connection
+              and dies with the node. Other backends use a lease
+              (locked_until) claimed with a conditional UPDATE.
+    re-check  next_run_at is read again under the lock; a node that just
+              finished the job has already moved it on.
+    run       next_run_at moves to the next slot first (a crash skips a run
+              instead of repeating it), and a JobRun records node,
+              duration and result or traceback.
+
+Slots missed while no scheduler was running are not replayed: the job runs
+once and continues from the next slot.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connection, connections
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import JobRun, ScheduledJob
+
+logger = logging.getLogger(__name__)
+
+jobs = {}
+
+ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+RESULT_MAX_LENGTH = 10000
+
+
+class ScheduleError(ValueError):
+    """A cron expression that cannot be parsed."""
+
+
+class Cron:
+    """A parsed cron expression; next_after() gives the next matching minute."""
+
+    def __init__(self, expression):
+        self.expression = expression
+        fields = ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ScheduleError(f"{expression!r}: expected 5 fields (minute hour day month weekday)")
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse(field, name, low, high) for field, (name, low, high) in zip(fields, FIELDS)
+        )
+        # As in cron: when both day and weekday are restricted, either one matching is enough
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+        self.next_after(timezone.now())  # e.g. "0 0 31 2 *" parses but never runs
+
+    @staticmethod
+    def _parse(field, name, low, high):
+        values = set()
+        for part in field.split(","):
+            spec, _, step = part.partition("/")
+            try:
+                step = int(step) if step else 1
+                if spec == "*":
+                    start, end = low, high
+                elif "-" in spec:
+                    start, end = (int(bound) for bound in spec.split("-", 1))
+                else:
+                    start = int(spec)
+                    end = high if step > 1 else start
+            except ValueError:
+                raise ScheduleError(f"Invalid {name} field {field!r}")
+            if not (low <= start <= end <= high) or step < 1:
+                raise ScheduleError(f"{name} {part!r} out of range {low}-{high}")
+            values.update(range(start, end + 1, step))
+        if name == "weekday":
+            values = {value % 7 for value in values}  # 7 is Sunday too
+        return frozenset(values)
+
+    def _day_matches(self, day):
+        in_days = day.day in self.days
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_after(self, moment):
+        """The first matching minute strictly after `moment` (aware), as an aware datetime."""
+        current = timezone.localtime(moment).replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1)
+        limit = current + timedelta(days=366 * 5)
+        while current < limit:
+            if current.month not in self.months:
+                current = (current.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(current):
+                current = current.replace(hour=0, minute=0) + timedelta(days=1)
+            elif current.hour not in self.hours:
+                current = current.replace(minute=0) + timedelta(hours=1)
+            elif current.minute not in self.minutes:
+                current += timedelta(minutes=1)
+            else:
+                return timezone.make_aware(current)
+        raise ScheduleError(f"{self.expression!r} never matches")
+
+
+def job(name, schedule):
+    """Register func() as a periodic job; its return value is stored with each run."""
+    Cron(schedule)  # fail at import, not in the scheduler loop
+
+    def register(func):
+        jobs[name] = (func, schedule)
+        return func
+    return register
+
+
+def discover():
+    """Import every installed app's jobs module and create the missing ScheduledJob rows."""
+    autodiscover_modules("jobs")
+    now = timezone.now()
+    for name, (_func, schedule) in jobs.items():
+        ScheduledJob.objects.get_or_create(
+            name=name, defaults={"schedule": schedule, "next_run_at": Cron(schedule).next_after(now)}
+        )
+
+
+def node_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _lock_key(name):
+    # pg advisory locks take a signed 64-bit key; namespace it so other users of advisory locks don't collide
+    return (zlib.crc32(b"pet_rescue_app.scheduler") << 32 | zlib.crc32(name.encode())) - (1 << 63)
+
+
+class Scheduler:
+    def __init__(self, node=None):
+        self.node = node or node_name()
+        self.stopping = threading.Event()
+        self._lock_connection = None
+
+    # ---------------- locking ----------------
+    def _advisory(self, sql, name):
+        if self._lock_connection is None:
+            self._lock_connection = connections.create_connection(DEFAULT_DB_ALIAS)
+        with self._lock_connection.cursor() as cursor:
+            cursor.execute(sql, [_lock_key(name)])
+            return cursor.fetchone()[0]
+
+    def acquire(self, scheduled):
+        if connection.vendor == "postgresql":
+            return self._advisory("SELECT pg_try_advisory_lock(%s)", scheduled.name)
+        now = timezone.now()
+        lease = timedelta(minutes=getattr(settings, "SCHEDULER_LEASE_MINUTES", 60))
+        return ScheduledJob.objects.filter(
+            Q(locked_until__isnull=True) | Q(locked_until__lt=now), pk=scheduled.pk
+        ).update(locked_until=now + lease, locked_by=self.node) == 1
+
+    def release(self, scheduled):
+        if connection.vendor == "postgresql":
+            self._advisory("SELECT pg_advisory_unlock(%s)", scheduled.name)
+        else:
+            ScheduledJob.objects.filter(pk=scheduled.pk, locked_by=self.node).update(locked_until=None, locked_by="")
+
+    def close(self):
+        if self._lock_connection is not None:
+            self._lock_connection.close()
+            self._lock_connection = None
+
+    # ---------------- running ----------------
+    def due(self, now=None):
+        now = now or timezone.now()
+        return list(
+            ScheduledJob.objects.filter(enabled=True, name__in=list(jobs), next_run_at__lte=now).order_by("next_run_at")
+        )
+
+    def run(self, scheduled, force=False):
+        """Run one job if it is (still) due, or unconditionally with force. Returns the JobRun or None."""
+        if not self.acquire(scheduled):
+            return None
+        try:
+            scheduled.refresh_from_db()
+            now = timezone.now()
+            if not force and (not scheduled.enabled or scheduled.next_run_at is None or scheduled.next_run_at > now):
+                return None
+            func, _schedule = jobs[scheduled.name]
+            scheduled.next_run_at = Cron(scheduled.schedule).next_after(now)
+            scheduled.last_run_at = now
+            scheduled.last_status = "running"
+            scheduled.save(update_fields=["next_run_at", "last_run_at", "last_status"])
+            return self._execute(scheduled, func, now)
+        finally:
+            self.release(scheduled)
+
+    def _execute(self, scheduled, func, now):
+        run = JobRun.objects.create(job=scheduled, node=self.node, started_at=now)
+        started = time.perf_counter()
+        try:
+            result = func()
+        except Exception:
+            logger.exception("Scheduled job %s failed", scheduled.name)
+            run.status, run.result = "failed", traceback.format_exc()
+        else:
+            run.status, run.result = "ok", "" if result is None else repr(result)
+        run.duration_ms = int((time.perf_counter() - started) * 1000)
+        run.finished_at = timezone.now()
+        run.result = run.result[-RESULT_MAX_LENGTH:]
+        close_old_connections()  # the job may have left the connection broken
+        run.save(update_fields=["status", "result", "duration_ms", "finished_at"])
+        ScheduledJob.objects.filter(pk=scheduled.pk).update(last_status=run.status)
+        return run
+
+    def run_due(self):
+        """Run every job that is due now, one after another. Returns their JobRuns."""
+        runs = []
+        for scheduled in self.due():
+            if self.stopping.is_set():
+                break
+            run = self.run(scheduled)
+            if run is not None:
+                runs.append(run)
+        return runs
+
+    def seconds_to_next(self, poll):
+        next_run_at = (
+            ScheduledJob.objects.filter(enabled=True, name__in=list(jobs), next_run_at__isnull=False)
+            .order_by("next_run_at").values_list("next_run_at", flat=True).first()
+        )
+        if next_run_at is None:
+            return poll
+        return max(0.0, min(poll, (next_run_at - timezone.now()).total_seconds()))
+
+    def run_forever(self, poll=None):
+        poll = poll or getattr(settings, "SCHEDULER_POLL_SECONDS", 30)
+        logger.info("Scheduler %s started with %d job(s)", self.node, len(jobs))
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                try:
+                    self.run_due()
+                    wait = self.seconds_to_next(poll)
+                except Exception:
+                    logger.exception("Scheduler poll failed")  # e.g. the database is restarting
+                    self.close()
+                    wait = poll
+                self.stopping.wait(wait)
+        finally:
+            self.close()
+
+    def stop(self):
+        self.stopping.set()
+
+
+def prune_runs(days=None):
+    """Delete JobRun rows older than SCHEDULER_RUN_HISTORY_DAYS. Returns the number removed."""
+    days = getattr(settings, "SCHEDULER_RUN_HISTORY_DAYS", 30) if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    removed, _ = JobRun.objects.filter(started_at__lt=cutoff).delete()
+    return removed
+
@@ -1,14 +1,18 @@
 from rest_framework import serializers
 from .models import (
     Profile, PetType, Pet, PetMedicalHistory,
-    PetReport, PetAdoption, Notification, RewardPoint, FeedbackStory, UserReport
+    PetReport, PetAdoption, Notification, RewardPoint, FeedbackStory, UserReport, ChunkedUpload, SavedSearch,
+    FanoutJob
 )
 from django.contrib.auth.hashers import make_password, check_password
 from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
+from .fieldsets import SparseFieldsetMixin
+from .pet_types import pet_type_registry
+from .saved_searches import CRITERIA
 # ---------------- ProfileSerializer ----------------
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     profile_image = serializers.ImageField(required=False, allow_null=True)
     is_superuser = serializers.BooleanField(read_only=True)  # 👈 Add this
 
@@ -28,15 +32,27 @@ class ProfileSerializer(serializers.ModelSerializer):
         
 
 # ---------------- Pet & PetType ----------------
-class PetTypeSerializer(serializers.ModelSerializer):
+class PetTypeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = PetType
         fields = ["id", "type"]
 
+class PetTypeNameField(serializers.CharField):
+    """
+    Free-text pet type. Reads the name from the in-memory PetType registry
+    via pet_type_id, so listing pets never loads PetType rows.
+    """
+
+    def get_attribute(self, instance):
+        return instance.pet_type_id
+
+    def to_representation(self, value):
+        return pet_type_registry.name_for(value)
+
+
 # ---------------- PetSerializer ----------------
-# ---------------- PetSerializer ----------------
-class PetSerializer(serializers.ModelSerializer):
-    pet_type = serializers.CharField(max_length=50)  # Allow free text input
+class PetSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    pet_type = PetTypeNameField(max_length=50)  # Allow free text input
     created_by = ProfileSerializer(read_only=True)
     modified_by = ProfileSerializer(read_only=True)
     image = serializers.SerializerMethodField()
@@ -49,6 +65,7 @@ class PetSerializer(serializers.ModelSerializer):
             "pincode", "image", "is_diseased", "is_vaccinated",
             "created_date", "modified_date", "created_by", "modified_by"
         ]
+        sparse_sources = {"image": ("image",)}
 
     def get_image(self, obj):
         """
@@ -97,8 +114,8 @@ class PetSerializer(serializers.ModelSerializer):
         """
         pet_type_name = validated_data.pop("pet_type", "")
         if pet_type_name:
-            pet_type_obj, _ = PetType.objects.get_or_create(type=pet_type_name)
-            validated_data["pet_type"] = pet_type_obj
+            # Normalized lookup ("dog", "Dog ", "DOG" -> one type); no query unless the type is new
+            validated_data["pet_type_id"] = pet_type_registry.resolve(pet_type_name)
         return super().create(validated_data)
 
     def update(self, instance, validated_data):
@@ -108,14 +125,13 @@ class PetSerializer(serializers.ModelSerializer):
         """
         pet_type_name = validated_data.pop("pet_type", None)
         if pet_type_name is not None:
-            pet_type_obj, _ = PetType.objects.get_or_create(type=pet_type_name)
-            # Put the actual object into validated_data so super().update assigns FK correctly
-            validated_data["pet_type"] = pet_type_obj
+            # Assign the FK id directly so super().update sets it without loading PetType
+            validated_data["pet_type_id"] = pet_type_registry.resolve(pet_type_name)
 
         return super().update(instance, validated_data)
 
 # ---------------- PetReportSerializer ----------------
-class PetReportSerializer(serializers.ModelSerializer):
+class PetReportSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     pet = serializers.PrimaryKeyRelatedField(read_only=True)
     user = serializers.PrimaryKeyRelatedField(read_only=True)
     image = serializers.ImageField(required=False, allow_null=True)
@@ -125,9 +141,12 @@ class PetReportSerializer(serializers.ModelSerializer):
         model = PetReport
         fields = [
             "id", "pet", "user", "pet_status", "report_status",
-            "image", "image_url", "is_resolved",
+            "image", "image_url", "is_resolved", "duplicate_of",
             "created_date", "modified_date", "created_by", "modified_by","gender"
         ]
+        read_only_fields = ["duplicate_of"]
+        sparse_sources = {"image_url": ("image",)}
+        sparse_expandable = {"pet": PetSerializer, "user": ProfileSerializer}
 
     def get_image_url(self, obj):
         if not obj.image:
@@ -143,7 +162,7 @@ class PetReportSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 # ---------------- Pet Medical History ----------------
-class PetMedicalHistorySerializer(serializers.ModelSerializer):
+class PetMedicalHistorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = PetMedicalHistory
         fields = [
@@ -167,7 +186,7 @@ class PetMedicalHistorySerializer(serializers.ModelSerializer):
 
 
 # ---------------- Pet Adoption ----------------
-class PetAdoptionSerializer(serializers.ModelSerializer):
+class PetAdoptionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     # This field is for reading data (GET requests)
     pet = PetSerializer(read_only=True)
     
@@ -202,7 +221,7 @@ class PetAdoptionSerializer(serializers.ModelSerializer):
 
 # ---------------- Notification ----------------
 # In your serializers.py file
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     sender = ProfileSerializer(read_only=True)
     receiver = ProfileSerializer(read_only=True)
     pet = PetSerializer(read_only=True)
@@ -268,7 +287,7 @@ class LostPetRequestSerializer(serializers.Serializer):
     medical_history = PetMedicalHistorySerializer(required=False)
 
 # ---------------- AdminNotificationSerializer ----------------
-class AdminNotificationSerializer(serializers.ModelSerializer):
+class AdminNotificationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     pet = PetSerializer(source="sender_pet", read_only=True)
     report = PetReportSerializer(source="sender_report", read_only=True)
 
@@ -278,14 +297,14 @@ class AdminNotificationSerializer(serializers.ModelSerializer):
 
 
 
-class PetReportListSerializer(serializers.ModelSerializer):
+class PetReportListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     pet = PetSerializer(read_only=True)
 
     class Meta:
         model = PetReport
         fields = ["id", "pet_status", "report_status", "image", "pet"]
 
-class PetAdoptionListSerializer(serializers.ModelSerializer):
+class PetAdoptionListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     pet = PetSerializer(read_only=True)
     requestor = serializers.StringRelatedField(read_only=True)
 
@@ -298,9 +317,10 @@ class AdminApprovalSerializer(serializers.Serializer):
     request_type = serializers.ChoiceField(choices=["lost", "found", "adopt"])
     pet_id = serializers.IntegerField()
     action = serializers.ChoiceField(choices=["approve", "reject"])
+    adoption_id = serializers.IntegerField(required=False)  # which request, when the pet has several
 
 
-class UserPetReportSerializer(serializers.ModelSerializer):
+class UserPetReportSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     pet_name = serializers.CharField(source="pet.name", read_only=True)
 
     class Meta:
@@ -316,7 +336,7 @@ class UserPetReportSerializer(serializers.ModelSerializer):
 
 
 
-class UserAdoptionRequestSerializer(serializers.ModelSerializer):
+class UserAdoptionRequestSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     pet_name = serializers.CharField(source="pet.name", read_only=True)
 
     class Meta:
@@ -324,7 +344,7 @@ class UserAdoptionRequestSerializer(serializers.ModelSerializer):
         fields = ["id", "pet_name", "status"]
 
 
-class AdminUserSerializer(serializers.ModelSerializer):
+class AdminUserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Profile
         fields = [
@@ -344,7 +364,7 @@ class AdminUserSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "email", "created_at", "updated_at"]
 
-class AdminPetReportSerializer(serializers.ModelSerializer):
+class AdminPetReportSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user = serializers.CharField(source="user.username", read_only=True)
     pet = PetSerializer(read_only=True)
     image_url = serializers.SerializerMethodField() # ✅ Add this field
@@ -353,6 +373,7 @@ class AdminPetReportSerializer(serializers.ModelSerializer):
         model = PetReport
         # ✅ Add 'image_url' to the list of fields
         fields = ["id", "pet", "user", "pet_status", "report_status", "image_url", "created_date", "modified_date"]
+        sparse_sources = {"image_url": ("image",)}
 
     # ✅ Add this method to generate the full image URL
     def get_image_url(self, obj):
@@ -362,7 +383,7 @@ class AdminPetReportSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.image.url)
         return None
 
-class UserAdoptionDetailSerializer(serializers.ModelSerializer):
+class UserAdoptionDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Custom serializer for a user's adoption requests.
     It fetches the pet's image from its most recent report
@@ -406,7 +427,7 @@ class UserAdoptionDetailSerializer(serializers.ModelSerializer):
         return {
             'id': pet.id,
             'name': pet.name,
-            'pet_type': str(pet.pet_type) if pet.pet_type else None,
+            'pet_type': pet_type_registry.name_for(pet.pet_type_id),
             'gender': pet.gender,
             'breed': pet.breed,
             'color': pet.color,
@@ -422,7 +443,7 @@ class UserAdoptionDetailSerializer(serializers.ModelSerializer):
             'medical_history': medical_data  # The nested medical history
         }
     
-class RewardPointSerializer(serializers.ModelSerializer):
+class RewardPointSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     email = serializers.CharField(source='user.email', read_only=True)
 
@@ -430,7 +451,7 @@ class RewardPointSerializer(serializers.ModelSerializer):
         model = RewardPoint
         fields = ['user', 'username', 'email', 'points', 'badge', 'reason']
 
-class FeedbackStorySerializer(serializers.ModelSerializer):
+class FeedbackStorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
     # keep this for upload
     image = serializers.ImageField(required=False, allow_null=True)
@@ -444,6 +465,7 @@ class FeedbackStorySerializer(serializers.ModelSerializer):
             "title", "story", "pet_name",
             "submitted_at", "image", "image_url"
         ]
+        sparse_sources = {"image_url": ("image",)}
 
     def get_image_url(self, obj):
         if not obj.image:
@@ -453,7 +475,7 @@ class FeedbackStorySerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.image.url)
         return settings.MEDIA_URL + obj.image.name
     
-class UserReportSerializer(serializers.ModelSerializer):
+class UserReportSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for admins to READ UserReport instances.
     """
@@ -538,4 +560,79 @@ class UserReportCreateSerializer(serializers.ModelSerializer):
             if PetAdoption.objects.filter(pet=pet_report.pet, requestor=request_user, status__in=["Pending", "Approved"]).exists():
                  raise serializers.ValidationError({"pet_report_id": "You already have an active adoption request for this pet."})
 
-        return data
\ No newline at end of file
+        return data
+
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChunkedUpload
+        fields = ["token", "filename", "total_size", "checksum", "received_bytes", "status", "created_at", "completed_at"]
+        read_only_fields = ["token", "received_bytes", "status", "created_at", "completed_at"]
+
+
+class SavedSearchSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    pet_type = PetTypeNameField(max_length=50, required=False, allow_null=True, allow_blank=True)
+
+    class Meta:
+        model = SavedSearch
+        fields = [
+            "id", "name", "pet_type", "pet_status", "breed", "color", "gender",
+            "city", "pincode_prefix", "is_active", "created_date", "modified_date",
+        ]
+
+    def validate_pet_type(self, value):
+        if not value:
+            return None
+        pet_type_id = pet_type_registry.lookup(value)
+        if pet_type_id is None:
+            raise serializers.ValidationError("Unknown pet type")
+        return pet_type_id
+
+    def validate_pincode_prefix(self, value):
+        if value and not value.isdigit():
+            raise serializers.ValidationError("Digits only, e.g. 5600")
+        return value
+
+    def validate(self, attrs):
+        current = {}
+        if self.instance is not None:
+            current = {criterion: getattr(self.instance, criterion) for criterion in CRITERIA if criterion != "pet_type"}
+            current["pet_type"] = self.instance.pet_type_id
+        merged = {**current, **attrs}
+        if not any(merged.get(criterion) not in (None, "") for criterion in CRITERIA):
+            raise serializers.ValidationError("Set at least one search criterion.")
+        return attrs
+
+    def _with_pet_type_id(self, validated_data):
+        if "pet_type" in validated_data:
+            validated_data["pet_type_id"] = validated_data.pop("pet_type")
+        return validated_data
+
+    def create(self, validated_data):
+        return super().create(self._with_pet_type_id(validated_data))
+
+    def update(self, instance, validated_data):
+        return super().update(instance, self._with_pet_type_id(validated_data))
+
+
+class FanoutRequestSerializer(serializers.Serializer):
+    audience = serializers.CharField(max_length=50)
+    params = serializers.DictField(required=False, default=dict)
+    template = serializers.CharField()
+    pet_id = serializers.IntegerField(required=False)
+
+
+class FanoutJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = FanoutJob
+        fields = [
+            "id", "audience", "params", "template", "pet", "status", "total", "sent", "progress",
+            "error", "created_date", "started_at", "finished_at",
+        ]
+
+    def get_progress(self, obj):
+        if not obj.total:
+            return 1.0 if obj.status == "done" else 0.0
+        return round(obj.sent / obj.total, 4)
@@ -0,0 +1,98 @@
+# pet_rescue_app/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .caching import app_cache, invalidate_on_commit
+from .changefeed import DELETE, TRACKED, record
+from .models import Notification, PetReport, PetType, SavedSearch
+from .pet_types import pet_type_registry
+from .storage import media_file_fields, release
+
+UNREAD_COUNT_NAMESPACE = "unread_notifications"
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def invalidate_unread_count(sender, instance, **kwargs):
+    if instance.receiver_id:
+        invalidate_on_commit(app_cache.delete, UNREAD_COUNT_NAMESPACE, instance.receiver_id)
+
+
+@receiver(post_save, sender=PetType)
+@receiver(post_delete, sender=PetType)
+def invalidate_pet_types(sender, instance, **kwargs):
+    invalidate_on_commit(pet_type_registry.invalidate)
+
+
+@receiver(post_save, sender=SavedSearch)
+@receiver(post_delete, sender=SavedSearch)
+def invalidate_saved_searches(sender, instance, **kwargs):
+    from .saved_searches import saved_search_index
+
+    # After commit: workers then read the change log entry written alongside this change
+    invalidate_on_commit(saved_search_index.invalidate)
+
+
+@receiver(pre_save, sender=PetReport)
+def remember_report_status(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Only a save that may make the report Accepted needs the stored status
+    if raw or instance.report_status != "Accepted" or (update_fields is not None and "report_status" not in update_fields):
+        instance._stored_report_status = instance.report_status
+    else:
+        instance._stored_report_status = (
+            PetReport.objects.filter(pk=instance.pk).values_list("report_status", flat=True).first()
+            if instance.pk else None
+        )
+
+
+@receiver(post_save, sender=PetReport)
+def alert_saved_searches(sender, instance, raw=False, **kwargs):
+    if raw or instance.report_status != "Accepted" or instance._stored_report_status == "Accepted":
+        return
+    from .saved_searches import notify_matches
+
+    transaction.on_commit(lambda: notify_matches(instance))
+
+
+def release_media(sender, instance, **kwargs):
+    """Deleting a row drops its reference to the stored file; gc_media_blobs removes unreferenced blobs."""
+    for model, field in media_file_fields():
+        if model is sender:
+            release(getattr(instance, field).name)
+
+
+def release_replaced_media(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Replacing a row's file drops its reference to the old one, once the save commits."""
+    if raw or instance.pk is None:
+        return
+    fields = [
+        field for model, field in media_file_fields()
+        if model is sender and (update_fields is None or field in update_fields)
+    ]
+    if not fields:
+        return
+    stored = sender._default_manager.filter(pk=instance.pk).values(*fields).first()
+    for field in fields if stored else ():
+        old_name = stored[field]
+        if old_name and old_name != getattr(instance, field).name:
+            transaction.on_commit(lambda name=old_name: release(name))
+
+
+for _model, _field in media_file_fields():
+    pre_save.connect(release_replaced_media, sender=_model, dispatch_uid=f"release_replaced_media_{_model.__name__}")
+    post_delete.connect(release_media, sender=_model, dispatch_uid=f"release_media_{_model.__name__}")
+
+
+def record_save(sender, instance, raw=False, **kwargs):
+    if not raw:  # fixtures being loaded
+        record([instance])
+
+
+def record_delete(sender, instance, **kwargs):
+    record([instance], op=DELETE)
+
+
+for _model in TRACKED:
+    post_save.connect(record_save, sender=_model, dispatch_uid=f"changefeed_save_{_model.__name__}")
+    post_delete.connect(record_delete, sender=_model, dispatch_uid=f"changefeed_delete_{_model.__name__}")
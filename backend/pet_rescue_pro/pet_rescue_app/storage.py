@@ -0,0 +1,139 @@
+# pet_rescue_app/storage.py
+"""
+Content-addressed, sharded media storage.
+
+Every upload is named by the sha256 of its bytes and sharded two levels deep
+under its upload_to prefix:
+
+    pet_images/3f/a2/3fa2...c9.jpg
+
+Saving the same bytes again returns the existing name instead of writing a
+second copy, so directories stay small and re-submitted photos are stored
+once. MediaBlob keeps a reference count per blob; gc_media_blobs deletes
+blobs whose count dropped to zero once it has confirmed that no model still
+points at them. Every count change also moves updated_at, which the GC grace
+period is measured from.
+
+save() creates or bumps the MediaBlob row (locked) before writing the file,
+in the caller's transaction. If that transaction rolls back after a new file
+was written, the file is left without a row; gc_media_blobs also walks the
+storage for such orphans.
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def content_digest(content):
+    """sha256 hex digest and size of a File, leaving it rewound."""
+    digest = hashlib.sha256()
+    size = 0
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return digest.hexdigest(), size
+
+
+def is_content_addressed(name):
+    """True for names produced by ContentAddressedStorage (prefix/ab/cd/<sha256>.ext)."""
+    parts = (name or "").split("/")
+    if len(parts) < 3:
+        return False
+    stem = os.path.splitext(parts[-1])[0]
+    return len(stem) == 64 and parts[-3] == stem[:2] and parts[-2] == stem[2:4]
+
+
+def media_file_fields():
+    """(model, field name) for every FileField whose files live in default storage."""
+    from .models import FeedbackStory, Pet, PetReport, Profile
+
+    return [(Profile, "profile_image"), (Pet, "image"), (PetReport, "image"), (FeedbackStory, "image")]
+
+
+def acquire(name, count=1):
+    """Record more references to an already stored blob (e.g. a report reusing its pet's image)."""
+    from .models import MediaBlob
+
+    if name and count and is_content_addressed(name):
+        MediaBlob.objects.filter(name=name).update(ref_count=F("ref_count") + count, updated_at=timezone.now())
+
+
+def release(name):
+    """Drop one reference to a blob. The file itself is removed later by gc_media_blobs."""
+    from .models import MediaBlob
+
+    if name and is_content_addressed(name):
+        MediaBlob.objects.filter(name=name, ref_count__gt=0).update(ref_count=F("ref_count") - 1, updated_at=timezone.now())
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def content_name(self, name, digest):
+        prefix = posixpath.dirname(name.replace("\\", "/"))
+        ext = os.path.splitext(name)[1].lower()[:10]
+        return posixpath.join(prefix, digest[:2], digest[2:4], f"{digest}{ext}")
+
+    def save(self, name, content, max_length=None):
+        from .models import MediaBlob
+
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        digest, size = content_digest(content)
+        cas_name = self.content_name(name, digest)
+
+        with transaction.atomic():
+            # The row lock orders this save with gc_media_blobs collecting the same blob
+            blob, created = MediaBlob.objects.select_for_update().get_or_create(
+                name=cas_name, defaults={"digest": digest, "size": size, "ref_count": 1}
+            )
+            if not created:
+                MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1, updated_at=timezone.now())
+            # A new row may name an orphaned file the GC is about to remove: write it afresh
+            if created or not self.exists(cas_name):
+                self._write_atomic(cas_name, content)
+        return cas_name
+
+    def _write_atomic(self, name, content):
+        """
+        Write to a temp file in the target directory and rename it into place.
+        Concurrent writers of the same blob write identical bytes, so the last
+        rename winning is harmless and readers never see a partial file.
+        """
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                for chunk in content.chunks(HASH_CHUNK_SIZE):
+                    fh.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp_path, self.file_permissions_mode)
+            os.replace(tmp_path, full_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, name):
+        # Another row may share this blob; only drop our reference and let GC decide
+        if is_content_addressed(name):
+            release(name)
+            return
+        super().delete(name)
@@ -1,3 +1,1508 @@
-from django.test import TestCase
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import async_views, fanout, identity, middleware, outbox, scheduler, vaccinations
+from .bulk_import import PetBulkImporter
+from .caching import app_cache
+from .duplicates import check_report
+from .exports import export_response
+from .fast_serializers import (
+    NotificationFastSerializer, PetFastSerializer, PetReportFastSerializer, list_response,
+)
+from .integrations import ProviderRegistry, providers
+from .models import (
+    ChangeLogEntry, ChunkedUpload, FanoutJob, FeedbackStory, MediaBlob, Notification, NotificationArchive,
+    OneTimePassword, Pet, PetAdoption, PetMedicalHistory, PetReport, PetType, Profile, QueuedEmail, ReportFingerprint,
+    RewardPoint, SavedSearch, ScheduledJob, UserReport, VaccinationReminder,
+)
+from .notifications import notify
+from .otp import (
+    OTP_MAX_ATTEMPTS, PURPOSE_PASSWORD_RESET, PURPOSE_VERIFICATION, OTPCooldownError, issue_otp, verify_and_consume,
+)
+from .pagination import EstimatedCountPaginator
+from .pet_types import pet_type_registry
+from .renderers import dumps
+from .rewards import ADOPTER_POINTS, RESCUER_POINTS, refresh_all
+from .saved_searches import SavedSearchIndex
+from .scheduler import Cron, ScheduleError, Scheduler
+from .serializers import NotificationSerializer, PetReportSerializer, PetSerializer
+from .storage import release
+from .uploads import part_path, save_with_upload
+
+
+def make_user(username="user", **extra):
+    return Profile.objects.create_user(email=f"{username}@example.com", username=username, password="pass12345", **extra)
+
+
+def make_admin(username="admin"):
+    return Profile.objects.create_superuser(email=f"{username}@example.com", username=username, password="pass12345")
+
+
+def client_for(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+    return client
+
+
+def json_body(response):
+    if response.streaming:
+        return json.loads(b"".join(response.streaming_content))
+    return response.json()
+
+
+# -------------------------
+# One-time passwords (otp.py)
+# -------------------------
+class OTPTests(TestCase):
+    def test_code_is_consumed_once(self):
+        code = issue_otp("someone@example.com", PURPOSE_VERIFICATION)
+        self.assertTrue(verify_and_consume("someone@example.com", PURPOSE_VERIFICATION, code))
+        self.assertFalse(verify_and_consume("someone@example.com", PURPOSE_VERIFICATION, code))
+
+    def test_email_case_and_whitespace_do_not_matter(self):
+        code = issue_otp(" Someone@Example.COM", PURPOSE_VERIFICATION)
+        self.assertEqual(OneTimePassword.objects.get().email, "someone@example.com")
+        with self.assertRaises(OTPCooldownError):
+            issue_otp("someone@example.com", PURPOSE_VERIFICATION)
+        self.assertTrue(verify_and_consume("SOMEONE@example.com", PURPOSE_VERIFICATION, code))
+
+    def test_resend_cooldown(self):
+        issue_otp("someone@example.com", PURPOSE_VERIFICATION)
+        with self.assertRaises(OTPCooldownError) as raised:
+            issue_otp("someone@example.com", PURPOSE_VERIFICATION)
+        self.assertGreater(raised.exception.retry_after, 0)
+        # Purposes have separate codes and cooldowns
+        issue_otp("someone@example.com", PURPOSE_PASSWORD_RESET)
+
+        OneTimePassword.objects.update(last_sent_at=timezone.now() - timedelta(hours=1))
+        code = issue_otp("someone@example.com", PURPOSE_VERIFICATION)
+        self.assertTrue(verify_and_consume("someone@example.com", PURPOSE_VERIFICATION, code))
+
+    def test_wrong_codes_use_up_attempts(self):
+        code = issue_otp("someone@example.com", PURPOSE_VERIFICATION)
+        wrong = "000000" if code != "000000" else "111111"
+        for _ in range(OTP_MAX_ATTEMPTS):
+            self.assertFalse(verify_and_consume("someone@example.com", PURPOSE_VERIFICATION, wrong))
+        self.assertFalse(verify_and_consume("someone@example.com", PURPOSE_VERIFICATION, code))
+
+    def test_expired_code_is_rejected(self):
+        code = issue_otp("someone@example.com", PURPOSE_VERIFICATION)
+        OneTimePassword.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertFalse(verify_and_consume("someone@example.com", PURPOSE_VERIFICATION, code))
+
+    def test_mail_is_sent_before_the_response(self):
+        client = APIClient()
+        response = client.post("/api/register/", {"username": "new", "email": "new@example.com", "password": "pass12345", "pincode": 500001},
+                               format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(mail.outbox[-1].to, ["new@example.com"])
+
+        OneTimePassword.objects.update(last_sent_at=timezone.now() - timedelta(hours=1))
+        with mock.patch("pet_rescue_app.views.send_otp_email", side_effect=ConnectionRefusedError):
+            with self.assertRaises(ConnectionRefusedError):
+                client.post("/api/password-reset-request/", {"email": "new@example.com"}, format="json")
+
+    def test_register_again_in_other_casing(self):
+        client = APIClient()
+
+        def register(email):
+            return client.post("/api/register/", {"username": email.split("@")[0].lower(), "email": email,
+                                                  "password": "pass12345", "pincode": 500001}, format="json")
+
+        self.assertEqual(register("New@Example.com").status_code, 201)
+        self.assertEqual(register("new@example.COM").status_code, 400)
+
+        # Within the resend cooldown the OTP is refused, and so is the profile
+        Profile.objects.all().delete()
+        response = register("NEW@example.com")
+        self.assertEqual(response.status_code, 429, response.content)
+        self.assertFalse(Profile.objects.exists())
+
+
+# -------------------------
+# Shared cache (caching.py, signals.py)
+# -------------------------
+class CacheInvalidationTests(TestCase):
+    def setUp(self):
+        app_cache.clear_local()
+        self.admin = make_admin()
+        self.user = make_user()
+
+    def test_notification_save_drops_cached_unread_count(self):
+        client = client_for(self.admin)
+        self.assertEqual(client.get("/api/admin/notifications/unread-count/").json()["unread_count"], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(sender=self.user, receiver=self.admin, content="hello")
+        self.assertEqual(client.get("/api/admin/notifications/unread-count/").json()["unread_count"], 1)
+
+    def test_cache_outage_does_not_fail_the_write(self):
+        with mock.patch.object(type(app_cache.shared), "delete", side_effect=RuntimeError("cache down")), \
+                self.assertLogs("pet_rescue_app.caching", "ERROR"):
+            with self.captureOnCommitCallbacks(execute=True):
+                notification = Notification.objects.create(sender=self.user, receiver=self.admin, content="hello")
+        self.assertTrue(Notification.objects.filter(pk=notification.pk).exists())
+
+    def test_invalidate_bumps_the_namespace_version(self):
+        app_cache.set("tests", "key", "value")
+        before = app_cache.namespace_version("tests")
+        app_cache.invalidate("tests")
+        self.assertEqual(app_cache.namespace_version("tests"), before + 1)
+        self.assertIsNone(app_cache.get("tests", "key"))
+
+    def test_evicted_version_key_never_revives_old_entries(self):
+        app_cache.set("tests", "key", "stale")
+        first = app_cache.namespace_version("tests")
+        for evict in (app_cache.namespace_version, app_cache.invalidate):
+            with self.subTest(after=evict.__name__):
+                app_cache.shared.delete(app_cache._version_key("tests"))
+                app_cache.clear_local()
+                self.assertNotEqual(evict("tests"), first)
+                self.assertIsNone(app_cache.get("tests", "key"))
+
+
+# -------------------------
+# Reward points (rewards.py)
+# -------------------------
+class RewardTests(TestCase):
+    def setUp(self):
+        self.admin = make_admin()
+        self.rescuer = make_user("rescuer")
+        self.adopter = make_user("adopter")
+        pet_type = PetType.objects.create(type="Dog")
+        for index in range(2):
+            pet = Pet.objects.create(name=f"Rex {index}", pet_type=pet_type)
+            PetReport.objects.create(pet=pet, user=self.rescuer, pet_status="Found", report_status="Accepted")
+        PetReport.objects.create(pet=pet, user=self.rescuer, pet_status="Lost", report_status="Accepted")
+        PetAdoption.objects.create(pet=pet, requestor=self.adopter, status="Approved")
+
+    def test_my_rewards_and_all_rewards_agree(self):
+        mine = client_for(self.rescuer).get("/api/my-rewards/").json()
+        self.assertEqual(mine["points"], 2 * RESCUER_POINTS)
+
+        response = client_for(self.admin).get("/api/all-rewards/", {"ordering": "-points"})
+        listed = json_body(response)
+        self.assertEqual([row["username"] for row in listed], ["rescuer", "adopter", "admin"])
+        self.assertEqual(listed[0]["points"], mine["points"])
+        self.assertEqual(listed[0]["badge"], mine["badge"])
+        self.assertEqual(listed[1]["points"], ADOPTER_POINTS)
+
+    def test_all_rewards_filters(self):
+        client = client_for(self.admin)
+        self.assertEqual([row["username"] for row in json_body(client.get("/api/all-rewards/", {"min_points": 1}))],
+                         ["rescuer", "adopter"])
+        self.assertEqual([row["username"] for row in json_body(client.get("/api/all-rewards/", {"search": "ADOP"}))],
+                         ["adopter"])
+
+    def test_refresh_all_only_writes_changes(self):
+        self.assertEqual(refresh_all(batch_size=2), 3)
+        self.assertEqual(refresh_all(batch_size=2), 0)
+        PetAdoption.objects.update(status="Rejected")
+        self.assertEqual(refresh_all(), 1)
+        self.assertEqual(RewardPoint.objects.get(user=self.adopter).points, 0)
+
+
+# -------------------------
+# Periodic jobs (scheduler.py)
+# -------------------------
+class CronTests(TestCase):
+    def at(self, *args):
+        return timezone.make_aware(datetime(*args))
+
+    def test_next_after(self):
+        self.assertEqual(Cron("*/15 * * * *").next_after(self.at(2026, 1, 1, 10, 7)), self.at(2026, 1, 1, 10, 15))
+        self.assertEqual(Cron("@daily").next_after(self.at(2026, 1, 1, 0, 0)), self.at(2026, 1, 2, 0, 0))
+        # 2026-01-04 is a Sunday; 7 means Sunday too
+        self.assertEqual(Cron("30 8 * * 7").next_after(self.at(2026, 1, 1, 9, 0)), self.at(2026, 1, 4, 8, 30))
+        self.assertEqual(Cron("0 0 29 2 *").next_after(self.at(2026, 1, 1, 0, 0)), self.at(2028, 2, 29, 0, 0))
+
+    def test_day_or_weekday(self):
+        # Both restricted: the 15th or any Monday (2026-01-05)
+        self.assertEqual(Cron("0 0 15 * 1").next_after(self.at(2026, 1, 1, 0, 0)), self.at(2026, 1, 5, 0, 0))
+
+    def test_invalid_expressions(self):
+        for expression in ("* * * *", "60 * * * *", "a * * * *", "5-1 * * * *", "*/0 * * * *", "0 0 31 2 *"):
+            with self.subTest(expression=expression), self.assertRaises(ScheduleError):
+                Cron(expression)
+
+
+class SchedulerTests(TestCase):
+    def setUp(self):
+        self.calls = []
+        patcher = mock.patch.dict(scheduler.jobs, {"test_job": (lambda: self.calls.append(1) or "done", "@hourly")},
+                                  clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.scheduled = ScheduledJob.objects.create(
+            name="test_job", schedule="@hourly", next_run_at=timezone.now() - timedelta(minutes=1)
+        )
+
+    def test_due_job_runs_once_and_moves_on(self):
+        runs = Scheduler(node="a").run_due()
+        self.assertEqual([(run.status, run.result) for run in runs], [("ok", "'done'")])
+        self.assertEqual(Scheduler(node="b").run_due(), [])
+        self.assertEqual(len(self.calls), 1)
+        self.scheduled.refresh_from_db()
+        self.assertGreater(self.scheduled.next_run_at, timezone.now())
+        self.assertEqual(self.scheduled.locked_by, "")
+
+    def test_leased_job_is_skipped(self):
+        ScheduledJob.objects.update(locked_until=timezone.now() + timedelta(minutes=5), locked_by="other")
+        self.assertEqual(Scheduler(node="a").run_due(), [])
+        self.assertEqual(self.calls, [])
+
+    def test_failure_is_recorded(self):
+        scheduler.jobs["test_job"] = (lambda: 1 / 0, "@hourly")
+        with self.assertLogs("pet_rescue_app.scheduler", "ERROR"):
+            run = Scheduler(node="a").run(self.scheduled)
+        self.assertEqual(run.status, "failed")
+        self.assertIn("ZeroDivisionError", run.result)
+        self.assertEqual(ScheduledJob.objects.get().last_status, "failed")
+
+
+# -------------------------
+# Admin exports (exports.py)
+# -------------------------
+class RewardExportTests(TestCase):
+    def setUp(self):
+        self.admin = make_admin()
+        self.rescuer = make_user("rescuer")
+        pet = Pet.objects.create(name="Rex", pet_type=PetType.objects.create(type="Dog"))
+        PetReport.objects.create(pet=pet, user=self.rescuer, pet_status="Found", report_status="Accepted")
+
+    def test_export_has_the_listed_points(self):
+        response = client_for(self.admin).get("/api/admin/export/rewards/", {"output": "ndjson", "min_points": 1})
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual([(row["username"], row["points"]) for row in rows], [("rescuer", RESCUER_POINTS)])
+
+    def test_bad_points_filter_is_a_400(self):
+        client = client_for(self.admin)
+        for url in ("/api/admin/export/rewards/", "/api/all-rewards/"):
+            with self.subTest(url=url):
+                response = client.get(url, {"min_points": "lots"})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("min_points", response.json())
+
+    def test_export_is_admin_only(self):
+        self.assertEqual(client_for(self.rescuer).get("/api/admin/export/rewards/").status_code, 403)
+
+    def test_export_streams_under_asgi(self):
+        columns = [("username", "username")]
+        queryset = Profile.objects.order_by("username")
+        self.assertFalse(export_response(queryset, columns, "csv", "users", request=RequestFactory().get("/")).is_async)
+
+        response = export_response(queryset, columns, "csv", "users", request=AsyncRequestFactory().get("/"))
+        self.assertTrue(response.is_async)
+
+        async def read():
+            return [chunk async for chunk in response]
+        self.assertEqual(b"".join(async_to_sync(read)()), b"username\r\nadmin\r\nrescuer\r\n")
+
+
+# -------------------------
+# Bulk pet import (bulk_import.py)
+# -------------------------
+class BulkImportTests(TestCase):
+    def setUp(self):
+        app_cache.clear_local()
+        self.admin = make_admin()
+
+    def post(self, rows, user=None):
+        upload = SimpleUploadedFile("pets.json", json.dumps(rows).encode(), content_type="application/json")
+        return client_for(user or self.admin).post("/api/pets/bulk-import/", {"file": upload}, format="multipart")
+
+    def test_valid_rows_are_created_and_invalid_rows_reported(self):
+        response = self.post([
+            {"name": "Rex", "pet_type": " dog ", "pet_status": "Found"},
+            {"name": "Tom", "pet_type": "Cat", "pet_status": "Lost"},
+            {"pet_type": "Dragon", "pet_status": "Lost"},
+            {"name": "Nemo", "pet_type": "Fish", "pet_status": "Adopted"},
+        ])
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual((body["created"], body["failed"]), (2, 2))
+        self.assertEqual([error["row"] for error in body["errors"]], [3, 4])
+        # Types named only by rejected rows are not created
+        self.assertEqual(sorted(PetType.objects.values_list("type", flat=True)), ["Cat", "Dog"])
+        self.assertEqual(PetReport.objects.filter(report_status="Pending").count(), 2)
+
+    def test_falsy_and_long_pet_types(self):
+        body = self.post([
+            {"name": "Zero", "pet_type": 0, "pet_status": "Found"},
+            {"name": "Long", "pet_type": "x" * 51, "pet_status": "Found"},
+        ]).json()
+        self.assertEqual((body["created"], body["failed"]), (1, 1))
+        self.assertIn("pet_type", body["errors"][0]["errors"])
+        self.assertEqual(Pet.objects.get().pet_type.type, "0")
+
+    def test_failed_import_leaves_no_new_pet_types(self):
+        pet_type_registry.invalidate()
+        with mock.patch.object(PetReport.objects, "bulk_create", side_effect=RuntimeError("write failed")):
+            with self.assertRaises(RuntimeError):
+                PetBulkImporter(self.admin).run([{"name": "Rex", "pet_type": "Axolotl", "pet_status": "Found"}])
+        self.assertFalse(PetType.objects.exists())
+        self.assertIsNone(pet_type_registry.lookup("axolotl"))
+
+    def test_admins_only(self):
+        response = self.post([{"name": "Rex", "pet_type": "Dog", "pet_status": "Found"}], user=make_user())
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Pet.objects.exists())
+
+
+# -------------------------
+# Pet type registry (pet_types.py)
+# -------------------------
+class PetTypeRegistryTests(TestCase):
+    def setUp(self):
+        app_cache.clear_local()
+        pet_type_registry.invalidate()
+
+    def test_names_are_normalized(self):
+        dog = pet_type_registry.resolve("dog")
+        self.assertEqual([pet_type_registry.resolve(name) for name in ("DOG ", "puppy", "Dogs")], [dog, dog, dog])
+        self.assertEqual(pet_type_registry.name_for(dog), "Dog")
+        self.assertEqual(PetType.objects.count(), 1)
+
+    def test_types_from_a_rolled_back_transaction_are_forgotten(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                iguana = pet_type_registry.resolve("iguana")
+                self.assertEqual(pet_type_registry.name_for(iguana), "Iguana")
+                raise RuntimeError
+        self.assertIsNone(pet_type_registry.lookup("iguana"))
+        pet = Pet.objects.create(name="Iggy", pet_type_id=pet_type_registry.resolve("iguana"))
+        self.assertEqual(pet.pet_type.type, "Iguana")
+
+
+# -------------------------
+# Pet type merging (merge_pet_types)
+# -------------------------
+class MergePetTypesTests(TestCase):
+    def test_pets_and_saved_searches_move_to_the_kept_type(self):
+        keep = PetType.objects.create(type="dog")
+        duplicate = PetType.objects.create(type="DOG ")
+        pet = Pet.objects.create(name="Rex", pet_type=duplicate)
+        search = SavedSearch.objects.create(user=make_user(), name="Dogs", pet_type=duplicate)
+
+        call_command("merge_pet_types", stdout=StringIO())
+
+        self.assertEqual(list(PetType.objects.values_list("id", "type")), [(keep.id, "Dog")])
+        pet.refresh_from_db()
+        search.refresh_from_db()
+        self.assertEqual((pet.pet_type_id, search.pet_type_id), (keep.id, keep.id))
+        self.assertTrue(ChangeLogEntry.objects.filter(model="saved_search", object_id=search.id).exists())
+        self.assertTrue(ChangeLogEntry.objects.filter(model="pet", object_id=pet.id).exists())
+
+
+# -------------------------
+# Saved-search alerts (saved_searches.py)
+# -------------------------
+class SavedSearchTests(TestCase):
+    def setUp(self):
+        app_cache.clear_local()
+        patcher = mock.patch("pet_rescue_app.saved_searches.saved_search_index", SavedSearchIndex())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.reporter = make_user("reporter")
+        self.searcher = make_user("searcher")
+        self.dog = PetType.objects.create(type="Dog")
+        self.search = SavedSearch.objects.create(
+            user=self.searcher, name="Labs", pet_type=self.dog, pet_status="Found", breed="labrador",
+            pincode_prefix="5600",
+        )
+
+    def accept(self, **pet_fields):
+        pet = Pet.objects.create(name="Rex", pet_type=self.dog, **pet_fields)
+        report = PetReport.objects.create(pet=pet, user=self.reporter, pet_status="Found")
+        with self.captureOnCommitCallbacks(execute=True):
+            report.report_status = "Accepted"
+            report.save()
+        return Notification.objects.filter(receiver=self.searcher, report=report)
+
+    def test_matching_report_notifies_once(self):
+        notifications = self.accept(breed=" Labrador ", pincode=560034)
+        self.assertEqual(notifications.count(), 1)
+        self.assertIn("'Labs'", notifications.get().content)
+
+    def test_every_criterion_has_to_match(self):
+        self.assertFalse(self.accept(breed="Labrador", pincode=561001).exists())
+        self.assertFalse(self.accept(breed="Beagle", pincode=560034).exists())
+
+    def test_pet_type_in_use_cannot_be_deleted(self):
+        response = client_for(make_admin()).delete(f"/api/pet-types/{self.dog.id}/")
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(SavedSearch.objects.filter(pk=self.search.pk).exists())
+
+
+# -------------------------
+# Lost pet submissions (views.LostPetRequestAPIView, idempotency.py)
+# -------------------------
+class LostPetSubmissionTests(TestCase):
+    def setUp(self):
+        app_cache.clear_local()
+        pet_type_registry.invalidate()  # types seen by earlier tests were rolled back
+        make_admin()
+        self.client = client_for(make_user())
+
+    def submit(self, key=None, name="Rex", pet_status="Lost"):
+        headers = {"HTTP_IDEMPOTENCY_KEY": key} if key else {}
+        return self.client.post("/api/lost-pet-request/", {
+            "pet": json.dumps({"name": name, "pet_type": "Dog", "breed": "Lab", "color": "Black", "pincode": 500001}),
+            "report": json.dumps({"pet_status": pet_status}),
+        }, format="multipart", **headers)
+
+    def test_retries_with_the_same_key_replay_the_first_response(self):
+        first = self.submit(key="k1")
+        self.assertEqual(first.status_code, 201, first.content)
+        retry = self.submit(key="k1")
+        self.assertEqual((retry.status_code, retry.json()), (201, first.json()))
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual((Pet.objects.count(), PetReport.objects.count(), Notification.objects.count()), (1, 1, 1))
+
+        self.assertEqual(self.submit(key="k1", name="Max").status_code, 422)
+        self.assertEqual(Pet.objects.count(), 1)
+
+    def test_a_rejected_submission_leaves_nothing_behind(self):
+        response = self.submit(key="k1", pet_status="Nope")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((Pet.objects.count(), PetReport.objects.count(), Notification.objects.count()), (0, 0, 0))
+        # The key is not used up by the failed attempt
+        self.assertEqual(self.submit(key="k1").status_code, 201)
+
+
+# -------------------------
+# Chunked uploads (uploads.py)
+# -------------------------
+def png_bytes(size=(4, 4)):
+    buffer = BytesIO()
+    Image.new("RGB", size, "red").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = make_user()
+        self.client = client_for(self.user)
+        self.data = png_bytes()
+
+    def start(self, data=None):
+        data = data or self.data
+        response = self.client.post("/api/uploads/", {
+            "filename": "rex.png", "total_size": len(data), "checksum": hashlib.sha256(data).hexdigest(),
+        }, format="json")
+        self.assertEqual(response.status_code, 201)
+        return response.json()["token"]
+
+    def put(self, token, start, end, data=None):
+        data = data or self.data
+        return self.client.generic(
+            "PUT", f"/api/uploads/{token}/", data[start:end + 1], content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {start}-{end}/{len(data)}",
+        )
+
+    def test_resume_and_complete(self):
+        token = self.start()
+        middle = len(self.data) // 2
+        self.assertEqual(self.put(token, 0, middle - 1).json()["received_bytes"], middle)
+        # A re-sent chunk is acknowledged; a gap is refused with the offset to resume from
+        self.assertEqual(self.put(token, 0, middle - 1).status_code, 200)
+        skipped = self.put(token, middle + 1, len(self.data) - 1)
+        self.assertEqual((skipped.status_code, skipped.json()["received_bytes"]), (409, middle))
+        self.assertEqual(self.client.get(f"/api/uploads/{token}/").json()["received_bytes"], middle)
+
+        self.put(token, middle, len(self.data) - 1)
+        response = self.client.post(f"/api/uploads/{token}/complete/")
+        self.assertEqual(response.json()["status"], "complete")
+
+    def test_checksum_mismatch(self):
+        token = self.start()
+        corrupted = bytes([self.data[0] ^ 1]) + self.data[1:]
+        self.put(token, 0, len(corrupted) - 1, corrupted)
+        response = self.client.post(f"/api/uploads/{token}/complete/")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Checksum", response.json()["error"])
+
+    def test_claimed_file_is_closed_when_the_save_fails(self):
+        token = self.start()
+        self.put(token, 0, len(self.data) - 1)
+        self.client.post(f"/api/uploads/{token}/complete/")
+
+        claimed = []
+
+        def save(**kwargs):
+            claimed.append(kwargs["image"])
+            raise ValueError("rejected")
+
+        serializer = mock.Mock(save=save)
+        request = mock.Mock(data={"upload_token": token}, user=self.user)
+        with self.assertRaises(ValueError):
+            save_with_upload(serializer, request, "image")
+        self.assertTrue(claimed[0].closed)
+        # The claim rolled back with the failed save, so the upload can be used again
+        self.assertEqual(ChunkedUpload.objects.get(token=token).status, "complete")
+
+    def test_uploads_belong_to_their_user(self):
+        token = self.start()
+        self.put(token, 0, len(self.data) - 1)
+        self.client.post(f"/api/uploads/{token}/complete/")
+        other_user = make_user("other")
+        other = client_for(other_user)
+        self.assertEqual(other.get(f"/api/uploads/{token}/").status_code, 404)
+        response = other.patch(f"/api/profiles/{other_user.id}/", {"upload_token": token}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(ChunkedUpload.objects.get(token=token).status, "complete")
+
+        response = self.client.patch(f"/api/profiles/{self.user.id}/", {"upload_token": token}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(ChunkedUpload.objects.get(token=token).status, "consumed")
+
+    def test_stale_sessions_are_purged_with_their_part_files(self):
+        token = self.start()
+        upload = ChunkedUpload.objects.get(token=token)
+        self.assertTrue(os.path.exists(part_path(upload)))
+        ChunkedUpload.objects.update(created_at=timezone.now() - timedelta(days=2))
+        fresh = self.start()
+
+        call_command("purge_stale_uploads", stdout=StringIO())
+        self.assertEqual([str(token) for token in ChunkedUpload.objects.values_list("token", flat=True)], [fresh])
+        self.assertFalse(os.path.exists(part_path(upload)))
+
+
+# -------------------------
+# Content-addressed media storage (storage.py, gc_media_blobs)
+# -------------------------
+class MediaStorageTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.long_ago = timezone.now() - timedelta(days=2)
+
+    def save(self, data=b"same bytes"):
+        return default_storage.save("pet_images/rex.png", ContentFile(data))
+
+    def gc(self):
+        output = StringIO()
+        call_command("gc_media_blobs", stdout=output)
+        return output.getvalue()
+
+    def test_same_bytes_are_stored_once(self):
+        name = self.save()
+        MediaBlob.objects.update(updated_at=self.long_ago)
+        self.assertEqual(self.save(), name)
+        blob = MediaBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertGreater(blob.updated_at, self.long_ago)  # restarts the GC grace period
+
+    def test_release_restarts_the_grace_period(self):
+        name = self.save()
+        MediaBlob.objects.update(updated_at=self.long_ago)
+        release(name)
+        self.gc()
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(MediaBlob.objects.get().ref_count, 0)
+
+    def test_gc_removes_unreferenced_blobs_only(self):
+        dead = self.save(b"dead")
+        live = self.save(b"live")
+        Pet.objects.create(name="Rex", pet_type=PetType.objects.create(type="Dog"), image=live)
+        MediaBlob.objects.update(ref_count=0, updated_at=self.long_ago)
+
+        self.gc()
+        self.assertFalse(default_storage.exists(dead))
+        self.assertTrue(default_storage.exists(live))
+        self.assertEqual(list(MediaBlob.objects.values_list("name", "ref_count")), [(live, 1)])
+
+    def test_replacing_a_file_releases_the_old_blob_on_commit(self):
+        old, new = self.save(b"old"), self.save(b"new")
+        pet = Pet.objects.create(name="Rex", pet_type=PetType.objects.create(type="Dog"), image=old)
+
+        def refs():
+            return dict(MediaBlob.objects.values_list("name", "ref_count"))
+
+        pet.image = new
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            pet.save()
+            raise RuntimeError("rollback")
+        self.assertEqual(refs(), {old: 1, new: 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            pet.save()
+            pet.save(update_fields=["name"])
+        self.assertEqual(refs(), {old: 0, new: 1})
+
+    def test_rolled_back_save_leaves_no_row_and_gc_removes_the_file(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            name = self.save()
+            raise RuntimeError("rollback")
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertTrue(default_storage.exists(name))
+
+        self.gc()
+        self.assertTrue(default_storage.exists(name))  # still within the grace period
+        os.utime(default_storage.path(name), (self.long_ago.timestamp(), self.long_ago.timestamp()))
+        self.assertIn("1 orphaned file", self.gc())
+        self.assertFalse(default_storage.exists(name))
+
+
+# -------------------------
+# Media serving (media.py)
+# -------------------------
+class MediaServingTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.owner = make_user("owner")
+        self.data = png_bytes((20, 20))
+        self.name = default_storage.save("report_images/rex.png", ContentFile(self.data))
+        pet = Pet.objects.create(name="Rex", pet_type=PetType.objects.create(type="Dog"), created_by=self.owner)
+        self.report = PetReport.objects.create(pet=pet, user=self.owner, pet_status="Lost", image=self.name)
+        self.url = f"/media/{self.name}"
+
+    def body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_images_load_without_credentials_like_an_img_tag(self):
+        profile_image = default_storage.save("profile_images/me.png", ContentFile(png_bytes((8, 8))))
+        Profile.objects.filter(pk=self.owner.pk).update(profile_image=profile_image)
+
+        pending = APIClient().get(self.url)
+        self.assertEqual(self.body(pending), self.data)
+        self.assertEqual(pending["Cache-Control"], "private, max-age=31536000, immutable")
+        profile = APIClient().get(f"/media/{profile_image}")
+        self.assertEqual(profile.status_code, 200)
+        self.assertEqual(profile["Cache-Control"], "public, max-age=31536000, immutable")
+
+    def test_legacy_pending_report_image_is_visible_to_owner_and_admin_only(self):
+        legacy = "report_images/rex.png"
+        with open(default_storage.path(legacy), "wb") as fh:
+            fh.write(self.data)
+        PetReport.objects.filter(pk=self.report.pk).update(image=legacy)
+        url = f"/media/{legacy}"
+        self.assertEqual(APIClient().get(url).status_code, 404)
+        self.assertEqual(client_for(make_user("stranger")).get(url).status_code, 404)
+
+        response = client_for(self.owner).get(url)
+        self.assertEqual(self.body(response), self.data)
+        self.assertEqual(response["Cache-Control"], "private, max-age=3600")
+        self.assertEqual(client_for(make_admin()).get(url).status_code, 200)
+
+    def test_public_report_image_is_cached_as_immutable(self):
+        PetReport.objects.filter(pk=self.report.pk).update(report_status="Accepted")
+        response = APIClient().get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+
+        not_modified = APIClient().get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_ranges(self):
+        client = client_for(self.owner)
+        partial = client.get(self.url, HTTP_RANGE="bytes=2-5")
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial["Content-Range"], f"bytes 2-5/{len(self.data)}")
+        self.assertEqual(self.body(partial), self.data[2:6])
+
+        self.assertEqual(self.body(client.get(self.url, HTTP_RANGE="bytes=-4")), self.data[-4:])
+        self.assertEqual(client.get(self.url, HTTP_RANGE=f"bytes={len(self.data)}-").status_code, 416)
+        # A stale If-Range gets the whole file
+        whole = client.get(self.url, HTTP_RANGE="bytes=2-5", HTTP_IF_RANGE='"stale"')
+        self.assertEqual((whole.status_code, self.body(whole)), (200, self.data))
+
+    def test_paths_outside_the_upload_prefixes(self):
+        client = client_for(make_admin())
+        for path in ("../settings.py", "report_images/../../x", "chunked_uploads/x.part", "report_images/.tmp-x"):
+            with self.subTest(path=path):
+                self.assertEqual(client.get(f"/media/{path}").status_code, 404)
+
+
+# -------------------------
+# Sparse fieldsets (fieldsets.py)
+# -------------------------
+class FieldsetTests(TestCase):
+    def setUp(self):
+        app_cache.clear_local()
+        self.user = make_user()
+        self.client = client_for(self.user)
+        self.pet = Pet.objects.create(name="Rex", pet_type=PetType.objects.create(type="Dog"), breed="Lab")
+        self.report = PetReport.objects.create(pet=self.pet, user=self.user, pet_status="Lost")
+
+    def get(self, **params):
+        return self.client.get("/api/pet-reports/", params)
+
+    def test_fields_and_expand(self):
+        self.assertEqual(json_body(self.get(fields="id,pet_status")), [{"id": self.report.id, "pet_status": "Lost"}])
+        self.assertEqual(json_body(self.get(fields="id,pet")), [{"id": self.report.id, "pet": self.pet.id}])
+        expanded = [{"id": self.report.id, "pet": {"name": "Rex"}}]
+        self.assertEqual(json_body(self.get(expand="pet", fields="id,pet.name")), expanded)
+        self.assertEqual(json_body(self.get(fields="id,pet.name")), expanded)
+        self.assertEqual(json_body(self.get(expand="user", fields="user.username")), [{"user": {"username": "user"}}])
+
+    def test_expanded_relations_are_loaded_with_the_list(self):
+        for _ in range(3):
+            PetReport.objects.create(pet=self.pet, user=self.user, pet_status="Found")
+        with self.assertNumQueries(2):  # the token's user, then the reports joined with their pets
+            rows = json_body(self.get(fields="id,pet.name,pet.breed"))
+        self.assertEqual(len(rows), 4)
+
+    def test_unknown_or_unsupported_fields_are_a_400(self):
+        for params in (
+            {"fields": "id,nope"}, {"expand": "nope"}, {"fields": "pet.nope"},
+            {"fields": "pet_status.value"}, {"expand": "duplicate_of"},
+        ):
+            with self.subTest(**params):
+                response = self.get(**params)
+                self.assertEqual(response.status_code, 400, response.content)
+
+
+# -------------------------
+# Fast read serializers (fast_serializers.py)
+# -------------------------
+class FastSerializerTests(TestCase):
+    def test_fast_output_matches_the_drf_serializers(self):
+        app_cache.clear_local()
+        user = make_user(profile_image="profile_images/me and my dog.png")
+        pet = Pet.objects.create(name="Rex", pet_type=PetType.objects.create(type="Dog"), created_by=user)
+        report = PetReport.objects.create(pet=pet, user=user, pet_status="Lost", image="report_images/r 1.jpg")
+        Notification.objects.create(sender=user, receiver=user, content="hello", pet=pet, report=report)
+        Notification.objects.create(sender=user, content="no receiver")
+        request = RequestFactory().get("/", HTTP_HOST="testserver")
+
+        for serializer_class, fast_class, queryset in (
+            (PetSerializer, PetFastSerializer, Pet.objects.order_by("id")),
+            (PetReportSerializer, PetReportFastSerializer, PetReport.objects.order_by("id")),
+            (NotificationSerializer, NotificationFastSerializer, Notification.objects.order_by("id")),
+        ):
+            with self.subTest(serializer=serializer_class.__name__):
+                expected = serializer_class(queryset, many=True, context={"request": request}).data
+                self.assertEqual(json.loads(dumps(expected)), fast_class(request).serialize(queryset))
+
+    def test_list_streams_under_asgi(self):
+        pet_type = PetType.objects.create(type="Dog")
+        for name in ("Rex", "Max"):
+            Pet.objects.create(name=name, pet_type=pet_type)
+        request = AsyncRequestFactory().get("/", HTTP_HOST="testserver")
+        response = list_response(PetFastSerializer, PetSerializer, Pet.objects.order_by("id"), request, key="pets")
+        self.assertTrue(response.is_async)
+
+        async def read():
+            return [chunk async for chunk in response]
+        self.assertEqual([pet["name"] for pet in json.loads(b"".join(async_to_sync(read)()))["pets"]], ["Rex", "Max"])
+
+
+# -------------------------
+# Response compression (middleware.py)
+# -------------------------
+class CompressionTests(TestCase):
+    body = b'{"name": "Rex", "breed": "Labrador"}' * 100
+
+    def respond(self, response, **headers):
+        request = RequestFactory().get("/", **headers)
+        return middleware.CompressionMiddleware(lambda request: response)(request)
+
+    def json_response(self):
+        return HttpResponse(self.body, content_type="application/json")
+
+    def test_gzip_responses_are_padded_with_a_random_file_name(self):
+        sizes = set()
+        for _ in range(10):
+            response = self.respond(self.json_response(), HTTP_ACCEPT_ENCODING="gzip")
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertEqual(gzip.decompress(response.content), self.body)
+            sizes.add(len(response.content))
+        self.assertGreater(len(sizes), 1)
+
+    def test_streamed_responses_are_one_gzip_member(self):
+        chunks = [b"[", b'{"id": 1}', b",", b'{"id": 2}', b"]"]
+        response = self.respond(StreamingHttpResponse(iter(chunks), content_type="application/json"),
+                                HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), b"".join(chunks))
+
+    def test_brotli_only_without_credentials(self):
+        fake_brotli = mock.Mock(compress=lambda content, quality: b"br")
+        with mock.patch.object(middleware, "brotli", fake_brotli):
+            self.assertEqual(self.respond(self.json_response(), HTTP_ACCEPT_ENCODING="br, gzip")["Content-Encoding"], "br")
+            for credentials in ({"HTTP_AUTHORIZATION": "Bearer token"}, {"HTTP_COOKIE": "sessionid=abc"}):
+                with self.subTest(**credentials):
+                    response = self.respond(self.json_response(), HTTP_ACCEPT_ENCODING="br, gzip", **credentials)
+                    self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_gzip_when_brotli_is_not_installed(self):
+        with mock.patch.object(middleware, "brotli", None):
+            response = self.respond(self.json_response(), HTTP_ACCEPT_ENCODING="br, gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    def test_small_or_unlisted_responses_are_left_alone(self):
+        for response in (HttpResponse(b"{}", content_type="application/json"),
+                         HttpResponse(self.body, content_type="image/png")):
+            self.assertFalse(self.respond(response, HTTP_ACCEPT_ENCODING="gzip").has_header("Content-Encoding"))
+
+    def test_non_finite_floats_render_as_null(self):
+        self.assertEqual(dumps({"a": float("nan"), "b": float("inf")}), b'{"a":null,"b":null}')
+
+
+# -------------------------
+# Async read views (async_views.py)
+# -------------------------
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        app_cache.clear_local()
+        self.admin = make_admin()
+        self.token = f"Bearer {RefreshToken.for_user(self.admin).access_token}"
+        pet = Pet.objects.create(name="Rex", pet_type=PetType.objects.create(type="Dog"), created_by=self.admin)
+        PetReport.objects.create(pet=pet, user=self.admin, pet_status="Lost", report_status="Accepted")
+        Notification.objects.create(sender=self.admin, receiver=self.admin, content="hello", pet=pet)
+
+    def call(self, view, path, **headers):
+        request = RequestFactory().get(path, HTTP_HOST="testserver", **headers)
+
+        async def run():
+            response = await view(request)
+            if response.streaming:
+                response.body = b"".join([chunk async for chunk in response.streaming_content])
+            else:
+                response.body = response.content
+            return response
+
+        return async_to_sync(run)()
+
+    def test_responses_match_the_drf_views(self):
+        client = APIClient(HTTP_AUTHORIZATION=self.token)
+        for view, path in (
+            (async_views.pets_list, "/api/pets-list/?tab=lost"),
+            (async_views.user_notifications, "/api/get-notifications/"),
+            (async_views.profile_details, "/api/profile_details/"),
+            (async_views.admin_unread_count, "/api/admin/notifications/unread-count/"),
+            (async_views.recent_pets, "/api/pets/recent/"),
+        ):
+            with self.subTest(path=path):
+                response = self.call(view, path, HTTP_AUTHORIZATION=self.token)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(json.loads(response.body), json_body(client.get(path)))
+
+    def test_credentials_are_checked_by_the_drf_authentication(self):
+        response = self.call(async_views.user_notifications, "/api/get-notifications/")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], 'Bearer realm="api"')
+        response = self.call(async_views.user_notifications, "/api/get-notifications/", HTTP_AUTHORIZATION="Bearer nope")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(json.loads(response.body)["code"], "token_not_valid")
+        self.assertEqual(self.call(async_views.recent_pets, "/api/pets/recent/").status_code, 200)
+
+        Profile.objects.filter(pk=self.admin.pk).update(is_active=False)
+        response = self.call(async_views.user_notifications, "/api/get-notifications/", HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(response.status_code, 401)
+
+
+# -------------------------
+# Adoption decisions (adoptions.py)
+# -------------------------
+class AdoptionDecisionTests(TestCase):
+    def setUp(self):
+        app_cache.clear_local()
+        self.admin = make_admin()
+        self.pet = Pet.objects.create(name="Rex", pet_type=PetType.objects.create(type="Dog"))
+        self.found = PetReport.objects.create(pet=self.pet, user=self.admin, pet_status="Found", report_status="Accepted")
+        self.first = PetAdoption.objects.create(pet=self.pet, requestor=make_user("first"))
+        self.second = PetAdoption.objects.create(pet=self.pet, requestor=make_user("second"))
+
+    def approve(self, **extra):
+        return client_for(self.admin).post(
+            "/api/admin/approve/", {"request_type": "adopt", "pet_id": self.pet.id, "action": "approve", **extra},
+            format="json",
+        )
+
+    def test_approving_rejects_the_other_requests(self):
+        self.assertEqual(self.approve(adoption_id=self.first.id).status_code, 200)
+        self.assertEqual(
+            dict(PetAdoption.objects.values_list("id", "status")),
+            {self.first.id: "Approved", self.second.id: "Rejected"},
+        )
+        self.found.refresh_from_db()
+        self.assertTrue(self.found.is_resolved)
+        self.assertEqual(
+            sorted(Notification.objects.values_list("receiver__username", "content")),
+            [("first", "Your adoption request is approved"), ("second", "Your adoption request is rejected")],
+        )
+
+    def test_a_second_approval_is_a_conflict(self):
+        self.assertEqual(self.approve(adoption_id=self.first.id).status_code, 200)
+        response = self.approve(adoption_id=self.second.id)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(PetAdoption.objects.get(pk=self.second.pk).status, "Rejected")
+
+    def test_approving_without_adoption_id_needs_a_single_pending_request(self):
+        self.assertEqual(self.approve().status_code, 400)
+        self.assertFalse(PetAdoption.objects.exclude(status="Pending").exists())
+
+        self.second.delete()
+        self.assertEqual(self.approve().status_code, 200)
+        self.assertEqual(PetAdoption.objects.get(pk=self.first.pk).status, "Approved")
+
+    def test_only_admins_change_the_status(self):
+        requestor = client_for(self.first.requestor)
+        response = requestor.patch(f"/api/pet-adoptions/{self.first.id}/", {"status": "Approved"}, format="json")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(PetAdoption.objects.get(pk=self.first.pk).status, "Pending")
+        response = requestor.patch(f"/api/pet-adoptions/{self.first.id}/", {"message": "Please!"}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        response = client_for(self.admin).patch(f"/api/pet-adoptions/{self.first.id}/", {"status": "Approved"},
+                                                format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(PetAdoption.objects.get(pk=self.second.pk).status, "Rejected")
+
+
+# -------------------------
+# Vaccination reminders (vaccinations.py)
+# -------------------------
+class VaccinationReminderTests(TestCase):
+    def setUp(self):
+        app_cache.clear_local()
+        self.owner = make_user("owner")
+        self.today = datetime(2026, 6, 1).date()
+        self.pets = []
+        for name in ("Rex", "Tom"):
+            pet = Pet.objects.create(name=name, pet_type=PetType.objects.get_or_create(type="Dog")[0], created_by=self.owner)
+            PetMedicalHistory.objects.create(pet=pet, vaccination_name="Rabies",
+                                             last_vaccinated_date=self.today - timedelta(days=360))
+            self.pets.append(pet)
+
+    def test_each_cycle_is_reminded_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            stats = vaccinations.send_due_reminders(today=self.today, chunk_size=1)
+        self.assertEqual((stats["reminded"], stats["emails"], stats["chunks"]), (2, 2, 2))
+        self.assertEqual(Notification.objects.filter(receiver=self.owner).count(), 2)
+        self.assertEqual(set(QueuedEmail.objects.values_list("to_email", flat=True)), {"owner@example.com"})
+
+        stats = vaccinations.send_due_reminders(today=self.today)
+        self.assertEqual((stats["reminded"], stats["already_reminded"]), (0, 2))
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertEqual(QueuedEmail.objects.count(), 2)
+
+    def test_cycles_taken_by_a_concurrent_run_are_left_to_it(self):
+        bulk_create = VaccinationReminder.objects.bulk_create
+        due_date = self.today + timedelta(days=5)
+
+        def racing_bulk_create(reminders, **kwargs):
+            # Another run commits Rex's reminder between our check and our insert
+            VaccinationReminder.objects.create(pet=self.pets[0], due_date=due_date)
+            return bulk_create(reminders, **kwargs)
+
+        with mock.patch.object(VaccinationReminder.objects, "bulk_create", side_effect=racing_bulk_create):
+            stats = vaccinations.send_due_reminders(today=self.today)
+        self.assertEqual((stats["reminded"], stats["already_reminded"]), (1, 1))
+        self.assertEqual(list(Notification.objects.values_list("pet__name", flat=True)), ["Tom"])
+        self.assertEqual(list(QueuedEmail.objects.values_list("subject", flat=True)), ["Vaccination reminder for Tom"])
+
+
+# -------------------------
+# Outbox (outbox.py)
+# -------------------------
+class OutboxTests(TestCase):
+    def setUp(self):
+        for address in ("a@example.com", "b@example.com"):
+            QueuedEmail.objects.create(to_email=address, subject="Hi", body="Hello")
+
+    def test_queued_mail_is_sent_once(self):
+        self.assertEqual(outbox.send_queued(batch_size=1), (2, 0))
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ["a@example.com", "b@example.com"])
+        self.assertEqual(set(QueuedEmail.objects.values_list("status", "attempts")), {("sent", 1)})
+        self.assertEqual(outbox.send_queued(), (0, 0))
+
+    @override_settings(OUTBOX_RETRY_SECONDS=0)
+    def test_failed_mail_is_retried_later_until_attempts_run_out(self):
+        def send(message, fail_silently=False):
+            if message.to == ["a@example.com"]:
+                raise OSError("mailbox unavailable")
+            return 1
+
+        with mock.patch("django.core.mail.EmailMessage.send", autospec=True, side_effect=send):
+            # Tried once per call even though the row is due again at once
+            self.assertEqual(outbox.send_queued(), (1, 1))
+            self.assertEqual(outbox.send_queued(), (0, 1))
+            self.assertEqual(outbox.send_queued(), (0, 1))
+            self.assertEqual(outbox.send_queued(), (0, 0))
+        failed = QueuedEmail.objects.get(to_email="a@example.com")
+        self.assertEqual((failed.status, failed.attempts, failed.error), ("failed", 3, "mailbox unavailable"))
+
+    def test_backoff_grows_with_each_failure(self):
+        with mock.patch("django.core.mail.EmailMessage.send", side_effect=OSError("down")):
+            self.assertEqual(outbox.send_queued(), (0, 2))
+            self.assertEqual(outbox.send_queued(), (0, 0))  # not due yet
+            QueuedEmail.objects.update(next_attempt_at=timezone.now())
+            before = timezone.now()
+            self.assertEqual(outbox.send_queued(), (0, 2))
+        email = QueuedEmail.objects.first()
+        self.assertEqual(email.attempts, 2)
+        self.assertGreaterEqual(email.next_attempt_at, before + outbox.retry_delay(2))
+        self.assertEqual(outbox.retry_delay(2), 2 * outbox.retry_delay(1))
+
+    def test_unreachable_server_fails_the_batch_and_stops(self):
+        with mock.patch("pet_rescue_app.outbox.get_connection", side_effect=ConnectionRefusedError("refused")):
+            self.assertEqual(outbox.send_queued(batch_size=1), (0, 1))
+        self.assertEqual(
+            sorted(QueuedEmail.objects.values_list("to_email", "attempts", "error")),
+            [("a@example.com", 1, "refused"), ("b@example.com", 0, "")],
+        )
+        self.assertEqual(mail.outbox, [])
+
+
+# -------------------------
+# Lazily loaded integrations (integrations.py)
+# -------------------------
+class IntegrationTests(TestCase):
+    def test_providers_load_once_on_first_use(self):
+        registry = ProviderRegistry()
+        factory = mock.Mock(return_value="client")
+        registry.register("thing", factory)
+        self.assertEqual(registry.loaded(), [])
+        self.assertEqual([registry.get("thing"), registry.get("thing")], ["client", "client"])
+        factory.assert_called_once_with()
+        self.assertEqual(registry.loaded(), ["thing"])
+
+        registry.register("thing", lambda: "other client")
+        self.assertEqual(registry.get("thing"), "other client")
+
+    def test_gemini_is_not_loaded_at_startup(self):
+        # The URLconf, and with it every view, is loaded by now
+        self.client.get("/api/chatbot/")
+        self.assertNotIn("gemini", providers.loaded())
+        self.assertNotIn("google.generativeai", sys.modules)
+
+    def test_chatbot_answers_from_the_model(self):
+        reply = mock.Mock(text=" Woof! ")
+        with mock.patch("pet_rescue_app.views.gemini_generate", return_value=reply) as generate:
+            response = self.client.post("/api/chatbot/", {"message": "hi", "section": "pet-adopter"},
+                                        content_type="application/json")
+        self.assertEqual(response.json(), {"reply": "Woof!"})
+        self.assertIn("User: hi", generate.call_args.args[0])
+
+
+# -------------------------
+# Admin changelists (admin.py, pagination.py)
+# -------------------------
+class AdminChangelistTests(TestCase):
+    models = ("pet", "petmedicalhistory", "petreport", "petadoption", "notification", "userreport", "feedbackstory")
+
+    def setUp(self):
+        self.admin = make_admin()
+        self.client.force_login(self.admin)
+        self.dog = PetType.objects.create(type="Dog")
+
+    def add_rows(self, count):
+        for _ in range(count):
+            user = make_user(f"user{Profile.objects.count()}")
+            pet = Pet.objects.create(name="Rex", pet_type=self.dog, created_by=user)
+            PetMedicalHistory.objects.create(pet=pet, vaccination_name="Rabies")
+            report = PetReport.objects.create(pet=pet, user=user, pet_status="Found")
+            PetAdoption.objects.create(pet=pet, requestor=user)
+            Notification.objects.create(sender=user, receiver=self.admin, content="hi", pet=pet, report=report)
+            UserReport.objects.create(pet_report=report, pet_report_creator=user, report_type="Sighting",
+                                      message="Seen", created_by=user)
+            FeedbackStory.objects.create(user=user, title="Home", story="Found a home", pet_name="Rex")
+
+    def queries(self, path):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, path)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.add_rows(1)
+        before = {model: self.queries(f"/admin/pet_rescue_app/{model}/") for model in self.models}
+        self.add_rows(4)
+        after = {model: self.queries(f"/admin/pet_rescue_app/{model}/") for model in self.models}
+        self.assertEqual(after, before)
+
+    def test_search_is_a_prefix_match(self):
+        self.add_rows(1)
+        for model in self.models + ("profile",):
+            with self.subTest(model=model):
+                self.assertEqual(self.client.get(f"/admin/pet_rescue_app/{model}/", {"q": "us"}).status_code, 200)
+        response = self.client.get("/admin/pet_rescue_app/pet/", {"q": "re"})
+        self.assertContains(response, "1 result")
+        response = self.client.get("/admin/pet_rescue_app/pet/", {"q": "ex"})
+        self.assertContains(response, "0 results")
+
+    def test_large_tables_are_paged_by_the_estimate(self):
+        self.add_rows(3)
+        with mock.patch("pet_rescue_app.pagination.estimate_count", return_value=20000):
+            paginator = EstimatedCountPaginator(Pet.objects.order_by("id"), 2)
+            self.assertEqual((paginator.count, paginator.count_is_estimate), (20000, True))
+            self.assertTrue(paginator.page(1).has_next())
+            self.assertFalse(paginator.page(2).has_next())
+            self.assertEqual(len(paginator.page(50).object_list), 0)  # past the rows but within the estimate
+            self.assertEqual(self.client.get("/admin/pet_rescue_app/pet/").status_code, 200)
+
+        paginator = EstimatedCountPaginator(Pet.objects.order_by("id"), 2)
+        self.assertEqual((paginator.count, paginator.count_is_estimate), (3, False))
+
+
+# -------------------------
+# API pagination (pagination.py)
+# -------------------------
+class PaginationTests(TestCase):
+    def setUp(self):
+        app_cache.clear_local()
+        self.client = client_for(make_user())
+        dog = PetType.objects.create(type="Dog")
+        self.pets = [Pet.objects.create(name=name, pet_type=dog) for name in ("Rex", "Max", "Tom")]
+
+    def test_pages_only_when_asked(self):
+        self.assertEqual(len(json_body(self.client.get("/api/pets/"))), 3)
+
+        page = self.client.get("/api/pets/", {"page_size": 2}).json()
+        self.assertEqual((page["count"], page["count_is_estimate"]), (3, False))
+        self.assertEqual([pet["name"] for pet in page["results"]], ["Rex", "Max"])
+        page = self.client.get(page["next"]).json()
+        self.assertEqual(([pet["name"] for pet in page["results"]], page["next"]), (["Tom"], None))
+        self.assertEqual(self.client.get("/api/pets/", {"page_size": 2, "page": 3}).status_code, 404)
+
+    def test_estimated_counts_are_flagged(self):
+        with mock.patch("pet_rescue_app.pagination.estimate_count", return_value=50000):
+            page = self.client.get("/api/pets/", {"page_size": 2}).json()
+            self.assertEqual((page["count"], page["count_is_estimate"]), (50000, True))
+            self.assertIsNotNone(page["next"])
+            page = self.client.get("/api/pets/", {"page_size": 2, "page": 2}).json()
+            self.assertEqual((len(page["results"]), page["next"]), (1, None))
+            # The estimate may be too high: pages past the last row are empty, not errors
+            response = self.client.get("/api/pets/", {"page_size": 2, "page": 3})
+            self.assertEqual((response.status_code, response.json()["results"]), (200, []))
+
+
+# -------------------------
+# Duplicate reports (duplicates.py)
+# -------------------------
+class DuplicateReportTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        app_cache.clear_local()
+        pet_type_registry.invalidate()
+        make_admin()
+        self.alice, self.bob = make_user("alice"), make_user("bob")
+
+    def submit(self, user, image=None, **pet):
+        data = {
+            "pet": json.dumps({"name": "Rex", "pet_type": "Dog", "breed": "Lab", "color": "Black", "pincode": 500001,
+                               **pet}),
+            "report": json.dumps({"pet_status": "Found"}),
+        }
+        if image is not None:
+            data["pet_image"] = SimpleUploadedFile("rex.png", image, content_type="image/png")
+        return client_for(user).post("/api/lost-pet-request/", data, format="multipart")
+
+    def test_a_repeat_by_the_same_reporter_is_refused(self):
+        first = self.submit(self.alice).json()
+        response = self.submit(self.alice, color=" black ")
+        self.assertEqual((response.status_code, response.json()["report_id"]), (409, first["report_id"]))
+        self.assertEqual(PetReport.objects.count(), 1)
+
+        self.assertEqual(self.submit(self.alice, color="White").status_code, 201)
+        self.assertEqual(self.submit(self.bob).json()["duplicate_of"], None)
+
+    def test_the_same_photo_from_someone_else_is_linked(self):
+        image = png_bytes()
+        first = self.submit(self.alice, image=image).json()
+        second = self.submit(self.bob, image=image, breed="Beagle")
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.json()["duplicate_of"], first["report_id"])
+        self.assertEqual(PetReport.objects.get(pk=second.json()["report_id"]).duplicate_of_id, first["report_id"])
+
+    def test_rejected_or_resolved_reports_do_not_match(self):
+        first = self.submit(self.alice).json()
+        PetReport.objects.filter(pk=first["report_id"]).update(report_status="Rejected")
+        second = self.submit(self.alice)
+        self.assertEqual(second.status_code, 201)
+        # The new report took over the keys: repeating it is refused again
+        third = self.submit(self.alice)
+        self.assertEqual((third.status_code, third.json()["report_id"]), (409, second.json()["report_id"]))
+
+        PetReport.objects.update(report_status="Pending", is_resolved=True)
+        self.assertEqual(self.submit(self.alice).status_code, 201)
+        self.assertEqual(self.submit(self.alice).status_code, 409)
+        self.assertEqual(PetReport.objects.count(), 3)
+
+    def test_a_photo_reused_after_a_reunion_is_checked_again(self):
+        image = png_bytes()
+        first = self.submit(self.alice, image=image).json()
+        PetReport.objects.filter(pk=first["report_id"]).update(report_status="Reunited", is_resolved=True)
+        second = self.submit(self.alice, image=image, breed="Beagle").json()
+        third = self.submit(self.bob, image=image, breed="Poodle")
+        self.assertEqual(third.json()["duplicate_of"], second["report_id"])
+
+    @override_settings(REPORT_DUPLICATE_WINDOW=3600)
+    def test_reports_across_a_window_boundary_still_match(self):
+        first = self.submit(self.alice).json()
+        report = PetReport.objects.get(pk=first["report_id"])
+        ReportFingerprint.objects.all().delete()
+        PetReport.objects.filter(pk=report.pk).update(created_date=report.created_date - timedelta(hours=1))
+        report.refresh_from_db()
+        check_report(report)  # registers its keys in the previous window
+        self.assertEqual(self.submit(self.alice).status_code, 409)
+
+
+# -------------------------
+# Change feed (changefeed.py)
+# -------------------------
+@override_settings(CHANGE_FEED_SETTLE_SECONDS=0)
+class ChangeFeedTests(TestCase):
+    def setUp(self):
+        app_cache.clear_local()
+        self.user = make_user()
+        self.client = client_for(self.user)
+        self.dog = PetType.objects.create(type="Dog")
+
+    def changes(self, since, **params):
+        response = self.client.get("/api/changes/", {"since": since, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_polling_returns_the_latest_event_per_object(self):
+        cursor = self.client.get("/api/changes/").json()["cursor"]
+        pet = Pet.objects.create(name="Rex", pet_type=self.dog)
+        pet.name = "Rex II"
+        pet.save()
+        Notification.objects.create(sender=self.user, receiver=self.user, content="for me")
+        Notification.objects.create(sender=self.user, receiver=make_user("other"), content="not for me")
+        gone = Pet.objects.create(name="Max", pet_type=self.dog)
+        gone.delete()
+
+        page = self.changes(cursor)
+        self.assertEqual(
+            [(change["type"], change["op"], (change.get("data") or {}).get("name")) for change in page["changes"]],
+            [("pet", "upsert", "Rex II"), ("notification", "upsert", None), ("pet", "delete", None)],
+        )
+        self.assertFalse(page["has_more"])
+        self.assertEqual(self.changes(page["cursor"])["changes"], [])
+
+    def test_pages_and_held_back_entries(self):
+        cursor = self.client.get("/api/changes/").json()["cursor"]
+        for name in ("Rex", "Max", "Tom"):
+            Pet.objects.create(name=name, pet_type=self.dog)
+        page = self.changes(cursor, limit=2)
+        self.assertEqual((len(page["changes"]), page["has_more"]), (2, True))
+        page = self.changes(page["cursor"], limit=2)
+        self.assertEqual((len(page["changes"]), page["has_more"]), (1, False))
+
+        with override_settings(CHANGE_FEED_SETTLE_SECONDS=60):
+            Pet.objects.create(name="Fresh", pet_type=self.dog)
+            self.assertEqual(self.changes(page["cursor"])["changes"], [])
+        self.assertEqual(self.client.get("/api/changes/", {"since": "x"}).status_code, 400)
+
+    def test_compaction_and_expired_cursors(self):
+        cursor = self.client.get("/api/changes/").json()["cursor"]
+        pet = Pet.objects.create(name="Rex", pet_type=self.dog)
+        for _ in range(3):
+            pet.save()
+        call_command("compact_change_log", stdout=StringIO())
+        self.assertEqual(ChangeLogEntry.objects.filter(model="pet", object_id=pet.id).count(), 1)
+        self.assertEqual(len(self.changes(cursor)["changes"]), 1)
+
+        ChangeLogEntry.objects.update(created_at=timezone.now() - timedelta(days=31))
+        Pet.objects.create(name="Max", pet_type=self.dog)
+        call_command("compact_change_log", stdout=StringIO())
+        response = self.client.get("/api/changes/", {"since": cursor})
+        self.assertEqual(response.status_code, 410)
+        self.assertTrue(response.json()["resync"])
+        self.assertEqual([change["data"]["name"] for change in self.changes(response.json()["cursor"] - 1)["changes"]],
+                         ["Max"])
+
+
+# -------------------------
+# Notification fan-out (fanout.py)
+# -------------------------
+class FanoutTests(TestCase):
+    def setUp(self):
+        app_cache.clear_local()
+        self.admin = make_admin()
+        self.nearby = [make_user(f"near{i}", pincode=560001 + i) for i in range(5)]
+        make_user("far", pincode=110001)
+        patcher = mock.patch.object(fanout, "connection")  # run_job closes its pool thread's connection
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def received(self):
+        return list(Notification.objects.filter(sender=self.admin).order_by("receiver_id")
+                    .values_list("receiver__username", "content"))
+
+    def test_job_is_queued_after_commit_and_delivered_in_chunks(self):
+        client = client_for(self.admin)
+        payload = {"audience": "area", "params": {"pincode_prefix": "5600"}, "template": "Hi {username}"}
+        with mock.patch.object(fanout, "submit") as submit, self.captureOnCommitCallbacks(execute=True):
+            response = client.post("/api/admin/fanout/", payload, format="json")
+        self.assertEqual(response.status_code, 202, response.content)
+        job_id = response.json()["id"]
+        submit.assert_called_once_with("fanout", fanout.run_job, job_id)
+
+        job = fanout.run_job(job_id, chunk_size=2)
+        self.assertEqual((job.status, job.total, job.sent), ("done", 5, 5))
+        self.assertEqual(job.last_recipient_id, self.nearby[-1].id)
+        self.assertEqual(self.received(), [(user.username, f"Hi {user.username}") for user in self.nearby])
+        # A finished job is not claimed again
+        fanout.run_job(job_id)
+        self.assertEqual(len(self.received()), 5)
+
+    def test_invalid_requests_are_rejected(self):
+        client = client_for(self.admin)
+        for payload in (
+            {"audience": "area", "params": {"pincode_prefix": "56x"}, "template": "Hi"},
+            {"audience": "everyone", "template": "Hi"},
+            {"audience": "all_users", "template": "Hi {email}"},
+        ):
+            response = client.post("/api/admin/fanout/", payload, format="json")
+            self.assertEqual(response.status_code, 400, payload)
+        response = client_for(self.nearby[0]).post(
+            "/api/admin/fanout/", {"audience": "all_users", "template": "Hi"}, format="json")
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(FanoutJob.objects.exists())
+
+    def test_stalled_job_resumes_after_last_recipient(self):
+        stalled = FanoutJob.objects.create(audience="area", params={"pincode_prefix": "5600"}, template="Hi {username}",
+                                           created_by=self.admin, status="running", total=5, sent=2,
+                                           last_recipient_id=self.nearby[1].id)
+        busy = FanoutJob.objects.create(audience="all_users", template="Hi", created_by=self.admin, status="running")
+        FanoutJob.objects.filter(pk=stalled.pk).update(modified_date=timezone.now() - timedelta(minutes=30))
+
+        call_command("run_fanout_jobs", stdout=StringIO())
+        stalled.refresh_from_db()
+        busy.refresh_from_db()
+        self.assertEqual((stalled.status, stalled.sent), ("done", 5))
+        self.assertEqual([username for username, _ in self.received()], [user.username for user in self.nearby[2:]])
+        self.assertEqual((busy.status, busy.sent), ("running", 0))
+
+
+# -------------------------
+# Notification coalescing and archive (notifications.py)
+# -------------------------
+class NotificationCoalescingTests(TestCase):
+    def setUp(self):
+        app_cache.clear_local()
+        self.admin = make_admin()
+        self.user = make_user()
+        pet = Pet.objects.create(name="Rex", pet_type=PetType.objects.create(type="Dog"))
+        self.report = PetReport.objects.create(pet=pet, user=self.user, pet_status="Lost", report_status="Pending")
+
+    def test_updates_about_a_report_fold_into_one_unread_notification(self):
+        first = notify(self.admin, self.user, "Accepted", report=self.report)
+        for content in ("Resolved", "Reunited"):
+            latest = notify(self.admin, self.user, content, report=self.report)
+        self.assertEqual(latest.pk, first.pk)
+        self.assertEqual((latest.content, latest.coalesced), ("Reunited", 2))
+        self.assertEqual(Notification.objects.count(), 1)
+
+        # Read, unrelated or stale notifications are left alone
+        Notification.objects.update(is_read=True)
+        notify(self.admin, self.user, "Closed", report=self.report)
+        notify(self.admin, self.user, "Hello")
+        self.assertEqual(Notification.objects.count(), 3)
+        Notification.objects.update(created_at=timezone.now() - timedelta(hours=2))
+        with override_settings(NOTIFICATION_COALESCE_MINUTES=60):
+            notify(self.admin, self.user, "Reopened", report=self.report)
+        self.assertEqual(Notification.objects.count(), 4)
+
+    def test_purge_archives_old_read_notifications_in_batches(self):
+        old = timezone.now() - timedelta(days=100)
+        for index in range(3):
+            Notification.objects.create(sender=self.admin, receiver=self.user, content=f"old {index}", is_read=True)
+        unread = Notification.objects.create(sender=self.admin, receiver=self.user, content="unread")
+        recent = Notification.objects.create(sender=self.admin, receiver=self.user, content="recent", is_read=True)
+        Notification.objects.exclude(pk=recent.pk).update(created_at=old)
+
+        out = StringIO()
+        call_command("purge_notifications", "--batch-size", "2", "--days", "90", stdout=out)
+        self.assertIn("Archived 3", out.getvalue())
+        self.assertEqual(sorted(NotificationArchive.objects.values_list("content", flat=True)), ["old 0", "old 1", "old 2"])
+        self.assertEqual(set(Notification.objects.values_list("pk", flat=True)), {unread.pk, recent.pk})
+        self.assertEqual(NotificationArchive.objects.get(content="old 0").receiver_id, self.user.id)
+
+
+# -------------------------
+# Identity map (identity.py)
+# -------------------------
+class IdentityMapTests(TestCase):
+    def setUp(self):
+        app_cache.clear_local()
+        self.user = make_user()
+        pet_type = PetType.objects.create(type="Dog")
+        for index in range(3):
+            pet = Pet.objects.create(name=f"Rex {index}", pet_type=pet_type)
+            PetReport.objects.create(pet=pet, user=self.user, pet_status="Lost", report_status="Pending")
+
+    def load_owners(self, request=None):
+        with CaptureQueriesContext(connection) as queries:
+            owners = {report.user.username for report in PetReport.objects.all()}
+        self.assertEqual(owners, {"user"})
+        self.queries = len(queries)
+        return HttpResponse()
+
+    def test_foreign_keys_share_one_instance_per_request(self):
+        self.load_owners()
+        self.assertEqual(self.queries, 4)  # outside a request every report loads its user
+
+        with override_settings(IDENTITY_MAP_HEADERS=True):
+            response = identity.IdentityMapMiddleware(self.load_owners)(RequestFactory().get("/"))
+        self.assertEqual(self.queries, 2)
+        self.assertEqual(response[identity.SAVED_QUERIES_HEADER], "2")
+        self.assertIsNone(identity.current())
+
+    def test_get_saves_and_deletes_keep_the_map_current(self):
+        def view(request):
+            first = identity.get(Profile, self.user.pk)
+            with self.assertNumQueries(0):
+                self.assertIs(identity.get(Profile, self.user.pk), first)
+            Profile.objects.get(pk=self.user.pk).save()
+            self.assertIsNot(identity.get(Profile, self.user.pk), first)
+            pet = identity.get(Pet, Pet.objects.first().pk)
+            pet.delete()
+            with self.assertRaises(Pet.DoesNotExist):
+                identity.get(Pet, pet.pk)
+            return HttpResponse()
+
+        identity.IdentityMapMiddleware(view)(RequestFactory().get("/"))
+
+    @override_settings(IDENTITY_MAP_HEADERS=True)
+    def test_profile_details_reuses_the_authenticated_user(self):
+        response = client_for(self.user).get("/api/profiles/profile_details/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json_body(response)["username"], "user")
+        self.assertEqual(response[identity.SAVED_QUERIES_HEADER], "1")
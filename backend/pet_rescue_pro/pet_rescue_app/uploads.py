@@ -0,0 +1,197 @@
+# pet_rescue_app/uploads.py
+"""
+Resumable chunked uploads.
+
+A client opens a session (filename, total size, sha256), PUTs the bytes in
+order with Content-Range headers, and finishes with a complete call. The
+server verifies the checksum and returns an upload token. The client can
+resume at any time by asking for the session's received_bytes. Report,
+profile and feedback endpoints accept upload_token in place of a file.
+"""
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+from rest_framework import serializers
+from rest_framework.parsers import BaseParser
+
+from .models import ChunkedUpload
+
+CHUNKED_UPLOAD_DIR = getattr(settings, "CHUNKED_UPLOAD_DIR", os.path.join(settings.BASE_DIR, "chunked_uploads"))
+CHUNKED_UPLOAD_MAX_SIZE = getattr(settings, "CHUNKED_UPLOAD_MAX_SIZE", 20 * 1024 * 1024)
+CHUNKED_UPLOAD_MAX_CHUNK = getattr(settings, "CHUNKED_UPLOAD_MAX_CHUNK", 2 * 1024 * 1024)
+CHUNKED_UPLOAD_TTL = timedelta(hours=getattr(settings, "CHUNKED_UPLOAD_TTL_HOURS", 24))
+
+
+class ChunkParser(BaseParser):
+    """Raw request body as bytes, for PUT chunk requests."""
+    media_type = "application/octet-stream"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return stream.read(CHUNKED_UPLOAD_MAX_CHUNK + 1) if stream else b""
+
+
+class UploadError(Exception):
+    def __init__(self, message, received_bytes=None):
+        self.message = message
+        self.received_bytes = received_bytes
+        super().__init__(message)
+
+
+def part_path(upload):
+    return os.path.join(CHUNKED_UPLOAD_DIR, f"{upload.token}.part")
+
+
+def start_upload(user, filename, total_size, checksum):
+    if total_size <= 0 or total_size > CHUNKED_UPLOAD_MAX_SIZE:
+        raise UploadError(f"total_size must be between 1 and {CHUNKED_UPLOAD_MAX_SIZE} bytes")
+    if len(checksum) != 64:
+        raise UploadError("checksum must be a sha256 hex digest")
+
+    os.makedirs(CHUNKED_UPLOAD_DIR, exist_ok=True)
+    upload = ChunkedUpload.objects.create(
+        user=user,
+        filename=os.path.basename(filename)[:255],
+        total_size=total_size,
+        checksum=checksum.lower(),
+    )
+    open(part_path(upload), "wb").close()
+    return upload
+
+
+def parse_content_range(header):
+    """'bytes 0-1048575/6291456' -> (start, end_inclusive, total)."""
+    try:
+        unit, spec = header.split(" ", 1)
+        span, total = spec.split("/", 1)
+        start, end = span.split("-", 1)
+        if unit != "bytes":
+            raise ValueError
+        return int(start), int(end), int(total)
+    except (AttributeError, ValueError):
+        raise UploadError("Content-Range header must look like 'bytes <start>-<end>/<total>'")
+
+
+def append_chunk(user, token, content_range, chunk):
+    """
+    Append one chunk. Chunks must arrive in order; a chunk that does not start
+    at received_bytes is rejected with the current offset so the client can resume.
+    A re-sent chunk that was already stored is acknowledged without writing.
+    """
+    start, end, total = parse_content_range(content_range)
+    if len(chunk) > CHUNKED_UPLOAD_MAX_CHUNK:
+        raise UploadError(f"Chunks may be at most {CHUNKED_UPLOAD_MAX_CHUNK} bytes")
+    if end - start + 1 != len(chunk):
+        raise UploadError("Content-Range does not match the chunk length")
+
+    with transaction.atomic():
+        upload = ChunkedUpload.objects.select_for_update().get(token=token, user=user)
+        if upload.status != "uploading":
+            raise UploadError("Upload is already complete", upload.received_bytes)
+        if total != upload.total_size or end >= upload.total_size:
+            raise UploadError("Content-Range total does not match the upload size", upload.received_bytes)
+        if end < upload.received_bytes:
+            return upload  # duplicate of a chunk we already have
+        if start != upload.received_bytes:
+            raise UploadError("Chunk does not start at the next expected byte", upload.received_bytes)
+
+        with open(part_path(upload), "ab") as fh:
+            fh.write(chunk)
+        upload.received_bytes = end + 1
+        upload.save(update_fields=["received_bytes"])
+    return upload
+
+
+def complete_upload(user, token):
+    """Verify size, checksum and that the bytes are an image; mark the upload complete."""
+    with transaction.atomic():
+        upload = ChunkedUpload.objects.select_for_update().get(token=token, user=user)
+        if upload.status != "uploading":
+            return upload
+        if upload.received_bytes != upload.total_size:
+            raise UploadError("Upload is not finished yet", upload.received_bytes)
+
+        digest = hashlib.sha256()
+        with open(part_path(upload), "rb") as fh:
+            for block in iter(lambda: fh.read(1024 * 1024), b""):
+                digest.update(block)
+        if digest.hexdigest() != upload.checksum:
+            raise UploadError("Checksum mismatch; restart the upload")
+
+        try:
+            with Image.open(part_path(upload)) as image:
+                image.verify()
+        except Exception:
+            raise UploadError("Uploaded file is not a valid image")
+
+        upload.status = "complete"
+        upload.completed_at = timezone.now()
+        upload.save(update_fields=["status", "completed_at"])
+    return upload
+
+
+def claim_upload(user, token):
+    """
+    Consume a completed upload and return it as a Django File ready to be
+    assigned to an ImageField; use it as a context manager so it is closed
+    after saving, whether or not the save succeeds. Call it in
+    the same transaction that saves the model: the claim rolls back with it,
+    and the part file is deleted only once that transaction commits.
+    Raises serializers.ValidationError for unknown/unfinished tokens.
+    """
+    with transaction.atomic():
+        try:
+            upload = ChunkedUpload.objects.select_for_update().get(token=token, user=user)
+        except (ChunkedUpload.DoesNotExist, ValidationError):
+            raise serializers.ValidationError({"upload_token": ["Unknown upload token."]})
+        if upload.status != "complete":
+            raise serializers.ValidationError({"upload_token": [f"Upload is {upload.status}, not complete."]})
+
+        ChunkedUpload.objects.filter(pk=upload.pk).update(status="consumed")
+        path = part_path(upload)
+        fh = open(path, "rb")
+        transaction.on_commit(lambda: _remove_part(path))
+    return File(fh, name=upload.filename)
+
+
+def _remove_part(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass  # already gone, or still open on Windows; purge_stale retries later
+
+
+def purge_stale(batch_size=500):
+    """Remove upload sessions older than CHUNKED_UPLOAD_TTL together with their part files."""
+    cutoff = timezone.now() - CHUNKED_UPLOAD_TTL
+    removed = 0
+    while True:
+        uploads = list(
+            ChunkedUpload.objects
+            .filter(created_at__lt=cutoff)
+            .only("id", "token")[:batch_size]
+        )
+        if not uploads:
+            return removed
+        for upload in uploads:
+            _remove_part(part_path(upload))
+        removed += ChunkedUpload.objects.filter(id__in=[u.id for u in uploads]).delete()[0]
+
+
+def save_with_upload(serializer, request, field, **kwargs):
+    """
+    serializer.save(**kwargs), filling `field` from a completed chunked upload
+    when the request carries upload_token instead of a file.
+    """
+    token = request.data.get("upload_token")
+    if not token:
+        return serializer.save(**kwargs)
+
+    with transaction.atomic(), claim_upload(request.user, token) as upload:
+        return serializer.save(**kwargs, **{field: upload})
@@ -8,14 +8,17 @@ from .views import (
     AdminLostPetRequestsAPIView, AdminManageReportStatusAPIView, VerifyRegisterAPIView,
     PasswordResetRequestAPIView, PasswordResetConfirmAPIView,AdminFoundPetRequestsAPIView,AdminChangePasswordView,
     FoundPetRequestAPIView, UserLostPetsAPIView, UserFoundPetsAPIView, AdoptionPetsView,UserPetAdoptionsAPIView, AdoptablePetsAPIView,
-    RecentPetsAPIView, MyRewardView, AllRewardsView, FeedbackStoryAPIView, UserReportViewSet
+    RecentPetsAPIView, MyRewardView, AllRewardsView, FeedbackStoryAPIView, UserReportViewSet,
+    ResendVerificationOTPAPIView, AdminCacheStatsAPIView,
+    AdminUserExportView, AdminPetReportExportView, AdminAdoptionExportView, AdminRewardExportView,
+    AdminNotificationExportView, PetBulkImportAPIView,
+    ChunkedUploadStartAPIView, ChunkedUploadDetailAPIView, ChunkedUploadCompleteAPIView,
+    ChangeFeedAPIView, SavedSearchViewSet, AdminFanoutAPIView, AdminFanoutDetailAPIView
 )
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
-from django.conf import settings
-from django.conf.urls.static import static
 from .views import AdminNotificationsAPIView
 from . import views
 
@@ -30,6 +33,7 @@ router.register(r"pet-reports", PetReportViewSet, basename="petreport")
 router.register(r"pet-adoptions", PetAdoptionViewSet, basename="petadoption")
 router.register(r"notifications", NotificationViewSet, basename="notification")
 router.register(r"user-reports", UserReportViewSet, basename="userreport")
+router.register(r"saved-searches", SavedSearchViewSet, basename="savedsearch")
 
 # URL patterns for registration, login, JWT
 urlpatterns = [
@@ -39,6 +43,10 @@ urlpatterns = [
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("profile_details/", ProfileViewSet.as_view({"get": "profile_details"}), name="profile-details"),
     path("lost-pet-request/", LostPetRequestAPIView.as_view(), name="lost-pet-request"),
+    path("pets/bulk-import/", PetBulkImportAPIView.as_view(), name="pet-bulk-import"),
+    path("uploads/", ChunkedUploadStartAPIView.as_view(), name="chunked-upload-start"),
+    path("uploads/<uuid:token>/", ChunkedUploadDetailAPIView.as_view(), name="chunked-upload-detail"),
+    path("uploads/<uuid:token>/complete/", ChunkedUploadCompleteAPIView.as_view(), name="chunked-upload-complete"),
     path("admin/notifications/", AdminNotificationsAPIView.as_view(), name="admin-notifications"),
     path("pets-list/", PetsListAPIView.as_view(), name="pets-list"),
     path("admin/approve/", AdminApprovalAPIView.as_view(), name="admin-approve"),
@@ -49,9 +57,11 @@ urlpatterns = [
     path("admin/reports/", AdminPetReportsAPIView.as_view(), name="admin-reports"),
     path("admin/reports/<int:report_id>/", AdminPetReportDetailAPIView.as_view(), name="admin-report-detail"),
     path('admin/notifications/unread-count/', AdminUnreadNotificationCountAPIView.as_view(), name='admin-unread-count'),
+    path("admin/cache-stats/", AdminCacheStatsAPIView.as_view(), name="admin-cache-stats"),
     path("admin/lost-pet-requests/", AdminLostPetRequestsAPIView.as_view(), name="admin-lost-pet-requests"),
     path("admin/manage-report/<int:report_id>/", AdminManageReportStatusAPIView.as_view(), name="admin-manage-report"),
     path("verify-register/", VerifyRegisterAPIView.as_view(), name="verify-register"),
+    path("resend-otp/", ResendVerificationOTPAPIView.as_view(), name="resend-otp"),
     path("password-reset-request/", PasswordResetRequestAPIView.as_view(), name="password-reset-request"),
     path("password-reset-confirm/", PasswordResetConfirmAPIView.as_view(), name="password-reset-confirm"),
     path("admin/found-pet-requests/", AdminFoundPetRequestsAPIView.as_view(), name="admin-found-pet-requests"),
@@ -69,11 +79,15 @@ urlpatterns = [
     path("my-rewards/", MyRewardView.as_view(), name="my-rewards"),
     path("all-rewards/", AllRewardsView.as_view(), name="all-rewards"),
     path("feedback-stories/", FeedbackStoryAPIView.as_view(), name="feedback-list-create"),
+    path("changes/", ChangeFeedAPIView.as_view(), name="changes"),
+    path("admin/export/users/", AdminUserExportView.as_view(), name="admin-export-users"),
+    path("admin/export/reports/", AdminPetReportExportView.as_view(), name="admin-export-reports"),
+    path("admin/export/adoptions/", AdminAdoptionExportView.as_view(), name="admin-export-adoptions"),
+    path("admin/export/rewards/", AdminRewardExportView.as_view(), name="admin-export-rewards"),
+    path("admin/export/notifications/", AdminNotificationExportView.as_view(), name="admin-export-notifications"),
+    path("admin/fanout/", AdminFanoutAPIView.as_view(), name="admin-fanout"),
+    path("admin/fanout/<int:job_id>/", AdminFanoutDetailAPIView.as_view(), name="admin-fanout-detail"),
 ]
 
 # Include all router URLs
 urlpatterns += router.urls
-
-# Serve media files in development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
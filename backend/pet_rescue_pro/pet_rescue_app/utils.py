@@ -30,38 +30,30 @@
 #         return True
 #     return False
 
-import random
-from django.core.cache import cache
 from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
 
+from .otp import PURPOSE_VERIFICATION, issue_otp, verify_and_consume
 
-def generate_otp(email: str) -> str:
-    """Generate a 6-digit OTP and store it in cache (valid for 10 minutes)."""
-    otp = str(random.randint(100000, 999999))
-    cache.set(f"otp_{email}", otp, timeout=600)  # 10 minutes
-    return otp
+
+def generate_otp(email: str, purpose: str = PURPOSE_VERIFICATION) -> str:
+    """Generate a 6-digit OTP and store it in the shared OTP table (valid for 10 minutes)."""
+    return issue_otp(email, purpose)
 
 
-def verify_otp(email: str, submitted_otp: str) -> bool:
-    """Check if submitted OTP matches stored OTP in cache."""
-    stored_otp = cache.get(f"otp_{email}")
-    if stored_otp and stored_otp == submitted_otp:
-        cache.delete(f"otp_{email}")  # remove once used
-        return True
-    return False
+def verify_otp(email: str, submitted_otp: str, purpose: str = PURPOSE_VERIFICATION) -> bool:
+    """Check the submitted OTP against the OTP table and consume it on success."""
+    return verify_and_consume(email, purpose, submitted_otp)
 
 
 def send_otp_email(email: str, purpose: str = "verification", otp: str = None) -> str:
     """
     Send OTP email with professional HTML body and plain text fallback.
-    If otp is provided, use it; otherwise generate a new OTP.
+    If otp is provided (already issued through pet_rescue_app.otp), use it;
+    otherwise issue a new account verification OTP.
     """
     if otp is None:
         otp = generate_otp(email)
-    else:
-        # Store the provided OTP in cache for verification if needed
-        cache.set(f"otp_{email}", otp, timeout=600)
 
     subject = f"{purpose.capitalize()} OTP – Pet Rescue Team"
 
@@ -0,0 +1,182 @@
+# pet_rescue_app/vaccinations.py
+"""
+Vaccination reminders.
+
+A vaccination is due VACCINATION_INTERVAL_DAYS after
+PetMedicalHistory.last_vaccinated_date. send_due_reminders() looks at
+vaccinations due within the next VACCINATION_REMINDER_WINDOW_DAYS, or
+overdue by up to VACCINATION_OVERDUE_GRACE_DAYS (to catch missed runs).
+That is one date range on the (last_vaccinated_date, id) index. It walks
+the range with a keyset scan, chunk by chunk, and each chunk does a fixed
+number of queries:
+
+    medical rows     the next chunk_size rows after the last (date, id),
+                     skipping pets vaccinated again since
+    cycles done      reminders already sent for these pets and due dates
+    owners           approved adopter, else latest reporter, else creator
+    contacts         owners' username and email
+    writes           VaccinationReminder rows first, then Notification,
+                     QueuedEmail and change log rows for the cycles this
+                     run inserted, in one transaction per chunk
+
+Memory is one chunk whatever the table size. The unique (pet, due_date)
+constraint on VaccinationReminder makes a cycle's reminder idempotent:
+rerunning the job, resuming one that died, or two runs at once never
+remind twice. Each chunk tags its reminder rows with a run id and reads
+back which of them it inserted, since a concurrent run may have taken
+some of the cycles.
+"""
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .caching import app_cache
+from .changefeed import record
+from .models import (
+    Notification, PetAdoption, PetMedicalHistory, PetReport, Profile, QueuedEmail, VaccinationReminder,
+)
+from .signals import UNREAD_COUNT_NAMESPACE
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def due_rows(today):
+    """Medical history rows whose next vaccination falls in the reminder window, latest per pet only."""
+    interval = timedelta(days=_setting("VACCINATION_INTERVAL_DAYS", 365))
+    earliest = today - timedelta(days=_setting("VACCINATION_OVERDUE_GRACE_DAYS", 30)) - interval
+    latest = today + timedelta(days=_setting("VACCINATION_REMINDER_WINDOW_DAYS", 14)) - interval
+    revaccinated = PetMedicalHistory.objects.filter(
+        pet_id=OuterRef("pet_id"), last_vaccinated_date__gt=OuterRef("last_vaccinated_date")
+    )
+    return (
+        PetMedicalHistory.objects.filter(last_vaccinated_date__range=(earliest, latest))
+        .exclude(Exists(revaccinated))
+        .order_by("last_vaccinated_date", "id")
+    ), interval
+
+
+def _owners(pet_rows):
+    """pet_id -> profile id to remind: approved adopter, else latest reporter, else whoever added the pet."""
+    pet_ids = list(pet_rows)
+    owners = dict(
+        PetAdoption.objects.filter(pet_id__in=pet_ids, status="Approved").values_list("pet_id", "requestor_id")
+    )
+    missing = [pet_id for pet_id in pet_ids if pet_id not in owners]
+    if missing:
+        for pet_id, user_id in (
+            PetReport.objects.filter(pet_id__in=missing).order_by("pet_id", "-created_date").values_list("pet_id", "user_id")
+        ):
+            owners.setdefault(pet_id, user_id)
+    for pet_id, row in pet_rows.items():
+        if owners.get(pet_id) is None and row["pet__created_by_id"]:
+            owners[pet_id] = row["pet__created_by_id"]
+    return owners
+
+
+def send_due_reminders(today=None, chunk_size=DEFAULT_CHUNK_SIZE, email=True):
+    """Remind the owners of pets whose vaccination is due. Returns counters."""
+    today = today or timezone.localdate()
+    rows, interval = due_rows(today)
+    sender_id = Profile.objects.filter(is_superuser=True).order_by("id").values_list("id", flat=True).first()
+    stats = {"scanned": 0, "reminded": 0, "already_reminded": 0, "no_owner": 0, "emails": 0, "chunks": 0}
+    started = time.perf_counter()
+
+    after = None
+    while True:
+        chunk = rows
+        if after is not None:
+            chunk = chunk.filter(
+                Q(last_vaccinated_date__gt=after[0]) | Q(last_vaccinated_date=after[0], id__gt=after[1])
+            )
+        chunk = list(chunk.values(
+            "id", "pet_id", "last_vaccinated_date", "vaccination_name", "pet__name", "pet__created_by_id",
+        )[:chunk_size])
+        if not chunk:
+            break
+        after = (chunk[-1]["last_vaccinated_date"], chunk[-1]["id"])
+        stats["chunks"] += 1
+        stats["scanned"] += len(chunk)
+        _remind_chunk(chunk, today, interval, sender_id, email, stats)
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+def _remind_chunk(chunk, today, interval, sender_id, email, stats):
+    pet_rows = {}
+    for row in chunk:
+        pet_rows.setdefault(row["pet_id"], row)  # two rows with the same date: one reminder
+    due = {pet_id: row["last_vaccinated_date"] + interval for pet_id, row in pet_rows.items()}
+
+    done = set(
+        VaccinationReminder.objects.filter(pet_id__in=list(due), due_date__in=set(due.values()))
+        .values_list("pet_id", "due_date")
+    )
+    pending = {pet_id: row for pet_id, row in pet_rows.items() if (pet_id, due[pet_id]) not in done}
+    stats["already_reminded"] += len(pet_rows) - len(pending)
+    if not pending:
+        return
+
+    owners = _owners(pending)
+    contacts = {
+        user_id: (username, address)
+        for user_id, username, address in Profile.objects.filter(id__in=set(owners.values()), is_active=True)
+        .values_list("id", "username", "email")
+    }
+
+    run = uuid.uuid4()
+    reminders = [
+        VaccinationReminder(
+            pet_id=pet_id, due_date=due[pet_id], vaccination_name=row["vaccination_name"], run=run,
+            receiver_id=owners.get(pet_id) if owners.get(pet_id) in contacts else None,
+        )
+        for pet_id, row in pending.items()
+    ]
+
+    with transaction.atomic():
+        # ignore_conflicts: a concurrent run may have just claimed some of these cycles; those are its to send
+        VaccinationReminder.objects.bulk_create(reminders, ignore_conflicts=True)
+        claimed = set(
+            VaccinationReminder.objects.filter(pet_id__in=list(pending), run=run).values_list("pet_id", flat=True)
+        )
+        stats["already_reminded"] += len(pending) - len(claimed)
+
+        notifications, emails = [], []
+        for pet_id in claimed:
+            row = pending[pet_id]
+            owner_id = owners.get(pet_id)
+            if owner_id not in contacts:
+                stats["no_owner"] += 1
+                continue
+            due_date = due[pet_id]
+            vaccination = row["vaccination_name"] or "vaccination"
+            when = "was due" if due_date < today else "is due"
+            content = f"{row['pet__name']}'s {vaccination} {when} on {due_date:%d %b %Y}."
+            notifications.append(Notification(
+                sender_id=sender_id or owner_id, receiver_id=owner_id, content=content, pet_id=pet_id,
+            ))
+            username, address = contacts[owner_id]
+            if email and address:
+                emails.append(QueuedEmail(
+                    to_email=address,
+                    subject=f"Vaccination reminder for {row['pet__name']}",
+                    body=f"Hello {username},\n\n{content}\n\nThank you,\nThe Pet Rescue Team",
+                ))
+
+        notifications = Notification.objects.bulk_create(notifications)
+        QueuedEmail.objects.bulk_create(emails)
+        # bulk_create() skips the signals that feed the change log and drop the cached unread counts
+        record(notifications)
+        receivers = [notification.receiver_id for notification in notifications]
+        transaction.on_commit(lambda: app_cache.delete_many(UNREAD_COUNT_NAMESPACE, receivers))
+    stats["reminded"] += len(notifications)
+    stats["emails"] += len(emails)
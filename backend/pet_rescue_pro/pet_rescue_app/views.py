@@ -5,7 +5,8 @@ from rest_framework.views import APIView
 from django.contrib.auth.hashers import make_password, check_password
 from .models import (
     Profile, Pet, PetType,
-    PetMedicalHistory, PetReport, PetAdoption, Notification, RewardPoint, FeedbackStory, UserReport
+    PetMedicalHistory, PetReport, PetAdoption, Notification, RewardPoint, FeedbackStory, UserReport,
+    ChunkedUpload, SavedSearch, FanoutJob
 )
 from .serializers import (
     ProfileSerializer, PetTypeSerializer, PetSerializer,
@@ -13,28 +14,54 @@ from .serializers import (
     PetAdoptionSerializer, NotificationSerializer, LoginSerializer, LostPetRequestSerializer, AdminNotificationSerializer,
       PetReportListSerializer, PetAdoptionListSerializer, AdminApprovalSerializer, UserPetReportSerializer,
         UserAdoptionRequestSerializer, AdminUserSerializer,AdminPetReportSerializer, PasswordResetRequestSerializer, PasswordResetConfirmSerializer,
-        RegisterSerializer, VerifyRegisterSerializer,UserAdoptionDetailSerializer, RewardPointSerializer, FeedbackStorySerializer, UserReportCreateSerializer,UserReportSerializer
+        RegisterSerializer, VerifyRegisterSerializer,UserAdoptionDetailSerializer, RewardPointSerializer, FeedbackStorySerializer, UserReportCreateSerializer,UserReportSerializer,
+        ChunkedUploadSerializer, SavedSearchSerializer, FanoutRequestSerializer, FanoutJobSerializer
 )
 from .utils import send_otp_email, verify_otp
+from .otp import PURPOSE_VERIFICATION, PURPOSE_PASSWORD_RESET, OTPCooldownError, issue_otp, normalize_email
 
-from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import IsAuthenticated, IsAdminUser 
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.decorators import action
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework.exceptions import APIException, PermissionDenied, ValidationError
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.tokens import UntypedToken
 from django.conf import settings
 import jwt
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import ProtectedError, Q
 from .models import Notification
 import random
 from django.core.mail import send_mail
 from rest_framework.permissions import AllowAny
-from django.core.cache import cache
+from .caching import app_cache
+from .exports import export_response
+from .fast_serializers import (
+    FastListMixin, NotificationFastSerializer, PetAdoptionFastSerializer, PetAdoptionListFastSerializer,
+    PetFastSerializer, PetReportFastSerializer, RewardPointFastSerializer, list_response
+)
+from .fieldsets import SparseFieldsetViewMixin, request_spec, sparse_serializer
+from .bulk_import import PetBulkImporter, parse_rows
+from .pet_types import pet_type_registry
+from .renderers import ORJSONParser
+from .idempotency import get_idempotency_key, remember, replay, request_fingerprint
+from .storage import acquire
+from .uploads import (
+    ChunkParser, UploadError, append_chunk, claim_upload, complete_upload, save_with_upload, start_upload
+)
+from .signals import UNREAD_COUNT_NAMESPACE
+from .integrations import gemini_generate, run_in_pool
+from .adoptions import AdoptionDecisionError, decide
+from .duplicates import DuplicateReportError, check_report
+from .changefeed import DEFAULT_LIMIT, MAX_LIMIT, CursorExpired, head, read_changes
+from .fanout import FanoutError, start as start_fanout
+from .notifications import notify
+from . import identity, rewards
+from .identity import IdentityMapJWTAuthentication
 import os
 import json
-import google.generativeai as genai
+import zipfile
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
@@ -42,10 +69,8 @@ from datetime import timedelta
 
 
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-
 @csrf_exempt
-def chatbot_response(request):
+async def chatbot_response(request):
     if request.method == "POST":
         try:
             data = json.loads(request.body)
@@ -72,9 +97,8 @@ def chatbot_response(request):
             - Keep your answers concise and helpful, like a real assistant inside the project.
             """
 
-            # Call Gemini
-            model = genai.GenerativeModel("gemini-2.5-flash")
-            response = model.generate_content(f"{context}\n\nUser: {user_message}\nAssistant:")
+            # Call Gemini on the bounded chatbot pool; a slow model API never ties up request workers
+            response = await run_in_pool("chatbot", gemini_generate, f"{context}\n\nUser: {user_message}\nAssistant:")
 
             reply = response.text.strip() if response and response.text else "⚠️ No response from Gemini."
 
@@ -89,19 +113,26 @@ def chatbot_response(request):
 # -------------------------
 # PetType ViewSet
 # -------------------------
-class PetTypeViewSet(viewsets.ModelViewSet):
+class PetTypeViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = PetType.objects.all().order_by("id")
     serializer_class = PetTypeSerializer
 
+    def perform_destroy(self, instance):
+        try:
+            instance.delete()
+        except ProtectedError:
+            # SavedSearch.pet_type is PROTECT: merge the type (merge_pet_types) or edit the searches first
+            raise _api_error("This pet type is used by saved searches.", status.HTTP_409_CONFLICT)
+
 
 # -------------------------
 # Profile ViewSet
 # -------------------------
-class ProfileViewSet(viewsets.ModelViewSet):
+class ProfileViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Profile.objects.all().order_by("id")
     serializer_class = ProfileSerializer
-    parser_classes = (MultiPartParser, FormParser, JSONParser)
-    authentication_classes = [JWTAuthentication]
+    parser_classes = (MultiPartParser, FormParser, ORJSONParser)
+    authentication_classes = [IdentityMapJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def perform_create(self, serializer):
@@ -110,7 +141,8 @@ class ProfileViewSet(viewsets.ModelViewSet):
 
     def perform_update(self, serializer):
         user = self.request.user if self.request.user.is_authenticated else None
-        serializer.save(modified_by=user)
+        # profile_image may come from a chunked upload (upload_token) instead of multipart
+        save_with_upload(serializer, self.request, "profile_image", modified_by=user)
 
     # ✅ GET /api/profiles/profile_details/
     @action(detail=False, methods=['get'], url_path='profile_details')
@@ -120,7 +152,8 @@ class ProfileViewSet(viewsets.ModelViewSet):
             return Response({"detail": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
 
         try:
-            profile = Profile.objects.get(email=user.email)
+            # request.user is already in the identity map: no second query for the same row
+            profile = identity.get(Profile, user.pk)
         except Profile.DoesNotExist:
             return Response({"detail": "User not found"}, status=status.HTTP_404_NOT_FOUND)
 
@@ -158,20 +191,11 @@ class ProfileViewSet(viewsets.ModelViewSet):
     def delete_image(self, request):
         user = request.user
 
-        # Try a few ways to resolve the Profile instance depending on your model shape.
-        profile = None
+        # Profile is the user model; the authenticated user is already in the identity map
         try:
-            # If Profile is a separate model with OneToOne/ForeignKey to auth.User, this will work:
-            profile = Profile.objects.get(user=user)
-        except Exception:
-            # If Profile is the user model (has email/username fields), fallback to email/id lookup
-            try:
-                profile = Profile.objects.get(email=user.email)
-            except Profile.DoesNotExist:
-                try:
-                    profile = Profile.objects.get(id=user.id)
-                except Profile.DoesNotExist:
-                    profile = None
+            profile = identity.get(Profile, user.pk)
+        except Profile.DoesNotExist:
+            profile = None
 
         if profile is None:
             return Response(
@@ -209,10 +233,11 @@ class ProfileViewSet(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-class PetViewSet(viewsets.ModelViewSet):
+class PetViewSet(FastListMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Pet.objects.all().order_by("id")
     serializer_class = PetSerializer
-    parser_classes = (MultiPartParser, FormParser,JSONParser)
+    fast_serializer_class = PetFastSerializer
+    parser_classes = (MultiPartParser, FormParser,ORJSONParser)
     permission_classes = [IsAuthenticated]  # ✅ Requires auth
 
     def get_serializer_context(self):
@@ -233,7 +258,7 @@ class PetViewSet(viewsets.ModelViewSet):
 # -------------------------
 # PetMedicalHistory ViewSet
 # -------------------------
-class PetMedicalHistoryViewSet(viewsets.ModelViewSet):
+class PetMedicalHistoryViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = PetMedicalHistory.objects.all().order_by("id")
     serializer_class = PetMedicalHistorySerializer
     permission_classes = [IsAuthenticated]
@@ -246,19 +271,33 @@ class PetMedicalHistoryViewSet(viewsets.ModelViewSet):
 # -------------------------
 # PetReport ViewSet
 # -------------------------
-class PetReportViewSet(viewsets.ModelViewSet):
+def _api_error(message, status_code):
+    """An APIException answering with the given status (for domain errors raised mid-transaction)."""
+    exc = APIException(message)
+    exc.status_code = status_code
+    return exc
+
+
+class PetReportViewSet(FastListMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = PetReport.objects.all().order_by("id")
     serializer_class = PetReportSerializer
-    parser_classes = (MultiPartParser, FormParser,JSONParser)
+    fast_serializer_class = PetReportFastSerializer
+    parser_classes = (MultiPartParser, FormParser,ORJSONParser)
     permission_classes = [IsAuthenticated]
 
+    # image may come from a chunked upload (upload_token) instead of multipart
     def perform_create(self, serializer):
         user = self.request.user if self.request.user.is_authenticated else None
-        serializer.save(created_by=user, modified_by=user)
+        with transaction.atomic():
+            report = save_with_upload(serializer, self.request, "image", created_by=user, modified_by=user)
+            try:
+                check_report(report)
+            except DuplicateReportError as e:
+                raise _api_error(str(e), e.status)
 
     def perform_update(self, serializer):
         user = self.request.user if self.request.user.is_authenticated else None
-        serializer.save(modified_by=user)
+        save_with_upload(serializer, self.request, "image", modified_by=user)
     def update(self, request, *args, **kwargs):
         # Get the report instance that is about to be updated
         report = self.get_object()
@@ -273,8 +312,8 @@ class PetReportViewSet(viewsets.ModelViewSet):
         new_status = response.data.get('report_status')
         if original_status != new_status and request.user.is_superuser:
             
-            # Create a notification for the user who created the report
-            Notification.objects.create(
+            # Notify the user who created the report (merged into a recent unread one)
+            notify(
                 sender=request.user,          # The admin making the change
                 receiver=report.user,         # The user who owns the report
                 content=f"An admin updated the status for your pet '{report.pet.name}' to '{new_status}'.",
@@ -290,9 +329,10 @@ class PetReportViewSet(viewsets.ModelViewSet):
 # -------------------------
 # PetAdoption ViewSet
 # -------------------------
-class PetAdoptionViewSet(viewsets.ModelViewSet):
+class PetAdoptionViewSet(FastListMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = PetAdoption.objects.all().order_by("id")
     serializer_class = PetAdoptionSerializer
+    fast_serializer_class = PetAdoptionFastSerializer
     permission_classes = [IsAuthenticated]
 
     def perform_create(self, serializer):
@@ -323,16 +363,30 @@ class PetAdoptionViewSet(viewsets.ModelViewSet):
 
     def perform_update(self, serializer):
         user = self.request.user if self.request.user.is_authenticated else None
-        serializer.save(modified_by=user)
+        instance = serializer.instance
+        new_status = serializer.validated_data.pop("status", instance.status)
+        if new_status != instance.status and not (user and user.is_superuser):
+            # Requestors may edit their message; only an admin decides, as with admin/approve/
+            raise PermissionDenied("Only admin can approve or reject requests")
+        with transaction.atomic():
+            if new_status != instance.status:
+                # Status changes take the pet's row locks, like the admin approval endpoint
+                try:
+                    decide(instance.pet_id, new_status, user, adoption_id=instance.id)
+                except AdoptionDecisionError as e:
+                    raise _api_error(e.message, e.status)
+                instance.refresh_from_db()
+            serializer.save(modified_by=user)
 
 
 
 # -------------------------
 # Notification ViewSet
 # -------------------------
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(FastListMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Notification.objects.all().order_by("id")
     serializer_class = NotificationSerializer
+    fast_serializer_class = NotificationFastSerializer
     permission_classes = [IsAuthenticated]
 
     def perform_create(self, serializer):
@@ -358,7 +412,7 @@ class RegisterAPIView(APIView):
 
     def post(self, request):
         data = request.data
-        email = data.get("email")
+        email = (data.get("email") or "").strip()
         username = data.get("username")
         password = data.get("password")
         phone = data.get("phone", "")
@@ -366,23 +420,30 @@ class RegisterAPIView(APIView):
         pincode = data.get("pincode", "")
         gender = data.get("gender", "")
 
-        # Check if user already exists
-        if Profile.objects.filter(email=email).exists():
+        # Check if user already exists (OTPs are keyed by the normalized address, so compare without case)
+        if Profile.objects.filter(email__iexact=normalize_email(email)).exists():
             return Response({"error": "User with this email already exists."}, status=400)
 
-        # Generate OTP and create user
-        otp_code = str(random.randint(100000, 999999))
-        Profile.objects.create(
-            username=username,
-            email=email,
-            password=make_password(password),
-            phone=phone,
-            address=address,
-            pincode=pincode,
-            gender=gender,
-            otp=otp_code,
-            is_verified=False,
-        )
+        # Create user; the OTP lives in the shared OTP table, not on the profile row.
+        # One transaction, so a refused OTP leaves no profile without a code behind.
+        try:
+            with transaction.atomic():
+                Profile.objects.create(
+                    username=username,
+                    email=email,
+                    password=make_password(password),
+                    phone=phone,
+                    address=address,
+                    pincode=pincode,
+                    gender=gender,
+                    is_verified=False,
+                )
+                otp_code = issue_otp(email, PURPOSE_VERIFICATION)
+        except OTPCooldownError as e:
+            return Response(
+                {"error": f"Please wait {e.retry_after} seconds before requesting a new OTP."},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+            )
 
         # Send professional HTML OTP email with same OTP
         send_otp_email(email, purpose="account verification", otp=otp_code)
@@ -398,20 +459,38 @@ class VerifyRegisterAPIView(APIView):
         email = data.get("email")
         code = data.get("code")
 
-        try:
-            user = Profile.objects.get(email=email)
-        except Profile.DoesNotExist:
+        if not Profile.objects.filter(email=email).exists():
             return Response({"error": "User not found."}, status=400)
 
-        if user.otp == code:
-            user.is_verified = True
-            user.otp = ""
-            user.save()
+        if verify_otp(email, code, purpose=PURPOSE_VERIFICATION):
+            # Single UPDATE instead of load + full-row save
+            Profile.objects.filter(email=email, is_verified=False).update(is_verified=True)
             return Response({"message": "Account verified successfully!"}, status=200)
 
         return Response({"error": "Invalid OTP."}, status=400)
 
 
+class ResendVerificationOTPAPIView(APIView):
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        email = request.data.get("email")
+
+        if not Profile.objects.filter(email=email, is_verified=False).exists():
+            return Response({"error": "No unverified account with this email."}, status=400)
+
+        try:
+            otp_code = issue_otp(email, PURPOSE_VERIFICATION)
+        except OTPCooldownError as e:
+            return Response(
+                {"error": f"Please wait {e.retry_after} seconds before requesting a new OTP."},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+            )
+
+        send_otp_email(email, purpose="account verification", otp=otp_code)
+        return Response({"message": "OTP sent!"}, status=200)
+
+
 # ---------------- Login ----------------
 class LoginAPIView(APIView):
     permission_classes = [AllowAny]  # keep open for all
@@ -469,11 +548,14 @@ class PasswordResetRequestAPIView(APIView):
             if not Profile.objects.filter(email=email).exists():
                 return Response({"error": "No user with this email."}, status=400)
 
-            # Generate OTP
-            otp_code = str(random.randint(100000, 999999))
-
-            # Optionally, store OTP in cache (for verification later)
-            cache.set(f"otp_{email}", otp_code, timeout=600)  # 10 minutes
+            # Generate OTP (stored in the shared OTP table, subject to resend cooldown)
+            try:
+                otp_code = issue_otp(email, PURPOSE_PASSWORD_RESET)
+            except OTPCooldownError as e:
+                return Response(
+                    {"error": f"Please wait {e.retry_after} seconds before requesting a new OTP."},
+                    status=status.HTTP_429_TOO_MANY_REQUESTS,
+                )
 
             # Send professional HTML OTP email with the same OTP
             send_otp_email(email, purpose="password reset", otp=otp_code)
@@ -493,7 +575,7 @@ class PasswordResetConfirmAPIView(APIView):
             otp = serializer.validated_data["otp"]
             new_password = serializer.validated_data["new_password"]
 
-            if verify_otp(email, otp):
+            if verify_otp(email, otp, purpose=PURPOSE_PASSWORD_RESET):
                 try:
                     user = Profile.objects.get(email=email)
                 except Profile.DoesNotExist:
@@ -510,9 +592,17 @@ class PasswordResetConfirmAPIView(APIView):
 # -------------------------
 # LostPetRequestAPIView
 # -------------------------
+class _SubmissionRejected(Exception):
+    """Aborts a submission transaction and carries the error response to return."""
+
+    def __init__(self, response):
+        self.response = response
+
+
 class LostPetRequestAPIView(APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
+    idempotency_endpoint = "lost-pet-request"
 
     def post(self, request):
         user = request.user  # Profile object
@@ -520,7 +610,6 @@ class LostPetRequestAPIView(APIView):
         data = request.data
         
         # Parse JSON data from FormData
-        import json
         try:
             pet_data = json.loads(data.get("pet", "{}"))
             report_data = json.loads(data.get("report", "{}"))
@@ -537,32 +626,69 @@ class LostPetRequestAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Handle pet image
+        # Retried uploads with the same Idempotency-Key replay the stored result
+        idempotency_key = get_idempotency_key(request)
+        request_hash = request_fingerprint(data, request.FILES)
+        if idempotency_key:
+            replayed = replay(user, self.idempotency_endpoint, idempotency_key, request_hash)
+            if replayed is not None:
+                return replayed
+
+        try:
+            with transaction.atomic():
+                response = self._create_submission(request, pet_data, report_data, medical_history_data)
+                if idempotency_key:
+                    remember(user, self.idempotency_endpoint, idempotency_key, request_hash, response)
+        except _SubmissionRejected as rejected:
+            return rejected.response
+        except IntegrityError:
+            # A concurrent retry with the same key committed first; ours was rolled back
+            replayed = replay(user, self.idempotency_endpoint, idempotency_key, request_hash) if idempotency_key else None
+            if replayed is None:
+                raise
+            return replayed
+
+        return response
+
+    def _create_submission(self, request, pet_data, report_data, medical_history_data):
+        """Create pet, report, medical history and admin notification. Runs inside one transaction."""
+        # Handle pet image (PetSerializer.image is read-only, so pass the upload to save()).
+        # A completed chunked upload can be referenced by upload_token instead of sending the file.
         pet_image = request.FILES.get('pet_image')
-        print(f"Pet image received: {pet_image}")  # Debug log
-        if pet_image:
-            pet_data['image'] = pet_image
+        if pet_image or not request.data.get("upload_token"):
+            return self._save_submission(request, pet_image, pet_data, report_data, medical_history_data)
+        # The claimed part file is closed whether the submission is saved or rejected
+        with claim_upload(request.user, request.data["upload_token"]) as pet_image:
+            return self._save_submission(request, pet_image, pet_data, report_data, medical_history_data)
 
-        # 1️⃣ Create Pet
-        pet_serializer = PetSerializer(data=pet_data, context={"request": request})
-        if pet_serializer.is_valid():
-            pet = pet_serializer.save(created_by=user, modified_by=user)
-            print(f"Pet created with image: {pet.image}")  # Debug log
-        else:
-            print("Pet serializer errors:", pet_serializer.errors)  # Debug logging
-            return Response({"pet": pet_serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+    def _save_submission(self, request, pet_image, pet_data, report_data, medical_history_data):
+        user = request.user
 
-        # Handle report image (use same image as pet for now)
-        if pet_image:
-            report_data['image'] = pet_image
+        # 1️⃣ Create Pet; the upload is written to storage exactly once here
+        pet_serializer = PetSerializer(data=pet_data, context={"request": request})
+        if not pet_serializer.is_valid():
+            raise _SubmissionRejected(Response({"pet": pet_serializer.errors}, status=status.HTTP_400_BAD_REQUEST))
+        pet = pet_serializer.save(created_by=user, modified_by=user, image=pet_image)
 
-        # 2️⃣ Create PetReport
+        # 2️⃣ Create PetReport; reuse the file already stored for the pet instead of writing it twice
+        report_data.pop("image", None)
         report_serializer = PetReportSerializer(data=report_data, context={"request": request})
-        if report_serializer.is_valid():
-            report = report_serializer.save(user=user, pet=pet, created_by=user, modified_by=user)
-            print(f"Report created with image: {report.image}")  # Debug log
-        else:
-            return Response({"report": report_serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        if not report_serializer.is_valid():
+            raise _SubmissionRejected(Response({"report": report_serializer.errors}, status=status.HTTP_400_BAD_REQUEST))
+        report = report_serializer.save(
+            user=user, pet=pet, created_by=user, modified_by=user,
+            image=pet.image.name if pet.image else None,
+        )
+        if pet.image:
+            acquire(pet.image.name)  # second reference to the same blob
+
+        # Repeats by the same user are refused; matches with someone else's report are linked
+        try:
+            check_report(report)
+        except DuplicateReportError as e:
+            raise _SubmissionRejected(Response(
+                {"error": str(e), "report_id": e.original.id}, status=e.status
+            ))
 
         # 3️⃣ Create PetMedicalHistory (if vaccinated or diseased)
         if pet.is_vaccinated or pet.is_diseased:
@@ -570,26 +696,22 @@ class LostPetRequestAPIView(APIView):
                 data=medical_history_data,
                 context={"request": request, "pet": pet}  # pass pet in context
             )
-            if medical_serializer.is_valid():
-                medical_serializer.save()  # pet and user are already in create() via context
-            else:
-                return Response(
+            if not medical_serializer.is_valid():
+                raise _SubmissionRejected(Response(
                     {"medical_history": medical_serializer.errors},
                     status=status.HTTP_400_BAD_REQUEST
-                )
+                ))
+            medical_serializer.save()  # pet and user are already in create() via context
 
         # 4️⃣ Create Notification for Admin
-         # 4️⃣ Create Notification for Admin
-        try:
-            admin_user = Profile.objects.get(is_superuser=True)
-        except Profile.DoesNotExist:
-            admin_user = None
+        admin_user = Profile.objects.filter(is_superuser=True).first()
 
         # Create the notification and explicitly set the admin as the receiver
         notification = Notification.objects.create(
             sender=user,
             receiver=admin_user, # 👈 SET THE RECEIVER
-            content=f"New lost pet reported: {pet.name}",
+            content=f"New lost pet reported: {pet.name}"
+                    + (f" (possible duplicate of report {report.duplicate_of_id})" if report.duplicate_of_id else ""),
             pet=pet,
             report=report
         )
@@ -598,6 +720,7 @@ class LostPetRequestAPIView(APIView):
             "message": "Lost pet request submitted successfully",
             "pet_id": pet.id,
             "report_id": report.id,
+            "duplicate_of": report.duplicate_of_id,
             "notification_id": notification.id
         }, status=status.HTTP_201_CREATED)
     
@@ -635,7 +758,7 @@ class LostPetRequestAPIView(APIView):
                 "pet": {
                     "id": pet_obj.id,
                     "name": pet_obj.name,
-                    "pet_type": str(pet_obj.pet_type) if pet_obj.pet_type else None,
+                    "pet_type": pet_type_registry.name_for(pet_obj.pet_type_id),
                     "breed": pet_obj.breed,
                     "age": pet_obj.age,
                     "description": pet_obj.description,
@@ -654,6 +777,37 @@ class LostPetRequestAPIView(APIView):
         return Response({"lost_pets": data}, status=status.HTTP_200_OK)
 
 
+# -------------------------
+# PetBulkImportAPIView
+# -------------------------
+class PetBulkImportAPIView(APIView):
+    """
+    Bulk import for shelters: multipart 'file' (CSV or JSON rows) and optional
+    'images' zip whose file names are referenced by each row's 'image' column.
+    Returns a per-row error report; valid rows are created as Pending reports.
+    Admins only: an import can create pet types and many reports at once.
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if not upload:
+            return Response({"error": "An import file is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            rows = parse_rows(upload, request.data.get("file_format"))
+            importer = PetBulkImporter(request.user, images=request.FILES.get("images"))
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({"error": f"Could not read import file: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+        except zipfile.BadZipFile:
+            return Response({"error": "Images must be a zip archive"}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = importer.run(rows)
+        response_status = status.HTTP_201_CREATED if result["created"] else status.HTTP_400_BAD_REQUEST
+        return Response(result, status=response_status)
+
+
 # -------------------------
 # AdminNotificationsAPIView
 # -------------------------
@@ -671,9 +825,7 @@ class AdminNotificationsAPIView(APIView):
         notifications = Notification.objects.filter(receiver=user).order_by("-created_at")
         
         # Use the serializer to handle the data conversion automatically
-        serializer = NotificationSerializer(notifications, many=True)
-        
-        return Response({"notifications": serializer.data}, status=status.HTTP_200_OK)
+        return list_response(NotificationFastSerializer, NotificationSerializer, notifications, request, key="notifications")
     
 
 
@@ -687,24 +839,19 @@ class PetsListAPIView(APIView):
         if not tab:
             return Response({"error": "Tab parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        data = []
-
         if tab.lower() == "lost":
             reports = PetReport.objects.filter(pet_status="Lost", report_status="Accepted")
-            data = PetReportSerializer(reports, many=True, context={"request": request}).data
+            return list_response(PetReportFastSerializer, PetReportSerializer, reports, request, key="results")
 
         elif tab.lower() == "found":
             reports = PetReport.objects.filter(pet_status="Found", report_status="Accepted")
-            data = PetReportSerializer(reports, many=True, context={"request": request}).data
+            return list_response(PetReportFastSerializer, PetReportSerializer, reports, request, key="results")
 
         elif tab.lower() == "adopt":
             adoptions = PetAdoption.objects.filter(status="Approved")
-            data = PetAdoptionListSerializer(adoptions, many=True, context={"request": request}).data
-
-        else:
-            return Response({"error": "Invalid tab value"}, status=status.HTTP_400_BAD_REQUEST)
+            return list_response(PetAdoptionListFastSerializer, PetAdoptionListSerializer, adoptions, request, key="results")
 
-        return Response({"results": data}, status=status.HTTP_200_OK)
+        return Response({"error": "Invalid tab value"}, status=status.HTTP_400_BAD_REQUEST)
 
 
 # -------------------------
@@ -736,7 +883,7 @@ class AdminApprovalAPIView(APIView):
                     report.save()
 
                     # Notification with receiver
-                    Notification.objects.create(
+                    notify(
                         sender=request.user,                     # Admin
                         receiver=report.user,                    # ← NEW: user who created the report
                         content=f"Your {request_type} pet request is {report.report_status.lower()}",
@@ -752,24 +899,16 @@ class AdminApprovalAPIView(APIView):
 
             # ADOPTION
             elif request_type == "adopt":
+                # Locks the pet and its requests; approving rejects the others and notifies everyone
+                new_status = "Approved" if action == "approve" else "Rejected"
                 try:
-                    adoption = PetAdoption.objects.get(pet__id=pet_id)
-                    adoption.status = "Approved" if action == "approve" else "Rejected"
-                    adoption.save()
-
-                    # Notification with receiver
-                    Notification.objects.create(
-                        sender=request.user,                      # Admin
-                        receiver=adoption.requestor,             # ← NEW: user who requested adoption
-                        content=f"Your adoption request is {adoption.status.lower()}",
-                        pet=adoption.pet
-                    )
-                    return Response(
-                        {"message": f"Adoption request {adoption.status.lower()} successfully"},
-                        status=status.HTTP_200_OK
-                    )
-                except PetAdoption.DoesNotExist:
-                    return Response({"error": "Adoption request not found"}, status=status.HTTP_404_NOT_FOUND)
+                    decide(pet_id, new_status, request.user, adoption_id=serializer.validated_data.get("adoption_id"))
+                except AdoptionDecisionError as e:
+                    return Response({"error": e.message}, status=e.status)
+                return Response(
+                    {"message": f"Adoption request {new_status.lower()} successfully"},
+                    status=status.HTTP_200_OK
+                )
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -786,8 +925,7 @@ class UserNotificationsAPIView(APIView):
         # Get all notifications for this user, order by latest
         notifications = Notification.objects.filter(receiver=user).order_by('-created_at')
 
-        serializer = NotificationSerializer(notifications, many=True, context={"request": request})
-        return Response({"notifications": serializer.data}, status=status.HTTP_200_OK)
+        return list_response(NotificationFastSerializer, NotificationSerializer, notifications, request, key="notifications")
 
 
 
@@ -806,8 +944,8 @@ class UserRequestsListAPIView(APIView):
         # fetch adoption requests made by this profile
         adoptions = PetAdoption.objects.filter(requestor=profile)
 
-        report_data = UserPetReportSerializer(reports, many=True).data
-        adoption_data = UserAdoptionRequestSerializer(adoptions, many=True).data
+        report_data = sparse_serializer(UserPetReportSerializer, reports, request).data
+        adoption_data = sparse_serializer(UserAdoptionRequestSerializer, adoptions, request).data
 
         return Response({
             "reports": report_data,
@@ -817,6 +955,25 @@ class UserRequestsListAPIView(APIView):
 
 
 
+def filter_admin_users(qs, params):
+    """Query param filters shared by the admin user list and its export."""
+    gender = params.get("gender")        # expect: Male / Female / Other
+    superuser = params.get("superuser")  # expect: true / false / 1 / 0
+
+    if gender:
+        qs = qs.filter(gender__iexact=gender)
+
+    if superuser is not None:
+        s = superuser.lower()
+        if s in ("true", "1", "yes"):
+            qs = qs.filter(is_superuser=True)
+        elif s in ("false", "0", "no"):
+            qs = qs.filter(is_superuser=False)
+        # otherwise ignore invalid values
+
+    return qs
+
+
 class AdminUserListView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -827,24 +984,9 @@ class AdminUserListView(APIView):
         if not user.is_superuser:
             return Response({"detail": "Unauthorized"}, status=status.HTTP_403_FORBIDDEN)
 
-        qs = Profile.objects.all().order_by("-created_at")
-
-        # Simple filters from query params
-        gender = request.query_params.get("gender")        # expect: Male / Female / Other
-        superuser = request.query_params.get("superuser")  # expect: true / false / 1 / 0
+        qs = filter_admin_users(Profile.objects.all().order_by("-created_at"), request.query_params)
 
-        if gender:
-            qs = qs.filter(gender__iexact=gender)
-
-        if superuser is not None:
-            s = superuser.lower()
-            if s in ("true", "1", "yes"):
-                qs = qs.filter(is_superuser=True)
-            elif s in ("false", "0", "no"):
-                qs = qs.filter(is_superuser=False)
-            # otherwise ignore invalid values
-
-        serializer = AdminUserSerializer(qs, many=True, context={"request": request})
+        serializer = sparse_serializer(AdminUserSerializer, qs, request)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -915,7 +1057,7 @@ class AdminPetReportsAPIView(APIView):
             return Response({"detail": "Unauthorized"}, status=status.HTTP_403_FORBIDDEN)
 
         reports = PetReport.objects.all().order_by("-created_date")
-        serializer = AdminPetReportSerializer(reports, many=True)
+        serializer = sparse_serializer(AdminPetReportSerializer, reports, request)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -962,10 +1104,28 @@ class AdminUnreadNotificationCountAPIView(APIView):
         if not request.user.is_superuser:
             return Response({"detail": "Unauthorized"}, status=status.HTTP_403_FORBIDDEN)
         
-        # Filter for notifications where the receiver is the current superuser
-        unread_count = Notification.objects.filter(is_read=False, receiver=request.user).count()
-        
+        # Filter for notifications where the receiver is the current superuser.
+        # Counter is shared-tier only; notification saves/deletes drop it (see signals.py)
+        unread_count = app_cache.get_or_set(
+            UNREAD_COUNT_NAMESPACE,
+            request.user.id,
+            lambda: Notification.objects.filter(is_read=False, receiver=request.user).count(),
+            timeout=300,
+            local=False,
+        )
+
         return Response({"unread_count": unread_count}, status=status.HTTP_200_OK)
+
+
+class AdminCacheStatsAPIView(APIView):
+    """Hit/miss/eviction counters of the two-tier cache for the worker serving the request."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_superuser:
+            return Response({"detail": "Unauthorized"}, status=status.HTTP_403_FORBIDDEN)
+
+        return Response({"pid": os.getpid(), "cache": app_cache.stats()}, status=status.HTTP_200_OK)
     
 class AdminLostPetRequestsAPIView(APIView):
     permission_classes = [IsAuthenticated]
@@ -981,7 +1141,7 @@ class AdminLostPetRequestsAPIView(APIView):
         # ✅ Use the detailed AdminPetReportSerializer for a consistent response
         # This ensures all necessary data (user, pet details, dates) is included.
         reports = PetReport.objects.filter(pet_status="Lost").select_related("pet", "user").order_by("-created_date")
-        serializer = AdminPetReportSerializer(reports, many=True, context={'request': request})
+        serializer = sparse_serializer(AdminPetReportSerializer, reports, request)
         
         # ✅ Return the serialized data directly as an array
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -1000,7 +1160,7 @@ class AdminFoundPetRequestsAPIView(APIView):
 
         # Use the same detailed serializer, but filter for "Found" status
         reports = PetReport.objects.filter(pet_status="Found").select_related("pet", "user").order_by("-created_date")
-        serializer = AdminPetReportSerializer(reports, many=True, context={'request': request})
+        serializer = sparse_serializer(AdminPetReportSerializer, reports, request)
         
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -1016,7 +1176,7 @@ class AdminManageReportStatusAPIView(APIView):
             )
 
         report_status = request.data.get("report_status")
-        if report_status not in dict(REPORT_STATUS_CHOICES):
+        if report_status not in dict(PetReport.REPORT_STATUS_CHOICES):
             return Response({"error": "Invalid status"}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
@@ -1025,7 +1185,7 @@ class AdminManageReportStatusAPIView(APIView):
             report.save()
 
             # Notify user
-            Notification.objects.create(
+            notify(
                 sender=request.user,
                 receiver=report.user,
                 content=f"Your pet report status changed to {report_status.lower()}",
@@ -1074,7 +1234,7 @@ class FoundPetRequestAPIView(APIView): # Inheriting from APIView for public read
                 "pet": {
                     "id": pet_obj.id,
                     "name": pet_obj.name,
-                    "pet_type": str(pet_obj.pet_type) if pet_obj.pet_type else None,
+                    "pet_type": pet_type_registry.name_for(pet_obj.pet_type_id),
                     "breed": pet_obj.breed,
                     "age": pet_obj.age,
                     "color": pet_obj.color,
@@ -1129,7 +1289,7 @@ class UserLostPetsAPIView(APIView):
                 "pet": {
                     "id": pet_obj.id,
                     "name": pet_obj.name,
-                    "pet_type": str(pet_obj.pet_type) if pet_obj.pet_type else None,
+                    "pet_type": pet_type_registry.name_for(pet_obj.pet_type_id),
                     "breed": pet_obj.breed,
                     "age": pet_obj.age,
                     "description": pet_obj.description,
@@ -1181,7 +1341,7 @@ class UserFoundPetsAPIView(APIView):
                 "pet": {
                     "id": pet_obj.id,
                     "name": pet_obj.name,
-                    "pet_type": str(pet_obj.pet_type) if pet_obj.pet_type else None,
+                    "pet_type": pet_type_registry.name_for(pet_obj.pet_type_id),
                     "breed": pet_obj.breed,
                     "age": pet_obj.age,
                     "description": pet_obj.description,
@@ -1205,8 +1365,7 @@ class AdoptionPetsView(APIView):
     def get(self, request):
         # Fetch all PetAdoption entries (you can filter by status if needed)
         adoption_requests = PetAdoption.objects.all()
-        serializer = PetAdoptionSerializer(adoption_requests, many=True, context={"request": request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return list_response(PetAdoptionFastSerializer, PetAdoptionSerializer, adoption_requests, request)
 
 
 class UserPetAdoptionsAPIView(APIView):
@@ -1216,7 +1375,7 @@ class UserPetAdoptionsAPIView(APIView):
         user_adoptions = PetAdoption.objects.filter(requestor=request.user).order_by("-created_date")
 
         # ✅ USE THE NEW, DETAILED SERIALIZER
-        serializer = UserAdoptionDetailSerializer(user_adoptions, many=True, context={'request': request})
+        serializer = sparse_serializer(UserAdoptionDetailSerializer, user_adoptions, request)
         
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -1231,6 +1390,7 @@ class AdoptablePetsAPIView(APIView):
         reports = PetReport.objects.filter(
             pet_status="Found",          # Must be a found pet
             report_status="Accepted",    # The report must have been accepted by an admin
+            is_resolved=False,           # Resolved once an adoption is approved
             modified_date__lte=time_cutoff  # Accepted more than 30 days ago
         ).order_by("-created_date")
 
@@ -1257,7 +1417,7 @@ class AdoptablePetsAPIView(APIView):
                 "pet": {
                     "id": pet_obj.id,
                     "name": pet_obj.name,
-                    "pet_type": str(pet_obj.pet_type) if pet_obj.pet_type else None,
+                    "pet_type": pet_type_registry.name_for(pet_obj.pet_type_id),
                     "breed": pet_obj.breed,
                     "age": pet_obj.age,
                     "color": pet_obj.color,
@@ -1287,10 +1447,7 @@ class RecentPetsAPIView(APIView):
 
     def get(self, request):
         pets = Pet.objects.all().order_by('-created_date')[:10]
-        serializer = PetSerializer(pets, many=True, context={"request": request})
-        return Response({
-            "recent_pets": serializer.data
-        }, status=status.HTTP_200_OK)
+        return list_response(PetFastSerializer, PetSerializer, pets, request, key="recent_pets")
 
 
 
@@ -1305,137 +1462,68 @@ class RecentPetsAPIView(APIView):
 # -------------------------
 class MyRewardView(APIView):
     permission_classes = [permissions.IsAuthenticated]
-    RESCUER_POINTS = 100
-    ADOPTER_POINTS = 50
-
-    @staticmethod
-    def calculate_user_rewards(user):
-        reasons = []
-
-        # Rescuer points: only for reports that are "Accepted" and pet_status is "Found"
-        accepted_found_reports = PetReport.objects.filter(user=user, report_status="Accepted", pet_status="Found")
-        rescuer_points = accepted_found_reports.count() * MyRewardView.RESCUER_POINTS
-        if accepted_found_reports.count() > 0:
-            reasons.append(f"Rescued {accepted_found_reports.count()} pets")
-
-        # Adopter points: all approved adoptions
-        approved_adoptions = PetAdoption.objects.filter(requestor=user, status="Approved")
-        adopter_points = approved_adoptions.count() * MyRewardView.ADOPTER_POINTS
-        if approved_adoptions.count() > 0:
-            reasons.append(f"Approved {approved_adoptions.count()} adoptions")
-
-        total_points = rescuer_points + adopter_points
-        reason_text = "; ".join(reasons) if reasons else "No points yet"
-
-        # Get or create reward object
-        reward_obj, created = RewardPoint.objects.get_or_create(user=user)
-        reward_obj.points = total_points
-        reward_obj.reason = reason_text
-        reward_obj.update_badge()  # make sure this exists in RewardPoint model
-        reward_obj.save()
-        return reward_obj
 
     def get(self, request):
-        user = request.user
-        reward_obj = MyRewardView.calculate_user_rewards(user)
+        reward_obj = rewards.calculate_for(request.user)
         serializer = RewardPointSerializer(reward_obj)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-# utils.py or at the top of views.py
-def calculate_user_rewards(user):
-    RESCUER_POINTS = 100
-    ADOPTER_POINTS = 50
-    reasons = []
-
-    # Rescuer points: only for reports that are "Accepted" and pet_status is "Found"
-    accepted_found_reports = PetReport.objects.filter(user=user, report_status="Accepted", pet_status="Found")
-    rescuer_points = accepted_found_reports.count() * RESCUER_POINTS
-    if accepted_found_reports.count() > 0:
-        reasons.append(f"Rescued {accepted_found_reports.count()} pets")
+def _int_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: "Must be an integer."})
+
+
+def filter_rewards(qs, params):
+    """Query param filters shared by the admin reward list and its export."""
+    search = params.get("search")
+    if search:
+        qs = qs.filter(Q(user__username__icontains=search) | Q(user__email__icontains=search))
+    if params.get("badge"):
+        qs = qs.filter(badge__iexact=params["badge"])
+    min_points = _int_param(params, "min_points")
+    if min_points is not None:
+        qs = qs.filter(points__gte=min_points)
+    max_points = _int_param(params, "max_points")
+    if max_points is not None:
+        qs = qs.filter(points__lte=max_points)
+    if params.get("ordering") in ("points", "-points"):
+        qs = qs.order_by(params["ordering"], "user_id")
+    return qs
 
-    # Adopter points: all approved adoptions
-    approved_adoptions = PetAdoption.objects.filter(requestor=user, status="Approved")
-    adopter_points = approved_adoptions.count() * ADOPTER_POINTS
-    if approved_adoptions.count() > 0:
-        reasons.append(f"Approved {approved_adoptions.count()} adoptions")
-
-    total_points = rescuer_points + adopter_points
-    reason_text = "; ".join(reasons) if reasons else "No points yet"
-
-    reward_obj, created = RewardPoint.objects.get_or_create(user=user)
-    reward_obj.points = total_points
-    reward_obj.reason = reason_text
-    reward_obj.update_badge()
-    reward_obj.save()
-    return reward_obj
 
 class AllRewardsView(APIView):
     permission_classes = [permissions.IsAdminUser]
 
     def get(self, request):
-        # Query params
-        search = request.query_params.get("search")
-        badge = request.query_params.get("badge")  # e.g. Gold, Silver, Bronze
-        min_points = request.query_params.get("min_points")
-        max_points = request.query_params.get("max_points")
-        ordering = request.query_params.get("ordering")  # "points" or "-points"
-
-        users = Profile.objects.all()
-        rewards_list = []
-
-        # Calculate rewards for each user
-        for user in users:
-            reward_obj = calculate_user_rewards(user)
-            rewards_list.append(reward_obj)
-
-        # Search by username/email
-        if search:
-            rewards_list = [
-                r for r in rewards_list
-                if (r.user.username and search.lower() in r.user.username.lower())
-                or (r.user.email and search.lower() in r.user.email.lower())
-            ]
-
-        # Filter by badge
-        if badge:
-            rewards_list = [r for r in rewards_list if r.badge and r.badge.lower() == badge.lower()]
-
-        # Filter by points range
-        if min_points:
-            rewards_list = [r for r in rewards_list if r.points >= int(min_points)]
-        if max_points:
-            rewards_list = [r for r in rewards_list if r.points <= int(max_points)]
-
-        # Ordering
-        if ordering:
-            reverse = ordering.startswith("-")
-            field = ordering.lstrip("-")
-            if field == "points":
-                rewards_list.sort(key=lambda r: r.points, reverse=reverse)
-
-        # Serialize and return
-        serializer = RewardPointSerializer(rewards_list, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Bring every stored RewardPoint up to date, then filter and order in the database
+        rewards.refresh_all()
+        queryset = filter_rewards(RewardPoint.objects.select_related("user").order_by("user_id"), request.query_params)
+        return list_response(RewardPointFastSerializer, RewardPointSerializer, queryset, request)
 
 
 class FeedbackStoryAPIView(APIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    parser_classes = [JSONParser,MultiPartParser, FormParser]
+    parser_classes = [ORJSONParser,MultiPartParser, FormParser]
 
     def get(self, request, *args, **kwargs):
         stories = FeedbackStory.objects.all().order_by("-submitted_at")
-        serializer = FeedbackStorySerializer(stories, many=True, context={"request": request})
+        serializer = sparse_serializer(FeedbackStorySerializer, stories, request)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def post(self, request, *args, **kwargs):
         serializer = FeedbackStorySerializer(data=request.data, context={"request": request})
         if serializer.is_valid():
-            serializer.save(user=request.user)
+            save_with_upload(serializer, request, "image", user=request.user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-class UserReportViewSet(viewsets.ModelViewSet):
+class UserReportViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     A ViewSet for handling user-submitted reports (Sighting/Reclaim).
     - Users can CREATE reports.
@@ -1521,7 +1609,7 @@ class UserReportViewSet(viewsets.ModelViewSet):
 
         # Send a notification to the user only if the status has changed
         if original_status != new_status:
-            Notification.objects.create(
+            notify(
                 sender=request.user,  # The admin making the change
                 
                 # FIX IS HERE: Use created_by to get the requester
@@ -1532,4 +1620,282 @@ class UserReportViewSet(viewsets.ModelViewSet):
             )
 
         serializer = self.get_serializer(instance)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+
+# -------------------------
+# Admin streaming exports
+# -------------------------
+class AdminExportAPIView(APIView):
+    """
+    Base view for admin exports. Streams CSV (default) or NDJSON
+    (?output=ndjson) straight from a values_list iterator.
+    Subclasses define basename, columns and get_queryset(params), which
+    returns the queryset to export filtered by the request's query params.
+    """
+    permission_classes = [IsAuthenticated]
+    basename = "export"
+    columns = []
+
+    def get(self, request):
+        if not request.user.is_superuser:
+            return Response({"detail": "Unauthorized"}, status=status.HTTP_403_FORBIDDEN)
+
+        queryset = self.get_queryset(request.query_params)
+        return export_response(
+            queryset, self.columns, request.query_params.get("output", "csv"), self.basename, request=request
+        )
+
+
+class AdminUserExportView(AdminExportAPIView):
+    basename = "users"
+    columns = [
+        ("id", "id"), ("username", "username"), ("email", "email"), ("gender", "gender"),
+        ("phone", "phone"), ("address", "address"), ("pincode", "pincode"),
+        ("is_active", "is_active"), ("is_staff", "is_staff"), ("is_superuser", "is_superuser"),
+        ("is_verified", "is_verified"), ("created_at", "created_at"), ("updated_at", "updated_at"),
+    ]
+
+    def get_queryset(self, params):
+        # Same filters as AdminUserListView (gender, superuser)
+        return filter_admin_users(Profile.objects.order_by("-created_at"), params)
+
+
+class AdminPetReportExportView(AdminExportAPIView):
+    basename = "pet-reports"
+    columns = [
+        ("id", "id"), ("pet_id", "pet_id"), ("pet_name", "pet__name"), ("pet_type", "pet__pet_type__type"),
+        ("user", "user__username"), ("pet_status", "pet_status"), ("report_status", "report_status"),
+        ("is_resolved", "is_resolved"), ("image", "image"),
+        ("created_date", "created_date"), ("modified_date", "modified_date"),
+    ]
+
+    def get_queryset(self, params):
+        qs = PetReport.objects.order_by("-created_date")
+        if params.get("pet_status"):
+            qs = qs.filter(pet_status=params["pet_status"])
+        if params.get("report_status"):
+            qs = qs.filter(report_status=params["report_status"])
+        return qs
+
+
+class AdminAdoptionExportView(AdminExportAPIView):
+    basename = "adoptions"
+    columns = [
+        ("id", "id"), ("pet_id", "pet_id"), ("pet_name", "pet__name"),
+        ("requestor", "requestor__username"), ("requestor_email", "requestor__email"),
+        ("message", "message"), ("status", "status"),
+        ("created_date", "created_date"), ("modified_date", "modified_date"),
+    ]
+
+    def get_queryset(self, params):
+        qs = PetAdoption.objects.order_by("-created_date")
+        if params.get("status"):
+            qs = qs.filter(status=params["status"])
+        return qs
+
+
+class AdminRewardExportView(AdminExportAPIView):
+    basename = "rewards"
+    columns = [
+        ("user", "user_id"), ("username", "user__username"), ("email", "user__email"),
+        ("points", "points"), ("badge", "badge"), ("reason", "reason"),
+    ]
+
+    def get_queryset(self, params):
+        # Same points and query params as AllRewardsView
+        rewards.refresh_all()
+        return filter_rewards(RewardPoint.objects.order_by("user_id"), params)
+
+
+class AdminNotificationExportView(AdminExportAPIView):
+    basename = "notifications"
+    columns = [
+        ("id", "id"), ("sender", "sender__username"), ("receiver", "receiver__username"),
+        ("content", "content"), ("pet_id", "pet_id"), ("report_id", "report_id"),
+        ("is_read", "is_read"), ("created_at", "created_at"),
+    ]
+
+    def get_queryset(self, params):
+        qs = Notification.objects.order_by("-id")
+        if params.get("receiver"):
+            qs = qs.filter(receiver_id=params["receiver"])
+        is_read = (params.get("is_read") or "").lower()
+        if is_read in ("true", "1", "yes"):
+            qs = qs.filter(is_read=True)
+        elif is_read in ("false", "0", "no"):
+            qs = qs.filter(is_read=False)
+        return qs
+
+
+# -------------------------
+# Resumable chunked uploads
+# -------------------------
+def _upload_error(e, status_code=status.HTTP_400_BAD_REQUEST):
+    body = {"error": e.message}
+    if e.received_bytes is not None:
+        body["received_bytes"] = e.received_bytes
+        status_code = status.HTTP_409_CONFLICT
+    return Response(body, status=status_code)
+
+
+class ChunkedUploadStartAPIView(APIView):
+    """POST uploads/ {filename, total_size, checksum (sha256 hex)} -> upload token."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = ChunkedUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            upload = start_upload(request.user, **serializer.validated_data)
+        except UploadError as e:
+            return _upload_error(e)
+        return Response(ChunkedUploadSerializer(upload).data, status=status.HTTP_201_CREATED)
+
+
+class ChunkedUploadDetailAPIView(APIView):
+    """
+    GET uploads/<token>/ -> progress, so an interrupted client knows where to resume.
+    PUT uploads/<token>/ with an application/octet-stream body and
+    'Content-Range: bytes <start>-<end>/<total>' appends the next chunk.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [ChunkParser]
+
+    def get(self, request, token):
+        try:
+            upload = ChunkedUpload.objects.get(token=token, user=request.user)
+        except ChunkedUpload.DoesNotExist:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ChunkedUploadSerializer(upload).data, status=status.HTTP_200_OK)
+
+    def put(self, request, token):
+        try:
+            upload = append_chunk(request.user, token, request.headers.get("Content-Range"), request.data)
+        except ChunkedUpload.DoesNotExist:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+        except UploadError as e:
+            return _upload_error(e)
+        return Response(ChunkedUploadSerializer(upload).data, status=status.HTTP_200_OK)
+
+
+class ChunkedUploadCompleteAPIView(APIView):
+    """POST uploads/<token>/complete/ verifies size and checksum and returns the upload_token."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, token):
+        try:
+            upload = complete_upload(request.user, token)
+        except ChunkedUpload.DoesNotExist:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+        except UploadError as e:
+            return _upload_error(e)
+        return Response(
+            {"upload_token": str(upload.token), **ChunkedUploadSerializer(upload).data},
+            status=status.HTTP_200_OK,
+        )
+
+
+# -------------------------
+# Saved searches
+# -------------------------
+class SavedSearchViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
+    """
+    The signed-in user's saved searches. Newly accepted reports matching one
+    are sent to the user as notifications (saved_searches.py).
+    """
+    serializer_class = SavedSearchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return SavedSearch.objects.filter(user=self.request.user).order_by("id")
+
+    def perform_create(self, serializer):
+        user = self.request.user
+        limit = getattr(settings, "SAVED_SEARCH_MAX_PER_USER", 20)
+        if SavedSearch.objects.filter(user=user).count() >= limit:
+            raise ValidationError(f"You can keep at most {limit} saved searches.")
+        serializer.save(user=user, created_by=user, modified_by=user)
+
+    def perform_update(self, serializer):
+        serializer.save(modified_by=self.request.user)
+
+
+# -------------------------
+# Notification fan-out
+# -------------------------
+class AdminFanoutAPIView(APIView):
+    """
+    POST admin/fanout/ {"audience": "area", "params": {"pincode_prefix": "5600"},
+    "template": "Hi {username}, ...", "pet_id": 7} queues a fan-out (202);
+    GET lists recent jobs with their progress.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_superuser:
+            return Response({"detail": "Unauthorized"}, status=status.HTTP_403_FORBIDDEN)
+        jobs = FanoutJob.objects.order_by("-id")[:50]
+        return Response(FanoutJobSerializer(jobs, many=True).data, status=status.HTTP_200_OK)
+
+    def post(self, request):
+        if not request.user.is_superuser:
+            return Response({"detail": "Unauthorized"}, status=status.HTTP_403_FORBIDDEN)
+        serializer = FanoutRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        pet = None
+        if "pet_id" in data:
+            pet = Pet.objects.filter(pk=data["pet_id"]).first()
+            if pet is None:
+                return Response({"error": "Pet not found"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            job = start_fanout(data["audience"], data["params"], data["template"], request.user, pet=pet)
+        except FanoutError as e:
+            return Response({"error": e.message}, status=e.status)
+        return Response(FanoutJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class AdminFanoutDetailAPIView(APIView):
+    """GET admin/fanout/<id>/ -> progress of one job."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        if not request.user.is_superuser:
+            return Response({"detail": "Unauthorized"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            job = FanoutJob.objects.get(pk=job_id)
+        except FanoutJob.DoesNotExist:
+            return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(FanoutJobSerializer(job).data, status=status.HTTP_200_OK)
+
+
+# -------------------------
+# Change feed
+# -------------------------
+class ChangeFeedAPIView(APIView):
+    """
+    GET changes/?since=<cursor>&limit=<n> -> upsert/delete events after the cursor.
+    Without since, only the current cursor (take it before fetching the full lists).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        since = request.query_params.get("since")
+        if since is None:
+            return Response({"changes": [], "cursor": head(), "has_more": False}, status=status.HTTP_200_OK)
+        try:
+            since = int(since)
+            limit = min(max(int(request.query_params.get("limit", DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        except ValueError:
+            return Response({"error": "since and limit must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            page = read_changes(request, since, limit)
+        except CursorExpired as e:
+            return Response({"error": str(e), "resync": True, "cursor": e.head}, status=status.HTTP_410_GONE)
+        return Response(page, status=status.HTTP_200_OK)
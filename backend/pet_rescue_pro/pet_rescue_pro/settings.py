@@ -14,13 +14,12 @@ from pathlib import Path
 import os
 from dotenv import load_dotenv
 
-import google.generativeai as genai
-
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 load_dotenv(BASE_DIR / ".env")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")  # keep key in .env
-genai.configure(api_key=GEMINI_API_KEY)
+# The Gemini SDK is imported and configured on first use (pet_rescue_app.integrations)
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
 
 
 # read .env file
@@ -60,12 +59,14 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.security.SecurityMiddleware',
+    "pet_rescue_app.middleware.CompressionMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    "pet_rescue_app.identity.IdentityMapMiddleware",
 ]
 
 CORS_ALLOW_ALL_ORIGINS = True
@@ -104,6 +105,38 @@ DATABASES = {
     }
 }
 
+# Caching
+# Shared tier for pet_rescue_app.caching.TwoTierCache. Every worker must see the
+# same cache, so the default is a database cache table (created by migration
+# 0025_cache_table); set REDIS_URL to use Redis instead.
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "TIMEOUT": 300,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "pet_rescue_cache",
+            "TIMEOUT": 300,
+            "OPTIONS": {"MAX_ENTRIES": 100000},
+        }
+    }
+
+# In-process LRU in front of CACHES["default"]
+TWO_TIER_CACHE = {
+    "ALIAS": "default",
+    "LOCAL_MAX_ENTRIES": 2048,
+    "LOCAL_TTL": 30,                 # seconds a worker may serve its local copy
+    "VERSION_CHECK_INTERVAL": 1.0,   # seconds between namespace version checks
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -146,16 +179,105 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # settings.py
 MEDIA_URL = '/media/'
 
+# Uploads are stored by content hash in sharded directories, deduplicated
+# and reference counted (pet_rescue_app.storage; clean up with gc_media_blobs)
+STORAGES = {
+    "default": {"BACKEND": "pet_rescue_app.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+# Media serving (pet_rescue_app.media). Behind nginx set MEDIA_ACCEL_MODE=x-accel-redirect
+# and map MEDIA_ACCEL_PREFIX to MEDIA_ROOT in an `internal` location; Apache uses x-sendfile.
+MEDIA_ACCEL_MODE = os.getenv("MEDIA_ACCEL_MODE") or None
+MEDIA_ACCEL_PREFIX = "/protected-media/"
+
+# Resumable chunked uploads (pet_rescue_app.uploads); part files live outside MEDIA_URL
+CHUNKED_UPLOAD_DIR = BASE_DIR / "chunked_uploads"
+CHUNKED_UPLOAD_MAX_SIZE = 20 * 1024 * 1024   # bytes per file
+CHUNKED_UPLOAD_MAX_CHUNK = 2 * 1024 * 1024   # bytes per PUT
+CHUNKED_UPLOAD_TTL_HOURS = 24
+
+# Reports by the same user with the same pet details within this window are duplicates (pet_rescue_app.duplicates)
+REPORT_DUPLICATE_WINDOW = 24 * 60 * 60   # seconds
+
 
 
 # Django REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'pet_rescue_app.identity.IdentityMapJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'pet_rescue_app.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    # Opt-in per request (?page_size=); lists stay unpaginated without it
+    'DEFAULT_PAGINATION_CLASS': 'pet_rescue_app.pagination.EstimatedCountPagination',
+    'DEFAULT_PARSER_CLASSES': (
+        'pet_rescue_app.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+}
+
+# Async views for the hot read endpoints (pet_rescue_app.async_views); on by default under
+# asgi.py, off under WSGI where every async view would need its own event loop
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", "0").lower() in ("1", "true", "yes")
+
+# Change feed (pet_rescue_app.changefeed): entries younger than the settle time are held
+# back until their transactions have surely committed; compact_change_log expires old ones
+CHANGE_FEED_SETTLE_SECONDS = 2
+CHANGE_LOG_RETENTION_DAYS = 30
+
+# Saved-search alerts (pet_rescue_app.saved_searches)
+SAVED_SEARCH_MAX_PER_USER = 20
+
+# Threads per blocking integration (pet_rescue_app.integrations)
+INTEGRATION_POOL_SIZES = {
+    "chatbot": int(os.getenv("CHATBOT_POOL_SIZE", 8)),
+    "fanout": int(os.getenv("FANOUT_POOL_SIZE", 1)),
+}
+
+# Status updates about one report merge into the receiver's unread notification from the last
+# NOTIFICATION_COALESCE_MINUTES; purge_notifications archives read ones after the retention period
+NOTIFICATION_COALESCE_MINUTES = 60
+NOTIFICATION_RETENTION_DAYS = 90
+
+# Notifications per bulk insert when fanning out to an audience (pet_rescue_app.fanout)
+FANOUT_CHUNK_SIZE = 1000
+
+# Vaccination reminders (pet_rescue_app.vaccinations): due VACCINATION_INTERVAL_DAYS after the last
+# shot, reminded once per cycle from VACCINATION_REMINDER_WINDOW_DAYS before until the grace period ends
+VACCINATION_INTERVAL_DAYS = 365
+VACCINATION_REMINDER_WINDOW_DAYS = 14
+VACCINATION_OVERDUE_GRACE_DAYS = 30
+
+# send_queued_emails gives up on an email after this many failed attempts (pet_rescue_app.outbox),
+# waiting OUTBOX_RETRY_SECONDS after the first failure and twice as long after each further one
+OUTBOX_MAX_ATTEMPTS = 3
+OUTBOX_RETRY_SECONDS = 300
+
+# Periodic jobs (pet_rescue_app.scheduler, run with `manage.py run_scheduler`). The lease only
+# applies to backends without advisory locks and must outlast the slowest job.
+SCHEDULER_POLL_SECONDS = 30
+SCHEDULER_LEASE_MINUTES = 60
+SCHEDULER_RUN_HISTORY_DAYS = 30
+
+# Request-scoped identity map (pet_rescue_app.identity): foreign keys to these models load each row
+# once per request; X-Identity-Map-Saved-Queries reports the queries saved when the header is on
+IDENTITY_MAP_MODELS = ("pet_rescue_app.Profile", "pet_rescue_app.Pet", "pet_rescue_app.PetType")
+IDENTITY_MAP_HEADERS = DEBUG
+
+# gzip/brotli response compression (pet_rescue_app.middleware); brotli needs the Brotli (or brotlicffi)
+# package and is only used for requests without credentials, gzip responses are padded against BREACH
+RESPONSE_COMPRESSION = {
+    "MIN_SIZE": 1024,        # bytes; smaller responses are sent as-is
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 5,
+    "RANDOM_PADDING": 100,   # max random bytes in each gzip header; 0 turns the padding off
 }
 
 
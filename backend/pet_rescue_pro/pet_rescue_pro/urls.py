@@ -1,10 +1,13 @@
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
 from django.conf import settings
 from django.conf.urls.static import static
+from pet_rescue_app.media import MEDIA_PUBLIC_PREFIXES, serve_media
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -24,8 +27,21 @@ urlpatterns = [
     path("api/", include("pet_rescue_app.urls")),
     path("docs/", schema_view.with_ui("swagger", cache_timeout=0), name="schema-swagger-ui"),
     path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
+    # Uploads are served in every environment; in production the proxy sends the bytes
+    # (MEDIA_ACCEL_MODE, see pet_rescue_app.media)
+    re_path(
+        r"^%s/(?P<path>(?:%s).+)$" % (
+            re.escape(settings.MEDIA_URL.strip("/")), "|".join(re.escape(prefix) for prefix in MEDIA_PUBLIC_PREFIXES)
+        ),
+        serve_media,
+        name="media",
+    ),
 ]
 
-# Serve media files during development
+# Serve the rest of MEDIA_ROOT during development
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+if settings.ASYNC_READ_VIEWS:
+    # Async variants of the hot read endpoints take precedence over the DRF views
+    urlpatterns.insert(0, path("api/", include("pet_rescue_app.async_urls")))